@@ -6,12 +6,73 @@ import os
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.config import config
+from app.services.data_loader import data_loader
+from app.services.dataset_reloader import dataset_reloader
+from app.services.executors import kpi_executor, ml_executor
+from app.services.financial_kpis_service import financial_kpis_service
+from app.services.ml_service import ml_service
+from app.services.tenant_registry import tenant_registry
+from app.services.training_jobs import training_jobs
+
 # Import routers
-from app.routers import financial_kpis, sales_analysis, accounts, expenses, ml_predictions
+from app.routers import financial_kpis, sales_analysis, accounts, expenses, ml_predictions, admin, export
+from app.routers.errors import register_error_handlers
 
 def create_app(config_name='development'):
     """Crea y configura la aplicación FastAPI"""
     
+    settings = config.get(config_name, config['default'])
+    
+    # Configurar el almacenamiento del dataset antes de la primera carga
+    data_options = dict(
+        use_snapshot=settings.DATA_USE_SNAPSHOT,
+        storage=settings.DATA_STORAGE,
+        compact_dtypes=settings.DATA_COMPACT_DTYPES,
+        money_scale=settings.DATA_MONEY_SCALE,
+        backend=settings.DATA_BACKEND
+    )
+    data_loader.configure(**data_options)
+    
+    # Datasets por tenant, cargados bajo demanda con las mismas opciones
+    tenant_registry.configure(
+        tenants_path=settings.TENANTS_PATH,
+        max_bytes=settings.TENANT_MEMORY_LIMIT_MB * 1024 * 1024,
+        data_options=data_options
+    )
+    
+    # Recargar el dataset en segundo plano cuando cambia el CSV
+    if settings.DATA_RELOAD_INTERVAL > 0:
+        dataset_reloader.start_watching(settings.DATA_RELOAD_INTERVAL)
+    
+    # Caché de respuestas de KPIs, invalidada por la versión del dataset
+    financial_kpis_service.cache.configure(
+        max_entries=settings.KPI_CACHE_SIZE,
+        ttl=settings.KPI_CACHE_TTL
+    )
+    
+    # Pools acotados para KPIs y ML, separados para que el entrenamiento no
+    # retrase las consultas de KPIs
+    kpi_executor.configure(
+        max_workers=settings.KPI_EXECUTOR_WORKERS,
+        max_queue=settings.KPI_EXECUTOR_QUEUE
+    )
+    ml_executor.configure(
+        max_workers=settings.ML_EXECUTOR_WORKERS,
+        max_queue=settings.ML_EXECUTOR_QUEUE
+    )
+    
+    # Entrenamiento en procesos aparte, que cargan el dataset igual que la API
+    training_jobs.configure(
+        max_workers=settings.ML_TRAINING_WORKERS,
+        data_options=data_options
+    )
+    
+    # Precargar los modelos en segundo plano para que el primer pronóstico no
+    # pague la deserialización
+    if settings.ML_WARM_UP:
+        ml_executor.submit(ml_service.warm_up)
+    
     app = FastAPI(
         title="AP-ERP-Analyzer-BE",
         description="API para análisis de datos ERP y visualización de KPIs",
@@ -27,12 +88,17 @@ def create_app(config_name='development'):
         allow_headers=["*"],
     )
     
+    # Tenant desconocido -> 404, pool saturado -> 503 con Retry-After
+    register_error_handlers(app)
+    
     # Register routes
     app.include_router(financial_kpis.router, prefix="/api/kpis/financial", tags=["Financial KPIs"])
     app.include_router(sales_analysis.router, prefix="/api/kpis/sales", tags=["Sales Analysis"])
     app.include_router(accounts.router, prefix="/api/kpis/accounts", tags=["Accounts Receivable/Payable"])
     app.include_router(expenses.router, prefix="/api/kpis/expenses", tags=["Expenses Analysis"])
     app.include_router(ml_predictions.router, prefix="/api/ml", tags=["ML Predictions"])
+    app.include_router(export.router, prefix="/api/export", tags=["Export"])
+    app.include_router(admin.router, prefix="/api/admin", tags=["Admin"])
     
     @app.get("/", tags=["Root"])
     async def root():
@@ -0,0 +1,70 @@
+# Copyright 2025 Anti-Patrones
+# This work is licensed under a Creative Commons Attribution-ShareAlike 4.0 International License.
+# http://creativecommons.org/licenses/by-sa/4.0/
+
+import os
+
+class Config:
+    """Configuración base"""
+    DEBUG = False
+    
+    # Carga de datos: 'memory' (copia privada por worker) o 'shared'
+    # (columnas numéricas mapeadas en memoria y compartidas entre workers)
+    DATA_STORAGE = os.getenv('DATA_STORAGE', 'memory')
+    
+    # Motor de consultas: 'pandas' (tabla y cubo en memoria de cada worker) o
+    # 'sqlite' (tabla indexada en una base SQLite local; los KPIs se calculan
+    # con GROUP BY en SQL y los workers solo guardan los resultados)
+    DATA_BACKEND = os.getenv('DATA_BACKEND', 'pandas')
+    
+    # Usar el snapshot columnar en lugar de parsear el CSV en cada arranque
+    DATA_USE_SNAPSHOT = os.getenv('DATA_USE_SNAPSHOT', 'true').lower() == 'true'
+    
+    # Esquema compacto: categóricas para textos de baja cardinalidad y enteros
+    # estrechos para año/mes
+    DATA_COMPACT_DTYPES = os.getenv('DATA_COMPACT_DTYPES', 'false').lower() == 'true'
+    
+    # Escala de punto fijo para columnas monetarias (p. ej. 1000000); vacío = float64
+    DATA_MONEY_SCALE = int(os.getenv('DATA_MONEY_SCALE')) if os.getenv('DATA_MONEY_SCALE') else None
+    
+    # Caché de respuestas de KPIs: número máximo de respuestas (0 la desactiva)
+    # y segundos de vigencia de cada una
+    KPI_CACHE_SIZE = int(os.getenv('KPI_CACHE_SIZE', '256'))
+    KPI_CACHE_TTL = float(os.getenv('KPI_CACHE_TTL', '300'))
+    
+    # Segundos entre revisiones del CSV de saldos para recargarlo en caliente
+    # cuando cambia (0 desactiva la vigilancia; la recarga manual sigue disponible)
+    DATA_RELOAD_INTERVAL = float(os.getenv('DATA_RELOAD_INTERVAL', '0'))
+    
+    # Multiempresa: directorio con un subdirectorio por tenant (vacío =
+    # app/data/tenants) y memoria máxima de los datasets de tenants cargados;
+    # al superarla se descargan los menos usados recientemente
+    TENANTS_PATH = os.getenv('TENANTS_PATH') or None
+    TENANT_MEMORY_LIMIT_MB = int(os.getenv('TENANT_MEMORY_LIMIT_MB', '1024'))
+    
+    # Pools de ejecución para el trabajo de pandas/statsmodels fuera del event
+    # loop: hilos por pool y solicitudes en espera antes de responder 503
+    KPI_EXECUTOR_WORKERS = int(os.getenv('KPI_EXECUTOR_WORKERS', '4'))
+    KPI_EXECUTOR_QUEUE = int(os.getenv('KPI_EXECUTOR_QUEUE', '64'))
+    ML_EXECUTOR_WORKERS = int(os.getenv('ML_EXECUTOR_WORKERS', '2'))
+    ML_EXECUTOR_QUEUE = int(os.getenv('ML_EXECUTOR_QUEUE', '8'))
+    
+    # Procesos dedicados al entrenamiento de modelos
+    ML_TRAINING_WORKERS = int(os.getenv('ML_TRAINING_WORKERS', '1'))
+    
+    # Cargar en memoria los modelos entrenados al arrancar
+    ML_WARM_UP = os.getenv('ML_WARM_UP', 'true').lower() == 'true'
+
+class DevelopmentConfig(Config):
+    """Configuración de desarrollo"""
+    DEBUG = True
+
+class ProductionConfig(Config):
+    """Configuración de producción"""
+    DATA_STORAGE = os.getenv('DATA_STORAGE', 'shared')
+
+config = {
+    'development': DevelopmentConfig,
+    'production': ProductionConfig,
+    'default': DevelopmentConfig
+}
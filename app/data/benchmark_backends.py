@@ -0,0 +1,124 @@
+"""
+Benchmark de los backends de DataLoader (pandas y sqlite).
+
+Genera un CSV de saldos a partir de accounting_account_balances.csv repetido
+--repeat veces (cada copia desplazada a años anteriores, de modo que el
+historial crece en períodos) y, para cada backend, mide la carga en frío, la
+carga con el snapshot o la base SQLite ya construidos y las consultas de KPIs
+de FinancialKPIsService sin caché de respuestas.
+
+Uso:
+    python -m app.data.benchmark_backends --repeat 50
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from app.services.data_loader import DataLoader, BACKENDS
+from app.services.financial_kpis_service import FinancialKPIsService
+
+CSV_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "accounting_account_balances.csv")
+
+QUERIES = {
+    'summary': lambda service: service.calculate_financial_summary(),
+    'summary (año)': lambda service: service.calculate_financial_summary(year=2024),
+    'cash-flow': lambda service: service.calculate_cash_flow(),
+    'sales': lambda service: service.analyze_sales(),
+    'sales (tercero)': lambda service: service.analyze_sales(third_party_id=5),
+    'accounts': lambda service: service.analyze_accounts_receivable_payable(),
+    'expenses (año, mes)': lambda service: service.analyze_expenses_by_supplier(year=2024, month=3),
+}
+
+
+def write_benchmark_csv(data_dir, repeat):
+    """
+    Escribe el CSV de benchmark y retorna el número de filas generadas.
+    """
+    base = pd.read_csv(CSV_FILE, dtype={'code': str})
+    copies = [
+        base.assign(year=base['year'] - offset, id=base['id'] + offset * len(base))
+        for offset in range(repeat)
+    ]
+    df = pd.concat(copies, ignore_index=True)
+    os.makedirs(data_dir, exist_ok=True)
+    df.to_csv(Path(data_dir) / "accounting_account_balances.csv", index=False)
+    return len(df)
+
+
+def make_loader(data_dir, backend):
+    """
+    DataLoader del backend indicado sobre el directorio de benchmark.
+    """
+    loader = DataLoader(backend=backend)
+    loader.data_path = Path(data_dir)
+    loader.snapshots_path = loader.data_path / "snapshots"
+    loader.configure(backend=backend)
+    return loader
+
+
+def time_load(data_dir, backend):
+    """
+    Segundos hasta tener el dataset listo para consultar.
+    """
+    loader = make_loader(data_dir, backend)
+    start = time.perf_counter()
+    loader.dataset
+    return loader, time.perf_counter() - start
+
+
+def time_queries(loader, iterations):
+    """
+    Mediana en milisegundos de cada consulta de KPIs.
+    """
+    service = FinancialKPIsService()
+    service.data_loader = loader
+    service.cache.configure(max_entries=0)
+    
+    timings = {}
+    for name, query in QUERIES.items():
+        samples = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            query(service)
+            samples.append((time.perf_counter() - start) * 1000)
+        timings[name] = statistics.median(samples)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de los backends pandas y sqlite")
+    parser.add_argument("--repeat", type=int, default=50, help="Veces que se repite el CSV en el historial")
+    parser.add_argument("--iterations", type=int, default=5, help="Repeticiones de cada consulta")
+    parser.add_argument("--dir", help="Directorio de datos a generar (por defecto uno temporal)")
+    args = parser.parse_args()
+    
+    data_dir = args.dir or tempfile.mkdtemp(prefix="benchmark_backends_")
+    total_rows = write_benchmark_csv(data_dir, args.repeat)
+    print(f"📄 CSV de benchmark: {data_dir} ({total_rows} filas)")
+    
+    results = {}
+    for backend in BACKENDS:
+        _, cold = time_load(data_dir, backend)
+        loader, warm = time_load(data_dir, backend)
+        results[backend] = time_queries(loader, args.iterations)
+        
+        if backend == 'sqlite':
+            size = os.path.getsize(loader.account_balances_store)
+            storage = f"base SQLite de {size / 1e6:.1f} MB en disco"
+        else:
+            size = loader.get_memory_report()['after_bytes']
+            storage = f"tabla de {size / 1e6:.1f} MB en memoria por worker"
+        print(f"⏱️  {backend}: carga en frío {cold:.2f} s, con snapshot/base {warm:.2f} s, {storage}")
+    
+    print(f"\n{'consulta':<22}" + "".join(f"{backend:>12}" for backend in BACKENDS))
+    for name in QUERIES:
+        print(f"{name:<22}" + "".join(f"{results[backend][name]:>10.1f}ms" for backend in BACKENDS))
+
+
+if __name__ == "__main__":
+    main()
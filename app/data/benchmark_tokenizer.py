@@ -0,0 +1,159 @@
+"""
+Benchmark del tokenizador de VALUES de parse_sql_to_csv.
+
+Genera un dump de MySQL determinista a partir de accounting_account_balances.csv
+(repetido --repeat veces, con literales que incluyen comillas escapadas, comas,
+punto y coma y paréntesis) y compara el tokenizador vectorizado (read_values_texts:
+filas separadas con split_values o scan_values + lector CSV de pandas, un llamado
+por lote como en iter_table_batches) con el recorrido carácter a carácter que se
+usaba antes.
+
+Uso:
+    python -m app.data.benchmark_tokenizer --repeat 20
+"""
+import argparse
+import csv
+import os
+import re
+import tempfile
+import time
+
+import numpy as np
+
+from app.data.parse_sql_to_csv import (
+    iter_table_inserts,
+    process_value,
+    read_values_csv,
+    read_values_texts,
+    scan_values,
+)
+
+CSV_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "accounting_account_balances.csv")
+TARGET_TABLE = "accounting_account_balances"
+
+# Tipos del CREATE TABLE del dump; las columnas no listadas son varchar(255)
+COLUMN_TYPES = {
+    'id': 'bigint', 'accounting_id': 'bigint', 'third_party_id': 'bigint', 'year': 'int', 'month': 'int',
+    'initial_balance': 'decimal(20,2)', 'final_balance': 'decimal(20,2)',
+    'debit_movement': 'decimal(20,2)', 'credit_movement': 'decimal(20,2)',
+    'deleted_at': 'timestamp', 'created_at': 'timestamp', 'updated_at': 'timestamp'
+}
+
+NUMERIC_COLUMNS = {column for column, sql_type in COLUMN_TYPES.items() if sql_type != 'timestamp'}
+
+
+def write_benchmark_dump(path, repeat, rows_per_insert=500):
+    """
+    Escribe el dump de benchmark y retorna el número de filas generadas.
+    """
+    with open(CSV_FILE, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    columns = list(rows[0].keys())
+    
+    def literal(column, value):
+        if value == '':
+            return 'NULL'
+        if column in NUMERIC_COLUMNS:
+            return value
+        return "'" + value.replace('\\', '\\\\').replace("'", "\\'") + "'"
+    
+    row_id = 0
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"CREATE TABLE `{TARGET_TABLE}` (\n")
+        f.write(",\n".join(f"  `{column}` {COLUMN_TYPES.get(column, 'varchar(255)')} DEFAULT NULL"
+                           for column in columns))
+        f.write("\n) ENGINE=InnoDB;\n")
+        
+        for _ in range(repeat):
+            for start in range(0, len(rows), rows_per_insert):
+                tuples = []
+                for row in rows[start:start + rows_per_insert]:
+                    row_id += 1
+                    values = [str(row_id) if column == 'id' else literal(column, row[column]) for column in columns]
+                    if row_id % 5 == 0:
+                        values[columns.index('name')] = "'Ajuste; (cierre) d\\'año, \"mes\"'"
+                    tuples.append("(" + ",".join(values) + ")")
+                f.write(f"INSERT INTO `{TARGET_TABLE}` VALUES " + ",".join(tuples) + ";\n")
+    
+    return row_id
+
+
+def legacy_parse_values_rows(values_text):
+    """
+    Tokenizador anterior: recorre cada fila carácter a carácter.
+    """
+    row_pattern = re.compile(r'\((.*?)\)', re.DOTALL)
+    for row_match in row_pattern.finditer(values_text):
+        row_values = []
+        current_value = ""
+        in_quotes = False
+        in_parenthesis = 0
+        
+        for char in row_match.group(1) + ',':
+            if char == "'" and (not current_value or current_value[-1] != '\\'):
+                in_quotes = not in_quotes
+                current_value += char
+            elif char == '(' and not in_quotes:
+                in_parenthesis += 1
+                current_value += char
+            elif char == ')' and not in_quotes:
+                in_parenthesis -= 1
+                current_value += char
+            elif char == ',' and not in_quotes and in_parenthesis == 0:
+                row_values.append(process_value(current_value.strip()))
+                current_value = ""
+            else:
+                current_value += char
+        
+        yield row_values
+
+
+def load_values_texts(path):
+    """
+    Lee los tipos declarados y el texto de cada VALUES del dump de benchmark.
+    """
+    column_types = []
+    texts = []
+    for _, _, column_types, values_text in iter_table_inserts(path, [TARGET_TABLE]):
+        texts.append(values_text)
+    return column_types, texts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del tokenizador de VALUES")
+    parser.add_argument("--repeat", type=int, default=20, help="Veces que se repite el CSV en el dump")
+    parser.add_argument("--dump", help="Ruta del dump a generar (por defecto un archivo temporal)")
+    args = parser.parse_args()
+    
+    path = args.dump or os.path.join(tempfile.gettempdir(), "benchmark_dump.sql")
+    total_rows = write_benchmark_dump(path, args.repeat)
+    column_types, texts = load_values_texts(path)
+    print(f"📄 Dump de benchmark: {path} ({os.path.getsize(path) / 1e6:.1f} MB, {total_rows} filas)")
+    
+    start = time.perf_counter()
+    legacy_rows = sum(1 for text in texts for _ in legacy_parse_values_rows(text))
+    legacy_time = time.perf_counter() - start
+    
+    # Como en iter_table_batches: un lote con todos los INSERTs y los tipos del CREATE TABLE
+    start = time.perf_counter()
+    columns = read_values_texts(texts, len(column_types), column_types)
+    fast_rows = len(columns[0])
+    fast_time = time.perf_counter() - start
+    
+    # El mismo lote forzando el escaneo de scan_values (sin el camino rápido de split_values)
+    start = time.perf_counter()
+    scanned = [scan_values(text, len(column_types)) for text in texts]
+    scan_rows = len(read_values_csv(b"\n".join(result[0] for result in scanned),
+                                    np.logical_or.reduce([result[1] for result in scanned]),
+                                    len(column_types), column_types)[0])
+    scan_time = time.perf_counter() - start
+    
+    # El tokenizador anterior parte las filas en los ')' dentro de literales
+    print(f"🐢 Carácter a carácter: {legacy_time:.3f} s ({legacy_rows} filas detectadas)")
+    print(f"🔎 Escaneo NumPy:       {scan_time:.3f} s ({scan_rows} filas, {legacy_time / scan_time:.1f}x)")
+    print(f"⚡ Vectorizado:         {fast_time:.3f} s ({fast_rows} filas)")
+    print(f"🚀 Aceleración: {legacy_time / fast_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,18 @@
 import pandas as pd
-import sqlparse
+import numpy as np
+import argparse
+import io
 import re
 import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet es opcional
+    pa = None
+    pq = None
 
 # Archivo SQL con el dump
 SQL_FILE = "app/data/Dataset.sql"  # Ajusta esta ruta a la ubicación correcta de tu archivo
@@ -9,98 +20,781 @@ SQL_FILE = "app/data/Dataset.sql"  # Ajusta esta ruta a la ubicación correcta d
 # Nombre de la tabla objetivo que se desea extraer
 TARGET_TABLE = "accounting_account_balances"
 
+# Tamaño de cada lectura del archivo y de cada lote de filas escrito
+CHUNK_SIZE = 1 << 20
+BATCH_SIZE = 50000
+
+# Caracteres de INSERTs de una tabla que se envían juntos a un proceso del pool
+TASK_SIZE = 8 << 20
+
+# Valores no nulos revisados para tipar una columna sin tipo declarado
+SAMPLE_SIZE = 1000
+
+# Familia de cada tipo de columna de MySQL; los tipos no listados se infieren con una muestra
+SQL_TYPE_KINDS = {
+    'tinyint': 'integer', 'smallint': 'integer', 'mediumint': 'integer', 'int': 'integer',
+    'integer': 'integer', 'bigint': 'integer', 'year': 'integer',
+    'decimal': 'float', 'numeric': 'float', 'float': 'float', 'double': 'float', 'real': 'float',
+    'date': 'datetime', 'datetime': 'datetime', 'timestamp': 'datetime',
+    'char': 'text', 'varchar': 'text', 'tinytext': 'text', 'text': 'text', 'mediumtext': 'text',
+    'longtext': 'text', 'enum': 'text', 'set': 'text', 'json': 'text', 'time': 'text',
+}
+
+# Tipo con el que el lector CSV entrega directamente cada familia
+_READ_DTYPES = {'integer': 'Int64', 'float': 'float64', 'text': object, 'datetime': object}
+
+# Inicio de las sentencias que definen o llenan una tabla
+_CREATE_TABLE = re.compile(r"CREATE TABLE (?:IF NOT EXISTS )?`?([^`\s(]+)`?\s*\(", re.IGNORECASE)
+_INSERT_INTO = re.compile(r"INSERT INTO `?([^`\s(]+)`?\s+VALUES\s+", re.IGNORECASE)
+
+# Inicio de los elementos que cambian el estado del escáner fuera de comillas
+_SPECIAL_TOKENS = re.compile(r"[;'\"`]|--(?=\s)|/\*")
+
+# Fin de un literal para cada tipo de comilla (escapes con barra o comilla doble)
+_QUOTED_TOKENS = {
+    "'": re.compile(r"\\.|''|'", re.DOTALL),
+    '"': re.compile(r'\\.|""|"', re.DOTALL),
+    "`": re.compile(r"``|`"),
+}
+
+# Comentarios y espacios antes del inicio real de una sentencia
+_LEADING_COMMENTS = re.compile(r"(?:\s+|--[^\n]*(?:\n|$)|/\*.*?\*/)*", re.DOTALL)
+
+# Bytes relevantes para ubicar filas y valores dentro de un VALUES
+_QUOTE = ord("'")
+_BACKSLASH = ord("\\")
+_OPEN = ord("(")
+_CLOSE = ord(")")
+_COMMA = ord(",")
+_NULL_LITERAL = b"'NULL'"
+
+# Separación entre filas de un VALUES y fin de línea (con centinela) del camino rápido
+_ROW_SEPARATOR = b"),("
+_SPLIT_ROW_END = b", 0\n"
+
+# Secuencias de escape de MySQL dentro de literales
+_ESCAPE_SEQUENCE = re.compile(r"\\(.)|''", re.DOTALL)
+_ESCAPE_CHARS = {'0': '\0', 'b': '\b', 'n': '\n', 'r': '\r', 't': '\t', 'Z': '\x1a'}
+
+# Escapes de caracteres de control que el lector CSV no resuelve por sí mismo
+_CONTROL_ESCAPE = re.compile(rb"\\[0bnrtZ]")
+_BYTE_ESCAPE = re.compile(rb"\\(.)", re.DOTALL)
+_BYTE_ESCAPE_CHARS = {b'0': b'\0', b'b': b'\b', b'n': b'\n', b'r': b'\r', b't': b'\t', b'Z': b'\x1a'}
+
+
+def iter_sql_statements(f, chunk_size=CHUNK_SIZE):
+    """
+    Lee un dump SQL por bloques y entrega cada sentencia completa (terminada en ';').
+    
+    El escáner conserva su estado (comillas abiertas, comentarios) entre bloques,
+    por lo que una sentencia puede quedar partida en cualquier punto del buffer.
+    La memoria usada queda acotada por la sentencia más grande del archivo.
+    
+    La parte ya escaneada de una sentencia larga se guarda por bloques y se une
+    una sola vez al encontrar su ';', en lugar de copiarla con cada bloque leído.
+    """
+    parts = []     # Bloques ya escaneados de la sentencia actual
+    buffer = ""
+    start = 0      # Inicio de la sentencia actual dentro del buffer
+    pos = 0        # Posición de escaneo
+    quote = None   # Comilla abierta en la posición de escaneo
+    eof = False
+    
+    while True:
+        need_more = False
+        
+        if quote:
+            match = _QUOTED_TOKENS[quote].search(buffer, pos)
+            if match is None:
+                # Conservar el último carácter por si empieza un escape o una comilla doble
+                pos = max(pos, len(buffer) - 1)
+                need_more = True
+            elif match.end() == len(buffer) and not eof:
+                # Una comilla al final del buffer puede ser el inicio de una comilla doble
+                pos = match.start()
+                need_more = True
+            else:
+                pos = match.end()
+                if match.group() == quote:
+                    quote = None
+        else:
+            match = _SPECIAL_TOKENS.search(buffer, pos)
+            if match is None:
+                # Conservar los últimos caracteres por si empiezan un token de dos caracteres
+                pos = max(pos, len(buffer) - 2)
+                need_more = True
+            else:
+                token = match.group()
+                if token == ";":
+                    parts.append(buffer[start:match.end()])
+                    yield "".join(parts)
+                    parts = []
+                    start = pos = match.end()
+                elif token == "--":
+                    end = buffer.find("\n", match.end())
+                    if end == -1:
+                        pos = match.start()
+                        need_more = True
+                    else:
+                        pos = end + 1
+                elif token == "/*":
+                    end = buffer.find("*/", match.end())
+                    if end == -1:
+                        pos = match.start()
+                        need_more = True
+                    else:
+                        pos = end + 2
+                else:
+                    quote = token
+                    pos = match.end()
+        
+        if need_more:
+            if eof:
+                parts.append(buffer[start:])
+                trailing = "".join(parts)
+                if trailing.strip():
+                    yield trailing
+                return
+            
+            chunk = f.read(chunk_size)
+            if not chunk:
+                eof = True
+                continue
+            
+            # Guardar lo escaneado y seguir solo con lo pendiente más el nuevo bloque
+            if pos > start:
+                parts.append(buffer[start:pos])
+            buffer = buffer[pos:] + chunk
+            start = pos = 0
+
+
+def strip_leading_comments(statement):
+    """
+    Elimina espacios y comentarios al inicio de una sentencia.
+    """
+    return statement[_LEADING_COMMENTS.match(statement).end():]
+
+
+def parse_create_table_schema(statement):
+    """
+    Extrae los nombres y tipos de columnas de una sentencia CREATE TABLE.
+    
+    Retorna una lista de tuplas (columna, tipo) con el tipo base en minúsculas
+    (p. ej. 'bigint', 'decimal', 'varchar').
+    """
+    schema = []
+    
+    # Obtener el contenido entre el primer y el último paréntesis del CREATE TABLE
+    create_content = statement[statement.find("(") + 1:statement.rfind(")")]
+    
+    # Dividir por líneas para procesar cada definición de columna
+    column_lines = [line.strip() for line in create_content.split('\n') if line.strip()]
+    
+    for line in column_lines:
+        # Ignorar líneas que no son definiciones de columnas (PRIMARY KEY, etc.)
+        if line.startswith('`') and not line.upper().startswith(('PRIMARY', 'KEY', 'CONSTRAINT', 'UNIQUE', 'INDEX', 'FOREIGN')):
+            # Extraer el nombre de la columna (está entre backticks) y su tipo
+            column_match = re.match(r'`([^`]+)`\s*(\w*)', line)
+            if column_match:
+                schema.append((column_match.group(1), column_match.group(2).lower()))
+    
+    return schema
+
+
+def parse_create_table_columns(statement):
+    """
+    Extrae los nombres de columnas de una sentencia CREATE TABLE.
+    """
+    return [column for column, _ in parse_create_table_schema(statement)]
+
+
+def unescape_string(value):
+    """
+    Quita las comillas de un literal de MySQL y resuelve sus secuencias de escape.
+    """
+    value = value[1:-1]
+    if '\\' not in value and "''" not in value:
+        return value
+    return _ESCAPE_SEQUENCE.sub(
+        lambda m: "'" if m.group(1) is None else _ESCAPE_CHARS.get(m.group(1), m.group(1)),
+        value
+    )
+
+
+def scan_values(values_text, n_columns=None):
+    """
+    Convierte el texto de un VALUES (...),(...) en líneas CSV sin recorrerlo carácter a carácter.
+    
+    Las posiciones de comillas, paréntesis y comas se obtienen con NumPy en una sola
+    pasada sobre los bytes del texto. Una comilla escapada por un número impar de
+    barras no cuenta como delimitador; un paréntesis o una coma está fuera de los
+    literales si le precede un número par de comillas, y la profundidad de paréntesis
+    (que admite llamadas a funciones anidadas) separa las filas de sus valores.
+    
+    Retorna una tupla (csv, columnas_entre_comillas, filas, n_columnas, literales_null)
+    donde csv son las filas válidas separadas por saltos de línea y literales_null los
+    índices (fila * n_columnas + columna) de los valores 'NULL' entre comillas, que son
+    texto y no nulos; o None si no hay filas. Las filas cuyo número de valores no
+    coincide con n_columns se descartan.
+    """
+    data = values_text.encode("utf-8")
+    codes = np.frombuffer(data, dtype=np.uint8)
+    
+    structural = (codes == _QUOTE) | (codes == _OPEN) | (codes == _CLOSE) | (codes == _COMMA)
+    backslashes = np.flatnonzero(codes == _BACKSLASH)
+    if len(backslashes):
+        # Una racha de barras de longitud impar escapa el carácter siguiente
+        breaks = np.flatnonzero(np.diff(backslashes) != 1)
+        run_starts = backslashes[np.r_[0, breaks + 1]]
+        run_ends = backslashes[np.r_[breaks, len(backslashes) - 1]]
+        escaped = run_ends[(run_ends - run_starts) % 2 == 0] + 1
+        structural[escaped[escaped < len(codes)]] = False
+    
+    positions = np.flatnonzero(structural)
+    kinds = codes[positions]
+    
+    # Descartar los paréntesis y comas que están dentro de literales
+    is_quote = kinds == _QUOTE
+    outside = ~is_quote & ((np.cumsum(is_quote, dtype=np.int32) & 1) == 0)
+    positions, kinds = positions[outside], kinds[outside]
+    
+    steps = (kinds == _OPEN).astype(np.int32) - (kinds == _CLOSE)
+    depth = np.cumsum(steps, dtype=np.int32)
+    row_starts = (steps == 1) & (depth == 1)
+    row_ends = (steps == -1) & (depth == 0)
+    separators = (kinds == _COMMA) & (depth == 1)
+    
+    opens = positions[row_starts]
+    closes = positions[row_ends]
+    rows = min(len(opens), len(closes))
+    if not rows:
+        return None
+    
+    row_of_event = np.cumsum(row_starts, dtype=np.int32) - 1
+    commas_per_row = np.bincount(row_of_event[separators], minlength=len(opens))[:rows]
+    n = n_columns or int(commas_per_row[0]) + 1
+    valid = commas_per_row == n - 1
+    
+    if not valid.all() or rows < len(opens) or rows < len(closes):
+        for count in commas_per_row[~valid]:
+            print(f"⚠️ Advertencia: Conjunto de valores con longitud diferente. Columnas: {n}, Valores: {count + 1}")
+        # Conservar solo los eventos de filas completas y con el número correcto de valores
+        in_valid_row = np.append(valid, False)[np.where(row_of_event < 0, rows, np.minimum(row_of_event, rows))]
+        row_starts &= in_valid_row
+        separators &= in_valid_row
+        opens, closes = opens[:rows][valid], closes[:rows][valid]
+        if not len(opens):
+            return None
+    
+    # Primer byte de cada valor, fila por fila, para saber qué columnas son literales
+    field_starts = positions[row_starts | separators] + 1
+    quoted = (codes[field_starts] == _QUOTE).reshape(-1, n).any(axis=0)
+    
+    lines = [data[start + 1:end] for start, end in zip(opens.tolist(), closes.tolist())]
+    
+    # Un literal 'NULL' es texto, pero el lector CSV no distingue si el NULL tenía comillas
+    null_literals = []
+    hit = data.find(_NULL_LITERAL)
+    if hit >= 0:
+        field_ends = np.union1d(positions[separators], closes)
+        while hit >= 0:
+            # Solo cuenta si el literal ocupa todo el valor, salvo espacios
+            k = int(np.searchsorted(field_starts, hit, side="right")) - 1
+            end = hit + len(_NULL_LITERAL)
+            if k >= 0 and not data[field_starts[k]:hit].strip() and not data[end:field_ends[k]].strip():
+                null_literals.append(k)
+            hit = data.find(_NULL_LITERAL, end)
+    
+    # Los valores con comas fuera de literales (p. ej. CONCAT('a','b')) se citan para el lector CSV
+    nested_rows = np.unique(row_of_event[(kinds == _COMMA) & (depth > 1)])
+    if len(nested_rows):
+        line_of_row = np.cumsum(valid) - 1
+        bounds = row_starts | separators | row_ends
+        for row in nested_rows.tolist():
+            if row >= rows or not valid[row]:
+                continue
+            edges = positions[bounds & (row_of_event == row)].tolist()
+            fields = [data[start + 1:end].strip() for start, end in zip(edges[:-1], edges[1:])]
+            for j, field in enumerate(fields):
+                if b"," in field and not field.startswith(b"'"):
+                    fields[j] = b"'" + field.replace(b"\\", b"\\\\").replace(b"'", b"\\'") + b"'"
+                    quoted[j] = True
+            lines[line_of_row[row]] = b",".join(fields)
+    
+    return b"\n".join(lines), quoted, len(lines), n, null_literals
+
+
+def split_values(values_text):
+    """
+    Convierte el texto de un VALUES (...),(...) en líneas CSV partiéndolo solo en los '),('.
+    
+    Es el camino rápido de read_values_texts: no escanea comillas ni paréntesis, así que
+    cada línea termina con una columna centinela (0) y la lectura se comprueba después
+    (número de filas y centinela en su lugar). Un '),(' dentro de un literal o una fila
+    con otro número de valores hacen fallar esa comprobación y se vuelve a scan_values.
+    
+    Retorna una tupla (csv, filas) o None si el texto no admite el camino rápido
+    (saltos de línea fuera de los valores o literales 'NULL').
+    """
+    data = values_text.encode("utf-8").strip()
+    if (not data.startswith(b"(") or not data.endswith(b")") or b"\n" in data or b"\r" in data
+            or _NULL_LITERAL in data):
+        return None
+    csv = data[1:-1].replace(_ROW_SEPARATOR, _SPLIT_ROW_END) + _SPLIT_ROW_END.rstrip()
+    # Cada fila alarga el texto en un byte (centinela menos paréntesis), así que no hace falta contarlas
+    return csv, len(csv) - len(data)
+
+
+def _read_csv(csv, n_columns, dtype):
+    return pd.read_csv(
+        io.BytesIO(csv),
+        header=None,
+        names=list(range(n_columns)),
+        quotechar="'",
+        escapechar="\\",
+        doublequote=True,
+        skipinitialspace=True,
+        na_values=["NULL"],
+        keep_default_na=False,
+        dtype=dtype
+    )
+
+
+def _read_columns(csv, n_columns, kinds, quoted):
+    # \n, \t, ... se resuelven aquí; \' y \\ los resuelve el lector CSV
+    if _CONTROL_ESCAPE.search(csv):
+        csv = _BYTE_ESCAPE.sub(lambda m: _BYTE_ESCAPE_CHARS.get(m.group(1), m.group(0)), csv)
+    
+    # Los enteros se infieren: leerlos como Int64 es varias veces más lento que como int64
+    dtype = {j: _READ_DTYPES[kind] if kind else object
+             for j, kind in enumerate(kinds) if kind != 'integer' and (kind or quoted[j])}
+    try:
+        df = _read_csv(csv, n_columns, dtype)
+        # Con NULL se infieren como float64, exacto solo hasta 2**53; el resto se relee como Int64
+        inexact = [j for j, kind in enumerate(kinds) if kind == 'integer' and not (
+            df[j].dtype == np.int64 or (df[j].dtype == np.float64 and not (df[j].abs() >= 2 ** 53).any())
+        )]
+        if inexact:
+            df = _read_csv(csv, n_columns, {**dtype, **{j: _READ_DTYPES['integer'] for j in inexact}})
+    except (ValueError, TypeError, OverflowError):
+        # Algún valor no corresponde al tipo declarado: leer como texto y convertir con coerción
+        df = _read_csv(csv, n_columns, {j: object for j in range(n_columns) if quoted[j] or kinds[j] is not None})
+    return df
+
+
+def read_values_csv(csv, quoted, n_columns, column_types=None, null_literals=()):
+    """
+    Lee las líneas CSV generadas por scan_values con el lector en C de pandas.
+    
+    Con column_types (tipos del CREATE TABLE) cada columna se lee directamente con su
+    tipo final en el mismo paso; sin ellos, las columnas con literales se leen como
+    texto y el resto se infiere como números. Solo el NULL sin comillas es nulo: los
+    valores en null_literals (índices de scan_values) vuelven a ser el texto 'NULL'.
+    
+    Retorna una lista con una Series tipada por columna (None para NULL en las de texto).
+    """
+    kinds = [SQL_TYPE_KINDS.get(sql_type) for sql_type in column_types] if column_types else [None] * n_columns
+    
+    # Las columnas con literales 'NULL' se leen como texto para poder restaurarlos
+    literal_rows = {}
+    for index in null_literals:
+        literal_rows.setdefault(index % n_columns, []).append(index // n_columns)
+    read_kinds = ['text' if j in literal_rows else kind for j, kind in enumerate(kinds)]
+    
+    df = _read_columns(csv, n_columns, read_kinds, quoted)
+    for j, rows in literal_rows.items():
+        values = df[j].to_numpy(dtype=object, copy=True)
+        values[rows] = 'NULL'
+        df[j] = pd.Series(values, index=df.index, dtype=object)
+    
+    return [type_column(df[j], kind) for j, kind in enumerate(kinds)]
+
+
+def read_values_texts(values_texts, n_columns, column_types=None):
+    """
+    Tokeniza y tipa varios VALUES de una misma tabla con un solo llamado al lector CSV.
+    
+    Si todas las columnas tienen un tipo declarado conocido, las filas se separan con
+    split_values y se leen sin escanear el texto; si algún texto no lo admite o la
+    lectura no pasa la comprobación, todo el lote se tokeniza con scan_values.
+    
+    Retorna una lista con una Series tipada por columna, o None si no hay filas válidas.
+    """
+    kinds = [SQL_TYPE_KINDS.get(sql_type) for sql_type in column_types] if column_types else [None] * n_columns
+    
+    if values_texts and None not in kinds:
+        split = [split_values(values_text) for values_text in values_texts]
+        if None not in split:
+            try:
+                # La columna centinela se lee como un entero más
+                df = _read_columns(b"\n".join(csv for csv, _ in split), n_columns + 1, kinds + ['integer'],
+                                   [False] * (n_columns + 1))
+            except ValueError:
+                # Filas con más valores que columnas
+                df = None
+            
+            sentinel = None if df is None else df[n_columns]
+            if (sentinel is not None and len(df) == sum(rows for _, rows in split)
+                    and isinstance(df.index, pd.RangeIndex) and sentinel.dtype == np.int64 and not sentinel.any()):
+                return [type_column(df[j], kind) for j, kind in enumerate(kinds)]
+    
+    csv_parts = []
+    quoted = None
+    null_literals = []
+    rows = 0
+    for values_text in values_texts:
+        scanned = scan_values(values_text, n_columns)
+        if scanned is None:
+            continue
+        
+        csv, statement_quoted, statement_rows, _, statement_literals = scanned
+        csv_parts.append(csv)
+        quoted = statement_quoted if quoted is None else quoted | statement_quoted
+        null_literals.extend(rows * n_columns + index for index in statement_literals)
+        rows += statement_rows
+    
+    if not csv_parts:
+        return None
+    return read_values_csv(b"\n".join(csv_parts), quoted, n_columns, column_types, null_literals)
+
+
+def type_column(series, kind):
+    """
+    Convierte una columna a la familia de tipo indicada con operaciones vectorizadas.
+    
+    kind es 'integer' (Int64), 'float', 'datetime', 'text' o None (se deja como está).
+    Si la conversión numérica convertiría valores no nulos en nulos, la columna se
+    conserva como texto. Las fechas inválidas (p. ej. '0000-00-00') quedan como NaT y se
+    informa cuántas fueron.
+    """
+    if kind in ('integer', 'float') and not pd.api.types.is_bool_dtype(series.dtype):
+        if kind == 'integer' and isinstance(series.dtype, pd.Int64Dtype):
+            return series
+        if kind == 'float' and pd.api.types.is_float_dtype(series.dtype):
+            return series
+        
+        values = pd.to_numeric(series, errors="coerce")
+        if not (values.isna() & series.notna()).any():
+            if kind == 'integer' and (values.dropna() % 1 == 0).all():
+                return values.astype("Int64")
+            return values.astype("float64")
+        kind = 'text'
+    
+    if kind == 'datetime' and not pd.api.types.is_datetime64_any_dtype(series.dtype):
+        # Los volcados escriben las fechas en ISO 8601; sin formato pandas lo
+        # infiere del primer valor y anula en silencio las que no coinciden
+        values = pd.to_datetime(series, format="ISO8601", errors="coerce")
+        coerced = int((values.isna() & series.notna()).sum())
+        if coerced:
+            print(f"⚠️ Advertencia: {coerced} fechas inválidas convertidas a NaT en la columna {series.name}")
+        return values
+    
+    if kind == 'text' and series.dtype != object:
+        series = series.astype(object)
+    
+    # Asegurarnos de que los nulos de texto se mantienen como None
+    if series.dtype == object and series.hasnans:
+        series = series.where(series.notna(), None)
+    return series
+
+
+def infer_column_kind(series, sample_size=SAMPLE_SIZE):
+    """
+    Decide la familia de tipo de una columna sin tipo declarado a partir de una muestra
+    de sus valores no nulos.
+    
+    Retorna 'integer', 'float', 'datetime', 'text' o None si no hay valores no nulos.
+    """
+    if pd.api.types.is_bool_dtype(series.dtype):
+        return None
+    if pd.api.types.is_integer_dtype(series.dtype):
+        return 'integer'
+    if pd.api.types.is_float_dtype(series.dtype):
+        return 'float'
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        return 'datetime'
+    
+    sample = series.dropna()
+    if sample.empty:
+        return None
+    if len(sample) > sample_size:
+        sample = sample.sample(sample_size, random_state=0)
+    
+    # Los literales de texto se quedan como texto aunque parezcan números (p. ej. códigos '1.10')
+    inferred = pd.api.types.infer_dtype(sample, skipna=True)
+    if inferred == 'integer':
+        return 'integer'
+    if inferred in ('floating', 'mixed-integer-float', 'decimal'):
+        return 'float'
+    if inferred in ('datetime', 'datetime64', 'date'):
+        return 'datetime'
+    return 'text'
+
+
+def tokenize_values(values_text, n_columns=None):
+    """
+    Tokeniza el texto de un VALUES (...),(...) y entrega los valores por columnas.
+    
+    Retorna una lista con un arreglo de valores tipados por columna,
+    o None si no hay filas válidas.
+    """
+    scanned = scan_values(values_text, n_columns)
+    if scanned is None:
+        return None
+    
+    csv, quoted, _, n, null_literals = scanned
+    return read_values_csv(csv, quoted, n, null_literals=null_literals)
+
+
+def iter_table_inserts(sql_file, tables=None, chunk_size=CHUNK_SIZE):
+    """
+    Recorre un dump de MySQL una sola vez y entrega el texto VALUES de cada INSERT.
+    
+    Genera tuplas (tabla, columnas, tipos, texto_values) para las tablas pedidas, o para
+    todas si tables es None. Las columnas y sus tipos se toman del CREATE TABLE, que en
+    un dump aparece antes de sus INSERTs.
+    """
+    wanted = None if tables is None else set(tables)
+    schemas = {}
+    insert_counts = {}
+    
+    with open(sql_file, "r", encoding="utf-8") as f:
+        for statement in iter_sql_statements(f, chunk_size=chunk_size):
+            statement = strip_leading_comments(statement)
+            
+            insert_match = _INSERT_INTO.match(statement)
+            if insert_match:
+                table = insert_match.group(1)
+                if wanted is not None and table not in wanted:
+                    continue
+                
+                insert_counts[table] = insert_counts.get(table, 0) + 1
+                schema = schemas.get(table)
+                if not schema:
+                    print(f"⚠️ Advertencia: INSERT sin CREATE TABLE previo para: {table}")
+                    continue
+                
+                yield table, schema[0], schema[1], statement[insert_match.end():statement.rfind(";")]
+                continue
+            
+            create_match = _CREATE_TABLE.match(statement)
+            if create_match and (wanted is None or create_match.group(1) in wanted):
+                table = create_match.group(1)
+                print(f"🛠️ Detectado CREATE TABLE para: {table}")
+                schema = parse_create_table_schema(statement)
+                schemas[table] = ([column for column, _ in schema], [sql_type for _, sql_type in schema])
+                print(f"📊 Columnas extraídas: {len(schema)}")
+    
+    for table in (tables if tables is not None else schemas):
+        if table not in schemas:
+            print(f"⚠️ No se encontró la definición CREATE TABLE para: {table}")
+        if insert_counts.get(table):
+            print(f"📥 Detectados {insert_counts[table]} INSERTs para la tabla: {table}")
+        else:
+            print(f"⚠️ No se encontraron sentencias INSERT INTO para la tabla: {table}")
+
+
+def iter_table_batches(sql_file, target_table, batch_size=BATCH_SIZE, chunk_size=CHUNK_SIZE):
+    """
+    Recorre un dump de MySQL en streaming y entrega lotes de filas de la tabla objetivo.
+    
+    Genera tuplas (columnas, lote) donde lote es un diccionario columna -> Series
+    tipada según el CREATE TABLE. Cada lote se cierra al alcanzar batch_size filas, sin partir un INSERT.
+    """
+    columns = []
+    column_types = []
+    values_texts = []
+    batch_rows = 0
+    row_count = 0
+    
+    def flush():
+        # Un solo llamado al lector CSV por lote amortiza su costo fijo y ya tipa las columnas
+        arrays = read_values_texts(values_texts, len(columns), column_types)
+        if arrays is None:
+            return None
+        return columns, dict(zip(columns, arrays))
+    
+    for _, columns, column_types, values_text in iter_table_inserts(sql_file, [target_table],
+                                                                    chunk_size=chunk_size):
+        values_texts.append(values_text)
+        # Filas aproximadas: el lote se cierra sin tokenizar antes de tiempo
+        batch_rows += values_text.count("),(") + 1
+        
+        if batch_rows >= batch_size:
+            batch = flush()
+            values_texts = []
+            batch_rows = 0
+            if batch:
+                row_count += len(batch[1][columns[0]])
+                yield batch
+    
+    if values_texts:
+        batch = flush()
+        if batch:
+            row_count += len(batch[1][columns[0]])
+            yield batch
+    
+    if row_count:
+        print(f"✅ Datos extraídos: {row_count} filas")
+
+
+def parse_values_task(columns, column_types, values_texts):
+    """
+    Tokeniza y tipa un grupo de INSERTs de una misma tabla.
+    
+    Se ejecuta en los procesos del pool de export_tables; retorna un DataFrame,
+    vacío si ningún INSERT tenía filas válidas.
+    """
+    arrays = read_values_texts(values_texts, len(columns), column_types)
+    if arrays is None:
+        return pd.DataFrame()
+    
+    return create_dataframe(dict(zip(columns, arrays)), columns, column_types)
+
 
 def extract_table_data_from_sql_dump(sql_file, target_table):
     """
     Extrae los nombres de columnas (del CREATE TABLE) y los valores (del INSERT INTO)
     desde un archivo dump de MySQL, adaptado específicamente para el formato mostrado.
+    
+    Carga todas las filas en memoria; para dumps grandes usar export_table.
     """
-    # Leer el contenido del archivo SQL completo
+    table_data = []
+    columns = []
+    
     try:
-        with open(sql_file, "r", encoding="utf-8") as f:
-            sql_content = f.read()
+        for columns, batch in iter_table_batches(sql_file, target_table):
+            # NULL vuelve a ser None también en las columnas numéricas
+            values = [np.where(pd.isna(array), None, np.asarray(array, dtype=object)).tolist()
+                      for array in batch.values()]
+            table_data.extend(list(row) for row in zip(*values))
     except FileNotFoundError:
         print(f"Error: El archivo {sql_file} no existe.")
         return [], []
     except Exception as e:
         print(f"Error al leer el archivo SQL: {e}")
         return [], []
+    
+    return table_data, columns
 
-    # Extraer columnas del CREATE TABLE
-    columns = []
-    create_table_pattern = re.compile(rf"CREATE TABLE `?{target_table}`?\s*\((.*?)\);", re.DOTALL)
-    create_match = create_table_pattern.search(sql_content)
+
+def export_table(sql_file, target_table, output_file, output_format="csv", batch_size=BATCH_SIZE,
+                 chunk_size=CHUNK_SIZE):
+    """
+    Extrae una tabla del dump y la escribe por lotes en CSV o Parquet con memoria acotada.
     
-    if create_match:
-        print(f"🛠️ Detectado CREATE TABLE para: {target_table}")
-        # Obtener el contenido entre paréntesis del CREATE TABLE
-        create_content = create_match.group(1)
-        
-        # Dividir por líneas para procesar cada definición de columna
-        column_lines = [line.strip() for line in create_content.split('\n') if line.strip()]
-        
-        for line in column_lines:
-            # Ignorar líneas que no son definiciones de columnas (PRIMARY KEY, etc.)
-            if line.startswith('`') and not line.upper().startswith(('PRIMARY', 'KEY', 'CONSTRAINT', 'UNIQUE', 'INDEX', 'FOREIGN')):
-                # Extraer el nombre de la columna (está entre backticks)
-                column_match = re.match(r'`([^`]+)`', line)
-                if column_match:
-                    columns.append(column_match.group(1))
-        
-        print(f"📊 Columnas extraídas: {len(columns)}")
-    else:
-        print(f"⚠️ No se encontró la definición CREATE TABLE para: {target_table}")
+    Retorna el número de filas escritas y los tipos de datos del primer lote.
+    """
+    if output_format == "parquet" and pa is None:
+        raise ImportError("Se requiere pyarrow para escribir archivos Parquet")
     
-    # Extraer valores de INSERT INTO
-    table_data = []
-    insert_pattern = re.compile(rf"INSERT INTO `?{target_table}`?\s+VALUES\s+(.*?);", re.DOTALL)
-    insert_matches = insert_pattern.finditer(sql_content)
+    rows_written = 0
+    dtypes = None
+    writer = None
     
-    insert_count = 0
-    for match in insert_matches:
-        insert_count += 1
-        values_text = match.group(1)
-        
-        # Extraer cada conjunto de valores (entre paréntesis)
-        row_pattern = re.compile(r'\((.*?)\)', re.DOTALL)
-        for row_match in row_pattern.finditer(values_text):
-            row_values = []
-            current_value = ""
-            in_quotes = False
-            in_parenthesis = 0
+    try:
+        for columns, batch in iter_table_batches(sql_file, target_table, batch_size=batch_size,
+                                                 chunk_size=chunk_size):
+            df = create_dataframe(batch, columns)
+            if df.empty:
+                continue
             
-            # Parsear manualmente los valores respetando comillas y comas dentro de valores
-            for char in row_match.group(1) + ',':  # Agregar coma al final para procesar el último valor
-                if char == "'" and (not current_value or current_value[-1] != '\\'):
-                    in_quotes = not in_quotes
-                    current_value += char
-                elif char == '(' and not in_quotes:
-                    in_parenthesis += 1
-                    current_value += char
-                elif char == ')' and not in_quotes:
-                    in_parenthesis -= 1
-                    current_value += char
-                elif char == ',' and not in_quotes and in_parenthesis == 0:
-                    # Fin de un valor individual
-                    processed_value = process_value(current_value.strip())
-                    row_values.append(processed_value)
-                    current_value = ""
-                else:
-                    current_value += char
+            writer = write_batch(df, output_file, output_format, rows_written, writer)
+            if dtypes is None:
+                dtypes = df.dtypes
+            rows_written += len(df)
+    finally:
+        if writer is not None:
+            writer.close()
+    
+    return rows_written, dtypes
+
+
+def export_tables(sql_file, tables, output_folder, output_format="csv", workers=None,
+                  task_size=TASK_SIZE, chunk_size=CHUNK_SIZE):
+    """
+    Extrae varias tablas del dump en una sola lectura y escribe un archivo por tabla.
+    
+    El proceso principal solo separa las sentencias y agrupa los INSERTs de cada tabla
+    en tareas de unos task_size caracteres; un pool de procesos las tokeniza y tipa.
+    Los resultados se escriben en el orden del dump y como mucho dos tareas por proceso
+    quedan pendientes, así que la memoria sigue acotada. tables=None extrae todas.
+    
+    Retorna un diccionario tabla -> (archivo, filas escritas).
+    """
+    if output_format == "parquet" and pa is None:
+        raise ImportError("Se requiere pyarrow para escribir archivos Parquet")
+    
+    workers = workers or os.cpu_count() or 1
+    extension = "parquet" if output_format == "parquet" else "csv"
+    results = {}
+    writers = {}
+    groups = {}
+    pending = deque()
+    
+    def write_ready(limit):
+        # Escribir en orden de envío mantiene el orden de las filas de cada tabla
+        while len(pending) > limit:
+            table, future = pending.popleft()
+            df = future.result()
+            if df.empty:
+                continue
+            output_file, rows_written = results[table]
+            writers[table] = write_batch(df, output_file, output_format, rows_written, writers.get(table))
+            results[table] = (output_file, rows_written + len(df))
+    
+    def submit(pool, table):
+        columns, column_types, values_texts, _ = groups.pop(table)
+        results.setdefault(table, (os.path.join(output_folder, f"{table}.{extension}"), 0))
+        pending.append((table, pool.submit(parse_values_task, columns, column_types, values_texts)))
+        write_ready(2 * workers)
+    
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for table, columns, column_types, values_text in iter_table_inserts(sql_file, tables,
+                                                                               chunk_size=chunk_size):
+                group = groups.get(table)
+                if group is not None and group[0] is not columns:
+                    # La tabla se redefinió con otro CREATE TABLE
+                    submit(pool, table)
+                    group = None
+                if group is None:
+                    group = groups[table] = [columns, column_types, [], 0]
+                
+                group[2].append(values_text)
+                group[3] += len(values_text)
+                if group[3] >= task_size:
+                    submit(pool, table)
             
-            # Verificar que tengamos el número correcto de columnas
-            if columns and len(row_values) == len(columns):
-                table_data.append(row_values)
-            elif row_values:  # Tenemos valores pero no coincide el número con las columnas
-                print(f"⚠️ Advertencia: Conjunto de valores con longitud diferente. Columnas: {len(columns)}, Valores: {len(row_values)}")
-    
-    if insert_count > 0:
-        print(f"📥 Detectados {insert_count} INSERTs para la tabla: {target_table}")
-        print(f"✅ Datos extraídos: {len(table_data)} filas")
-    else:
-        print(f"⚠️ No se encontraron sentencias INSERT INTO para la tabla: {target_table}")
-        
-    return table_data, columns
+            for table in list(groups):
+                submit(pool, table)
+            write_ready(0)
+    finally:
+        for writer in writers.values():
+            if writer is not None:
+                writer.close()
+    
+    return results
+
+
+def write_batch(df, output_file, output_format, rows_written, writer=None):
+    """
+    Escribe un lote en CSV (con encabezado solo en el primero) o Parquet.
+    
+    Retorna el ParquetWriter abierto, o None para CSV.
+    """
+    if output_format == "parquet":
+        if writer is None:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            writer = pq.ParquetWriter(output_file, table.schema)
+        else:
+            # Forzar el esquema del primer lote en los siguientes
+            table = pa.Table.from_pandas(df, schema=writer.schema, preserve_index=False)
+        writer.write_table(table)
+        return writer
+    
+    df.to_csv(output_file, mode="w" if rows_written == 0 else "a", header=rows_written == 0, index=False)
+    return None
 
 
 def process_value(value):
@@ -110,7 +804,7 @@ def process_value(value):
     if value == 'NULL':
         return None
     elif value.startswith("'") and value.endswith("'"):
-        return value[1:-1]  # Quitar comillas
+        return unescape_string(value)  # Quitar comillas y resolver escapes
     elif value.lower() == 'true':
         return True
     elif value.lower() == 'false':
@@ -123,44 +817,29 @@ def process_value(value):
             return value
 
 
-def create_dataframe(data, columns):
+def create_dataframe(data, columns, column_types=None):
     """
     Convierte los datos extraídos en un DataFrame preservando los tipos de datos originales.
+    
+    data puede ser una lista de filas o un diccionario columna -> arreglo de valores.
+    Con column_types (tipos del CREATE TABLE, alineados con columns) el tipo de cada
+    columna se decide por su declaración; las columnas sin tipo conocido se tipan a
+    partir de una muestra de sus valores.
     """
-    if not data or not columns:
+    if data is None or len(data) == 0 or not columns:
         print("⚠️ No hay datos o columnas para crear el DataFrame")
         return pd.DataFrame()
-        
+    
     try:
         # Crear DataFrame con los datos extraídos
         df = pd.DataFrame(data, columns=columns)
         
-        # Convertir solo columnas que son claramente numéricas
-        for col in df.columns:
-            # Verificar si la columna parece ser numérica (>50% de valores son números)
-            numeric_count = sum(1 for val in df[col] if isinstance(val, (int, float)) or 
-                               (isinstance(val, str) and val.replace('.', '', 1).isdigit()))
-            
-            if numeric_count > len(df[col]) * 0.5:  # Si más del 50% son numéricos
-                try:
-                    df[col] = pd.to_numeric(df[col], errors="ignore")
-                except:
-                    pass  # Mantener como está si falla la conversión
-            
-            # Intentar convertir columnas que parecen fechas (tienen 'date', 'time', 'year' en su nombre)
-            elif any(date_indicator in col.lower() for date_indicator in ['date', 'time', 'year', 'month', 'day']):
-                try:
-                    # Solo intentar convertir si al menos el 50% de los valores no son nulos
-                    non_null_count = df[col].count()
-                    if non_null_count > len(df[col]) * 0.5:
-                        pd.to_datetime(df[col], errors="ignore")
-                except:
-                    pass  # Mantener como está si falla la conversión
-        
-        # Asegurarnos de que None no se convierte a 'None' sino que se mantiene como None/NaN
+        sql_types = dict(zip(columns, column_types or []))
         for col in df.columns:
-            if df[col].dtype == object:  # Solo para columnas de tipo objeto/string
-                df[col] = df[col].where(pd.notna(df[col]), None)
+            kind = SQL_TYPE_KINDS.get(sql_types.get(col))
+            if kind is None:
+                kind = infer_column_kind(df[col])
+            df[col] = type_column(df[col], kind)
         
         return df
     except Exception as e:
@@ -170,40 +849,33 @@ def create_dataframe(data, columns):
 
 # ------------------ Ejecución principal ------------------
 if __name__ == "__main__":
-    print(f"🔍 Buscando tabla '{TARGET_TABLE}' en el archivo '{SQL_FILE}'...")
+    parser = argparse.ArgumentParser(description="Extrae tablas de un dump de MySQL a CSV o Parquet")
+    parser.add_argument("--sql", default=SQL_FILE, help="Archivo SQL con el dump")
+    parser.add_argument("--tables", nargs="+", default=[TARGET_TABLE], help="Tablas a extraer")
+    parser.add_argument("--all-tables", action="store_true", help="Extraer todas las tablas del dump")
+    parser.add_argument("--output-dir", help="Carpeta de salida (por defecto la del archivo SQL)")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv", help="Formato de salida")
+    parser.add_argument("--workers", type=int, help="Procesos para tokenizar (por defecto uno por CPU)")
+    args = parser.parse_args()
+    
+    tables = None if args.all_tables else args.tables
+    print(f"🔍 Buscando tablas {'(todas)' if tables is None else tables} en el archivo '{args.sql}'...")
     
     # Validar que el archivo exista
-    try:
-        with open(SQL_FILE, "r", encoding="utf-8") as f:
-            pass
-    except FileNotFoundError:
-        print(f"Error: El archivo {SQL_FILE} no existe. Verifica la ruta.")
+    if not os.path.exists(args.sql):
+        print(f"Error: El archivo {args.sql} no existe. Verifica la ruta.")
         exit(1)
     
-    # Extrae datos y columnas desde el archivo SQL
-    data, columns = extract_table_data_from_sql_dump(SQL_FILE, TARGET_TABLE)
-
-    if data and columns:
-        # Crea un DataFrame con los datos extraídos
-        df = create_dataframe(data, columns)
-
-        if not df.empty:
-            # Muestra resumen
-            print("\n✅ DataFrame creado con shape:", df.shape)
-            print("\nPrimeras filas del DataFrame:")
-            print(df.head())
-            print("\nInformación de tipos de datos:")
-            print(df.dtypes)
-
-            # Obtener la ruta de la carpeta donde está el archivo SQL
-            output_folder = os.path.dirname(SQL_FILE)
-            output_file = os.path.join(output_folder, f"{TARGET_TABLE}.csv")
-            
-            # Guarda el DataFrame como CSV
-            df.to_csv(output_file, index=False)
-            print(f"\n💾 Datos guardados en {output_file}")
+    # Por defecto los archivos se guardan junto al archivo SQL
+    output_folder = args.output_dir or os.path.dirname(args.sql)
+    os.makedirs(output_folder or ".", exist_ok=True)
+    
+    # Una sola lectura del dump; cada tabla se escribe por lotes en su propio archivo
+    results = export_tables(args.sql, tables, output_folder, output_format=args.format, workers=args.workers)
+    
+    for table in (tables if tables is not None else results):
+        if table in results and results[table][1]:
+            output_file, rows_written = results[table]
+            print(f"\n✅ {table}: {rows_written} filas guardadas en {output_file}")
         else:
-            print("⚠️ El DataFrame está vacío.")
-    else:
-        print("⚠️ No se extrajeron datos o columnas. Verifica que el nombre de la tabla sea correcto.")
-        print(f"    La tabla buscada fue: '{TARGET_TABLE}'")
\ No newline at end of file
+            print(f"\n⚠️ No se extrajeron datos de la tabla '{table}'. Verifica que el nombre sea correcto.")
@@ -3,7 +3,8 @@ from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 
 # Import routers
-from app.routers import financial_kpis, sales_analysis, accounts, expenses, ml_predictions
+from app.routers import financial_kpis, sales_analysis, accounts, expenses, ml_predictions, admin, export
+from app.routers.errors import register_error_handlers
 
 # Create FastAPI instance
 app = FastAPI(
@@ -21,12 +22,17 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Map service errors (unknown tenant, busy executor) to HTTP responses
+register_error_handlers(app)
+
 # Include routers
 app.include_router(financial_kpis.router, prefix="/api/kpis/financial", tags=["Financial KPIs"])
 app.include_router(sales_analysis.router, prefix="/api/kpis/sales", tags=["Sales Analysis"])
 app.include_router(accounts.router, prefix="/api/kpis/accounts", tags=["Accounts Receivable/Payable"])
 app.include_router(expenses.router, prefix="/api/kpis/expenses", tags=["Expenses Analysis"])
 app.include_router(ml_predictions.router, prefix="/api/ml", tags=["ML Predictions"])
+app.include_router(export.router, prefix="/api/export", tags=["Export"])
+app.include_router(admin.router, prefix="/api/admin", tags=["Admin"])
 
 @app.get("/", tags=["Root"])
 async def root():
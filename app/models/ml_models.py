@@ -5,6 +5,8 @@ class SalesForecastResponse(BaseModel):
     """Model for sales forecast response"""
     forecast_periods: List[str]
     forecast_values: List[float]
+    forecast_lower: Optional[List[float]] = None
+    forecast_upper: Optional[List[float]] = None
     historical_periods: List[str]
     historical_values: List[float]
 
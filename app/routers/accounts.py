@@ -1,77 +1,97 @@
 from fastapi import APIRouter, Query, HTTPException
 from typing import Optional, List, Dict, Any
-from app.services.financial_kpis_service import financial_kpis_service
+from app.services.executors import kpi_executor
+from app.services.financial_kpis_service import FinancialKPIsService
+from app.services.tenant_registry import tenant_registry
+from app.routers.errors import HANDLED_ERRORS
 
 router = APIRouter()
 
+def _accounts_receivable(service, year, month):
+    # Only the receivable side is computed: its own periods, not the union with payables
+    analysis = service.accounts_analysis(year=year, month=month)
+    
+    # Extract receivables data
+    periods = analysis.receivable_periods
+    receivables_by_period = analysis.accounts_receivable
+    
+    # Format response
+    return {
+        "periods": periods,
+        "receivables": [receivables_by_period.get(period, 0) for period in periods],
+        "avg_receivables": analysis.avg_accounts_receivable,
+        "days_sales_outstanding": analysis.days_sales_outstanding,
+        "receivables_turnover": analysis.receivables_turnover
+    }
+
+def _accounts_payable(service, year, month):
+    # Only the payable side is computed: its own periods, not the union with receivables
+    analysis = service.accounts_analysis(year=year, month=month)
+    
+    # Extract payables data
+    periods = analysis.payable_periods
+    payables_by_period = analysis.accounts_payable
+    
+    # Format response
+    return {
+        "periods": periods,
+        "payables": [payables_by_period.get(period, 0) for period in periods],
+        "avg_payables": analysis.avg_accounts_payable,
+        "days_payables_outstanding": analysis.days_payables_outstanding,
+        "payables_turnover": analysis.payables_turnover
+    }
+
 @router.get("/")
 async def get_accounts_analysis(
     year: Optional[int] = Query(None, description="Filter by year"),
-    month: Optional[int] = Query(None, description="Filter by month")
+    month: Optional[int] = Query(None, description="Filter by month"),
+    tenant_id: Optional[str] = Query(None, description="Tenant (company) whose data is analyzed")
 ):
     """
     Get accounts receivable and payable analysis
     """
     try:
-        result = financial_kpis_service.analyze_accounts_receivable_payable(year=year, month=month)
+        result = await kpi_executor.run(
+            tenant_registry.run, tenant_id, FinancialKPIsService.analyze_accounts_receivable_payable, year=year, month=month
+        )
         return result
+    except HANDLED_ERRORS:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error analyzing accounts: {str(e)}")
 
 @router.get("/receivable")
 async def get_accounts_receivable(
     year: Optional[int] = Query(None, description="Filter by year"),
-    month: Optional[int] = Query(None, description="Filter by month")
+    month: Optional[int] = Query(None, description="Filter by month"),
+    tenant_id: Optional[str] = Query(None, description="Tenant (company) whose data is analyzed")
 ):
     """
     Get accounts receivable analysis
     """
     try:
-        # Get all accounts data
-        result = financial_kpis_service.analyze_accounts_receivable_payable(year=year, month=month)
-        
-        # Extract receivables data
-        periods = result["periods"]
-        receivables_by_period = result["accounts_receivable"]
-        
-        # Format response
-        response = {
-            "periods": periods,
-            "receivables": [receivables_by_period.get(period, 0) for period in periods],
-            "avg_receivables": result["avg_accounts_receivable"],
-            "days_sales_outstanding": result["days_sales_outstanding"],
-            "receivables_turnover": result["receivables_turnover"]
-        }
+        response = await kpi_executor.run(tenant_registry.run, tenant_id, _accounts_receivable, year, month)
         
         return response
+    except HANDLED_ERRORS:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error analyzing accounts receivable: {str(e)}")
 
 @router.get("/payable")
 async def get_accounts_payable(
     year: Optional[int] = Query(None, description="Filter by year"),
-    month: Optional[int] = Query(None, description="Filter by month")
+    month: Optional[int] = Query(None, description="Filter by month"),
+    tenant_id: Optional[str] = Query(None, description="Tenant (company) whose data is analyzed")
 ):
     """
     Get accounts payable analysis
     """
     try:
-        # Get all accounts data
-        result = financial_kpis_service.analyze_accounts_receivable_payable(year=year, month=month)
-        
-        # Extract payables data
-        periods = result["periods"]
-        payables_by_period = result["accounts_payable"]
-        
-        # Format response
-        response = {
-            "periods": periods,
-            "payables": [payables_by_period.get(period, 0) for period in periods],
-            "avg_payables": result["avg_accounts_payable"],
-            "days_payables_outstanding": result["days_payables_outstanding"],
-            "payables_turnover": result["payables_turnover"]
-        }
+        response = await kpi_executor.run(tenant_registry.run, tenant_id, _accounts_payable, year, month)
         
         return response
+    except HANDLED_ERRORS:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error analyzing accounts payable: {str(e)}")
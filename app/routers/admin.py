@@ -0,0 +1,122 @@
+from fastapi import APIRouter, Body, Query, HTTPException
+from typing import Optional, List, Dict, Any
+from app.services.data_loader import DataLoader, data_loader
+from app.services.dataset_reloader import dataset_reloader
+from app.services.executors import kpi_executor, ml_executor
+from app.services.financial_kpis_service import financial_kpis_service
+from app.services.ml_service import ml_service
+from app.services.tenant_registry import tenant_registry
+from app.routers.errors import HANDLED_ERRORS
+
+router = APIRouter()
+
+@router.get("/cache")
+async def get_cache_stats():
+    """
+    Get KPI response cache size and hit/miss counters
+    """
+    try:
+        stats = financial_kpis_service.cache.get_stats()
+        stats["dataset_version"] = data_loader.version
+        return stats
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error getting cache stats: {str(e)}")
+
+@router.delete("/cache")
+async def clear_cache():
+    """
+    Drop every cached KPI response
+    """
+    try:
+        financial_kpis_service.cache.clear()
+        return {"message": "KPI response cache cleared"}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error clearing cache: {str(e)}")
+
+@router.get("/executors")
+async def get_executor_stats():
+    """
+    Get queue depth, throughput and latency of the KPI and ML executors
+    """
+    try:
+        return {
+            "kpi": kpi_executor.get_stats(),
+            "ml": ml_executor.get_stats()
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error getting executor stats: {str(e)}")
+
+@router.get("/models")
+async def get_model_stats():
+    """
+    Get the models loaded in memory and how often they were reloaded
+    """
+    try:
+        return ml_service.models.get_stats()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error getting model stats: {str(e)}")
+
+@router.post("/reload")
+async def reload_dataset(
+    force: bool = Query(False, description="Reload even if the balances file did not change"),
+    tenant_id: Optional[str] = Query(None, description="Tenant (company) whose dataset is reloaded")
+):
+    """
+    Reload the balances dataset in the background without restarting
+    
+    A tenant's dataset is reloaded before responding instead, since only the
+    default dataset has a background reloader.
+    """
+    try:
+        if tenant_id is not None:
+            result = await kpi_executor.run(tenant_registry.update, tenant_id, DataLoader.reload, force=force)
+            message = "Tenant dataset reloaded" if result["reloaded"] else "Tenant dataset already up to date"
+            return {"message": message, "tenant_id": tenant_id, **result}
+        
+        started = dataset_reloader.trigger(force=force)
+        message = "Dataset reload started in background" if started else "Dataset reload already in progress"
+        return {"message": message, **dataset_reloader.get_status()}
+    except HANDLED_ERRORS:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error reloading dataset: {str(e)}")
+
+@router.get("/reload")
+async def get_reload_status():
+    """
+    Get the dataset version and the outcome of the last reload
+    """
+    try:
+        return dataset_reloader.get_status()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error getting reload status: {str(e)}")
+
+@router.post("/periods")
+async def append_periods(
+    rows: List[Dict[str, Any]] = Body(..., description="Balances rows with the columns of the balances CSV"),
+    persist: bool = Query(True, description="Also append the rows to the balances CSV"),
+    tenant_id: Optional[str] = Query(None, description="Tenant (company) whose dataset gets the rows")
+):
+    """
+    Append balances rows of new periods without reloading the whole dataset
+    """
+    try:
+        return await kpi_executor.run(
+            tenant_registry.update, tenant_id, DataLoader.append_periods, rows, persist=persist
+        )
+    except HANDLED_ERRORS:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error appending periods: {str(e)}")
+
+@router.get("/tenants")
+async def get_tenant_stats():
+    """
+    Get the tenants whose datasets are loaded, their memory and evictions
+    """
+    try:
+        return tenant_registry.get_stats()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error getting tenant stats: {str(e)}")
@@ -0,0 +1,20 @@
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from app.services.executors import ExecutorBusyError
+from app.services.tenant_registry import UnknownTenantError
+
+# Answered by the handlers below; the routes' catch-all 500s let them through
+HANDLED_ERRORS = (UnknownTenantError, ExecutorBusyError)
+
+async def unknown_tenant_handler(request: Request, exc: UnknownTenantError):
+    return JSONResponse(status_code=404, content={"detail": str(exc)})
+
+async def executor_busy_handler(request: Request, exc: ExecutorBusyError):
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"})
+
+def register_error_handlers(app: FastAPI):
+    """
+    Map the service errors every router can raise to their HTTP responses
+    """
+    app.add_exception_handler(UnknownTenantError, unknown_tenant_handler)
+    app.add_exception_handler(ExecutorBusyError, executor_busy_handler)
@@ -1,62 +1,86 @@
 from fastapi import APIRouter, Query, HTTPException
 from typing import Optional, List, Dict, Any
-from app.services.financial_kpis_service import financial_kpis_service
+from app.services.executors import kpi_executor
+from app.services.financial_kpis_service import FinancialKPIsService
+from app.services.tenant_registry import tenant_registry
+from app.routers.errors import HANDLED_ERRORS
 
 router = APIRouter()
 
+def _expenses_by_period(service):
+    # Only the period series are computed, not the supplier ranking
+    analysis = service.expenses_analysis()
+    
+    # Extract period data
+    periods = analysis.periods
+    expenses_by_period = analysis.total_expenses
+    
+    # Format response
+    return {
+        "periods": periods,
+        "expenses": [expenses_by_period.get(period, 0) for period in periods],
+        "total_expenses": analysis.total_expenses_amount
+    }
+
+def _expenses_by_supplier(service, top_n):
+    # Only the supplier ranking is computed
+    analysis = service.expenses_analysis(top_n=top_n)
+    
+    # Extract supplier data
+    top_suppliers = analysis.top_suppliers
+    
+    return {"top_suppliers": top_suppliers}
+
 @router.get("/")
 async def get_expenses_analysis(
     year: Optional[int] = Query(None, description="Filter by year"),
     month: Optional[int] = Query(None, description="Filter by month"),
-    top_n: int = Query(10, description="Number of top suppliers to return")
+    top_n: int = Query(10, description="Number of top suppliers to return"),
+    tenant_id: Optional[str] = Query(None, description="Tenant (company) whose data is analyzed")
 ):
     """
     Get expenses analysis by supplier
     """
     try:
-        result = financial_kpis_service.analyze_expenses_by_supplier(year=year, month=month, top_n=top_n)
+        result = await kpi_executor.run(
+            tenant_registry.run, tenant_id, FinancialKPIsService.analyze_expenses_by_supplier,
+            year=year, month=month, top_n=top_n
+        )
         return result
+    except HANDLED_ERRORS:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error analyzing expenses: {str(e)}")
 
 @router.get("/by-period")
-async def get_expenses_by_period():
+async def get_expenses_by_period(
+    tenant_id: Optional[str] = Query(None, description="Tenant (company) whose data is analyzed")
+):
     """
     Get expenses data grouped by period for trend analysis
     """
     try:
-        # Get all expenses data
-        result = financial_kpis_service.analyze_expenses_by_supplier()
-        
-        # Extract period data
-        periods = result["periods"]
-        expenses_by_period = result["total_expenses"]
-        
-        # Format response
-        response = {
-            "periods": periods,
-            "expenses": [expenses_by_period.get(period, 0) for period in periods],
-            "total_expenses": result["total_expenses_amount"]
-        }
+        response = await kpi_executor.run(tenant_registry.run, tenant_id, _expenses_by_period)
         
         return response
+    except HANDLED_ERRORS:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error analyzing expenses by period: {str(e)}")
 
 @router.get("/by-supplier")
 async def get_expenses_by_supplier(
-    top_n: int = Query(10, description="Number of top suppliers to return")
+    top_n: int = Query(10, description="Number of top suppliers to return"),
+    tenant_id: Optional[str] = Query(None, description="Tenant (company) whose data is analyzed")
 ):
     """
     Get expenses data grouped by supplier
     """
     try:
-        # Get all expenses data
-        result = financial_kpis_service.analyze_expenses_by_supplier(top_n=top_n)
-        
-        # Extract supplier data
-        top_suppliers = result["top_suppliers"]
+        response = await kpi_executor.run(tenant_registry.run, tenant_id, _expenses_by_supplier, top_n)
         
-        return {"top_suppliers": top_suppliers}
+        return response
+    except HANDLED_ERRORS:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error analyzing expenses by supplier: {str(e)}")
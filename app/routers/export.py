@@ -0,0 +1,106 @@
+from fastapi import APIRouter, Query, HTTPException
+from fastapi.responses import StreamingResponse
+from typing import Optional, List
+from app.services.data_loader import CUBE_PREFIXES
+from app.services.executors import kpi_executor
+from app.services import export_service
+from app.services.export_service import ExportFormatUnavailable
+from app.services.tenant_registry import tenant_registry
+from app.routers.errors import HANDLED_ERRORS
+
+router = APIRouter()
+
+def _released(stream, tenant):
+    # Started right away, so closing it (or dropping it unsent) runs the finally
+    try:
+        yield b""
+        yield from stream
+    finally:
+        tenant_registry.release(tenant)
+
+def _streaming_response(chunks, fmt, filename, tenant=None):
+    # The tenant stays in use, and so loaded, until the stream ends
+    try:
+        stream = export_service.encode(chunks, fmt)
+    except Exception:
+        if tenant is not None:
+            tenant_registry.release(tenant)
+        raise
+    
+    if tenant is not None:
+        stream = _released(stream, tenant)
+        next(stream)
+    return StreamingResponse(
+        stream,
+        media_type=export_service.FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{fmt}"'}
+    )
+
+@router.get("/balances")
+async def export_balances(
+    fmt: str = Query("ndjson", alias="format", description="Export format: ndjson or arrow"),
+    account_type: Optional[str] = Query(None, description="Filter by account type"),
+    year: Optional[int] = Query(None, description="Filter by year"),
+    month: Optional[int] = Query(None, description="Filter by month"),
+    third_party_id: Optional[int] = Query(None, description="Filter by third party ID"),
+    code_prefix: Optional[str] = Query(None, description="Filter by account code prefix"),
+    chunk_rows: int = Query(export_service.CHUNK_ROWS, ge=1, le=1_000_000, description="Rows per streamed chunk"),
+    tenant_id: Optional[str] = Query(None, description="Tenant (company) whose data is exported")
+):
+    """
+    Stream the filtered balances rows as NDJSON or an Arrow IPC stream
+    """
+    try:
+        # Loading a tenant may parse its data, so it runs off the event loop
+        tenant, dataset = await kpi_executor.run(tenant_registry.acquire, tenant_id)
+        chunks = export_service.balance_rows(
+            dataset,
+            chunk_rows,
+            account_type=account_type,
+            year=year,
+            month=month,
+            third_party_id=third_party_id,
+            code_prefix=code_prefix
+        )
+        return _streaming_response(chunks, fmt, "balances", tenant)
+    except HANDLED_ERRORS:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ExportFormatUnavailable as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error exporting balances: {str(e)}")
+
+@router.get("/series")
+async def export_series(
+    fmt: str = Query("ndjson", alias="format", description="Export format: ndjson or arrow"),
+    prefix: List[str] = Query(list(CUBE_PREFIXES), description="Account code prefixes to include"),
+    by_third_party: bool = Query(False, description="One series per third party"),
+    year: Optional[int] = Query(None, description="Filter by year"),
+    month: Optional[int] = Query(None, description="Filter by month"),
+    third_party_id: Optional[int] = Query(None, description="Filter by third party ID"),
+    chunk_rows: int = Query(export_service.CHUNK_ROWS, ge=1, le=1_000_000, description="Rows per streamed chunk"),
+    tenant_id: Optional[str] = Query(None, description="Tenant (company) whose data is exported")
+):
+    """
+    Stream debit, credit and final balance per account prefix and period
+    """
+    try:
+        tenant, dataset = await kpi_executor.run(tenant_registry.acquire, tenant_id)
+        try:
+            series = await kpi_executor.run(
+                export_service.period_series, dataset, prefix,
+                by_third_party=by_third_party, year=year, month=month, third_party_id=third_party_id
+            )
+        finally:
+            tenant_registry.release(tenant)
+        return _streaming_response(export_service.frame_chunks(series, chunk_rows), fmt, "series")
+    except HANDLED_ERRORS:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ExportFormatUnavailable as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error exporting series: {str(e)}")
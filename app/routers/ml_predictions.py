@@ -1,63 +1,190 @@
-from fastapi import APIRouter, Query, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, Query, HTTPException
 from typing import Optional, List, Dict, Any
-from app.services.ml_service import ml_service
+from app.services.executors import ml_executor
+from app.services.ml_service import ml_service, FORECAST_MAX_HORIZON
+from app.services.training_jobs import training_jobs
+from app.routers.errors import HANDLED_ERRORS
 
-router = APIRouter()
+def reject_tenant(
+    tenant_id: Optional[str] = Query(None, description="Not supported: models are trained on the default dataset")
+):
+    # Models are trained on the default dataset only; answering a tenant with them would mix companies
+    if tenant_id is not None:
+        raise HTTPException(status_code=400, detail="ML endpoints do not support tenant_id; models are trained on the default dataset")
+
+router = APIRouter(dependencies=[Depends(reject_tenant)])
 
 @router.post("/train/sales-forecast")
 async def train_sales_forecast_model(
-    background_tasks: BackgroundTasks,
     force_retrain: bool = Query(False, description="Force retraining of the model")
 ):
     """
     Train a sales forecast model
     """
     try:
-        # Run training in background to avoid blocking the API
-        background_tasks.add_task(ml_service.train_sales_forecast_model, force_retrain=force_retrain)
-        return {"message": "Sales forecast model training started in background"}
+        # Run training in a worker process; an identical request joins the pending job, another one queues after it
+        job, created = training_jobs.submit('sales_forecast', force_retrain=force_retrain)
+        message = "Sales forecast model training started in background" if created else "Sales forecast model training already in progress"
+        return {"message": message, "job_id": job["job_id"], "status": job["status"]}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error training sales forecast model: {str(e)}")
 
 @router.get("/sales-forecast")
 async def get_sales_forecast(
-    periods: int = Query(3, description="Number of periods to forecast")
+    # Horizons beyond the cached FORECAST_MAX_HORIZON are forecast on demand
+    periods: int = Query(3, ge=1, description="Number of periods to forecast")
 ):
     """
     Get sales forecast
     """
     try:
-        result = ml_service.predict_sales(periods=periods)
+        result = await ml_executor.run(ml_service.predict_sales, periods=periods)
         if "error" in result:
             raise HTTPException(status_code=500, detail=result["error"])
         return result
+    except HANDLED_ERRORS:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error predicting sales: {str(e)}")
 
+@router.post("/train/sales-forecast/segments")
+async def train_segment_sales_forecasts(
+    force_retrain: bool = Query(False, description="Force retraining of the segment forecasts")
+):
+    """
+    Train sales forecasts per customer and per revenue sub-account
+    """
+    try:
+        # Run training in a worker process; an identical request joins the pending job, another one queues after it
+        job, created = training_jobs.submit('segment_forecast', force_retrain=force_retrain)
+        message = "Segment sales forecast training started in background" if created else "Segment sales forecast training already in progress"
+        return {"message": message, "job_id": job["job_id"], "status": job["status"]}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error training segment sales forecasts: {str(e)}")
+
+@router.get("/sales-forecast/segments")
+async def get_segment_sales_forecasts(
+    segment_type: Optional[str] = Query(None, description="Filter by segment type: third_party or account"),
+    segment_id: Optional[str] = Query(None, description="Filter by third party ID or account code"),
+    periods: int = Query(3, ge=1, le=FORECAST_MAX_HORIZON, description="Number of periods to forecast"),
+    offset: int = Query(0, ge=0, description="Number of segments to skip"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of segments to return")
+):
+    """
+    Get sales forecasts per customer and per revenue sub-account
+    """
+    try:
+        result = await ml_executor.run(
+            ml_service.predict_segment_sales,
+            segment_type=segment_type, segment_id=segment_id, periods=periods, offset=offset, limit=limit
+        )
+        if "error" in result:
+            raise HTTPException(status_code=500, detail=result["error"])
+        return result
+    except HANDLED_ERRORS:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error getting segment sales forecasts: {str(e)}")
+
 @router.post("/train/anomaly-detection")
 async def train_anomaly_detection_model(
-    background_tasks: BackgroundTasks,
     force_retrain: bool = Query(False, description="Force retraining of the model")
 ):
     """
     Train an anomaly detection model for cash flow
     """
     try:
-        # Run training in background to avoid blocking the API
-        background_tasks.add_task(ml_service.train_anomaly_detection_model, force_retrain=force_retrain)
-        return {"message": "Anomaly detection model training started in background"}
+        # Run training in a worker process; an identical request joins the pending job, another one queues after it
+        job, created = training_jobs.submit('anomaly_detection', force_retrain=force_retrain)
+        message = "Anomaly detection model training started in background" if created else "Anomaly detection model training already in progress"
+        return {"message": message, "job_id": job["job_id"], "status": job["status"]}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error training anomaly detection model: {str(e)}")
 
+@router.post("/update")
+async def update_models():
+    """
+    Update the sales forecast and anomaly detection models with new periods
+    """
+    try:
+        # Run the update in a worker process; a request while one is pending joins that job
+        job, created = training_jobs.submit('model_update')
+        message = "Model update started in background" if created else "Model update already in progress"
+        return {"message": message, "job_id": job["job_id"], "status": job["status"]}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error updating models: {str(e)}")
+
+@router.get("/jobs")
+async def list_training_jobs():
+    """
+    List recent training jobs, newest first
+    """
+    try:
+        return {"jobs": training_jobs.list_jobs()}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error listing training jobs: {str(e)}")
+
+@router.get("/jobs/{job_id}")
+async def get_training_job(job_id: str):
+    """
+    Get the status and result of a training job
+    """
+    job = training_jobs.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Training job {job_id} not found")
+    return job
+
+@router.post("/train/anomaly-detection/rows")
+async def train_row_anomaly_model(
+    force_retrain: bool = Query(False, description="Force retraining of the model")
+):
+    """
+    Train a multivariate anomaly detection model over account, third party and period rows
+    """
+    try:
+        # Run training in a worker process; an identical request joins the pending job, another one queues after it
+        job, created = training_jobs.submit('row_anomaly_detection', force_retrain=force_retrain)
+        message = "Row anomaly detection model training started in background" if created else "Row anomaly detection model training already in progress"
+        return {"message": message, "job_id": job["job_id"], "status": job["status"]}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error training row anomaly detection model: {str(e)}")
+
+@router.get("/anomaly-detection/rows")
+async def get_row_anomalies(
+    offset: int = Query(0, ge=0, description="Number of rows to skip"),
+    limit: int = Query(50, ge=1, le=1000, description="Maximum number of rows to return"),
+    only_anomalies: bool = Query(True, description="Return only rows flagged as anomalies"),
+    code_prefix: Optional[str] = Query(None, description="Filter by account code prefix"),
+    third_party_id: Optional[int] = Query(None, description="Filter by third party ID")
+):
+    """
+    Get the most anomalous account, third party and period rows
+    """
+    try:
+        result = await ml_executor.run(
+            ml_service.get_row_anomalies,
+            offset=offset, limit=limit, only_anomalies=only_anomalies,
+            code_prefix=code_prefix, third_party_id=third_party_id
+        )
+        if "error" in result:
+            raise HTTPException(status_code=500, detail=result["error"])
+        return result
+    except HANDLED_ERRORS:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error getting row anomalies: {str(e)}")
+
 @router.get("/anomaly-detection")
 async def get_anomaly_detection():
     """
     Get anomaly detection results for cash flow
     """
     try:
-        result = ml_service.detect_anomalies()
+        result = await ml_executor.run(ml_service.detect_anomalies)
         if "error" in result:
             raise HTTPException(status_code=500, detail=result["error"])
         return result
+    except HANDLED_ERRORS:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error detecting anomalies: {str(e)}")
@@ -1,63 +1,87 @@
 from fastapi import APIRouter, Query, HTTPException
 from typing import Optional, List, Dict, Any
-from app.services.financial_kpis_service import financial_kpis_service
+from app.services.executors import kpi_executor
+from app.services.financial_kpis_service import FinancialKPIsService
+from app.services.tenant_registry import tenant_registry
+from app.routers.errors import HANDLED_ERRORS
 
 router = APIRouter()
 
+def _sales_by_period(service):
+    # Only the period series are computed, not the customer ranking
+    analysis = service.sales_analysis()
+    
+    # Extract period data
+    periods = analysis.periods
+    sales_by_period = analysis.total_sales
+    growth_by_period = analysis.sales_growth
+    
+    # Format response
+    return {
+        "periods": periods,
+        "sales": [sales_by_period.get(period, 0) for period in periods],
+        "growth": [growth_by_period.get(period, 0) for period in periods]
+    }
+
+def _sales_by_customer(service, top_n):
+    # Only the customer ranking is computed, not the period growth
+    analysis = service.sales_analysis()
+    
+    # Extract customer data
+    top_customers = analysis.top_customers[:top_n]
+    
+    return {"top_customers": top_customers}
+
 @router.get("/")
 async def get_sales_analysis(
     year: Optional[int] = Query(None, description="Filter by year"),
     month: Optional[int] = Query(None, description="Filter by month"),
-    third_party_id: Optional[int] = Query(None, description="Filter by third party ID")
+    third_party_id: Optional[int] = Query(None, description="Filter by third party ID"),
+    tenant_id: Optional[str] = Query(None, description="Tenant (company) whose data is analyzed")
 ):
     """
     Get sales analysis including total sales, sales growth, and top customers
     """
     try:
-        result = financial_kpis_service.analyze_sales(year=year, month=month, third_party_id=third_party_id)
+        result = await kpi_executor.run(
+            tenant_registry.run, tenant_id, FinancialKPIsService.analyze_sales,
+            year=year, month=month, third_party_id=third_party_id
+        )
         return result
+    except HANDLED_ERRORS:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error analyzing sales: {str(e)}")
 
 @router.get("/by-period")
-async def get_sales_by_period():
+async def get_sales_by_period(
+    tenant_id: Optional[str] = Query(None, description="Tenant (company) whose data is analyzed")
+):
     """
     Get sales data grouped by period for trend analysis
     """
     try:
-        # Get all sales data
-        result = financial_kpis_service.analyze_sales()
-        
-        # Extract period data
-        periods = result["periods"]
-        sales_by_period = result["total_sales"]
-        growth_by_period = result["sales_growth"]
-        
-        # Format response
-        response = {
-            "periods": periods,
-            "sales": [sales_by_period.get(period, 0) for period in periods],
-            "growth": [growth_by_period.get(period, 0) for period in periods]
-        }
+        response = await kpi_executor.run(tenant_registry.run, tenant_id, _sales_by_period)
         
         return response
+    except HANDLED_ERRORS:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error analyzing sales by period: {str(e)}")
 
 @router.get("/by-customer")
 async def get_sales_by_customer(
-    top_n: int = Query(10, description="Number of top customers to return")
+    top_n: int = Query(10, description="Number of top customers to return"),
+    tenant_id: Optional[str] = Query(None, description="Tenant (company) whose data is analyzed")
 ):
     """
     Get sales data grouped by customer
     """
     try:
-        # Get all sales data
-        result = financial_kpis_service.analyze_sales()
-        
-        # Extract customer data
-        top_customers = result["top_customers"][:top_n]
+        response = await kpi_executor.run(tenant_registry.run, tenant_id, _sales_by_customer, top_n)
         
-        return {"top_customers": top_customers}
+        return response
+    except HANDLED_ERRORS:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error analyzing sales by customer: {str(e)}")
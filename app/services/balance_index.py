@@ -0,0 +1,170 @@
+import copy
+import numpy as np
+from functools import reduce
+
+_EMPTY = np.empty(0, dtype=np.intp)
+
+class CodePrefixTrie:
+    """
+    Prefix trie over account codes
+    
+    Row offsets are stored once, sorted by code, so every trie node only keeps
+    the [start, end) range of rows whose code starts with the node's prefix.
+    """
+    def __init__(self, codes):
+        codes = np.asarray(codes, dtype=object)
+        self.offsets = np.argsort(codes, kind='stable')
+        sorted_codes = codes[self.offsets]
+        
+        # Boundaries of each run of identical codes in sorted order
+        distinct, starts = np.unique(sorted_codes, return_index=True)
+        ends = np.append(starts[1:], len(sorted_codes))
+        
+        self.root = {'children': {}, 'range': [0, len(sorted_codes)]}
+        for code, start, end in zip(distinct, starts, ends):
+            node = self.root
+            for char in str(code):
+                child = node['children'].get(char)
+                if child is None:
+                    child = {'children': {}, 'range': [start, end]}
+                    node['children'][char] = child
+                else:
+                    # Codes are visited in sorted order, so ranges only grow to the right
+                    child['range'][1] = end
+                node = child
+    
+    def lookup(self, prefix):
+        """
+        Get row offsets of codes starting with prefix, in ascending row order
+        """
+        node = self.root
+        for char in prefix:
+            node = node['children'].get(char)
+            if node is None:
+                return _EMPTY
+        
+        start, end = node['range']
+        return np.sort(self.offsets[start:end])
+
+class BalanceIndex:
+    """
+    Secondary indexes over the account balances frame
+    
+    Each index maps a key to the sorted array of row offsets holding that key,
+    so filters are answered by intersecting offsets instead of scanning columns.
+    
+    Rows appended later get their own code trie (one per appended block) so
+    extending the index only touches the new rows.
+    """
+    def __init__(self, df):
+        self.size = len(df)
+        self.by_year = self._group_offsets(df, 'year')
+        self.by_period = self._group_offsets(df, ['year', 'month'])
+        self.by_month = self._group_offsets(df, 'month')
+        self.by_third_party = self._group_offsets(df, 'third_party_id')
+        self.by_account_type = self._group_offsets(df, 'name')
+        # (first row offset, trie) per block of rows
+        self.code_tries = [(0, CodePrefixTrie(df['code'].to_numpy()))]
+    
+    @staticmethod
+    def _group_offsets(df, keys, start=0):
+        if df.empty:
+            return {}
+        return {
+            key: offsets.astype(np.intp) + start
+            for key, offsets in df.groupby(keys, sort=False, observed=True).indices.items()
+        }
+    
+    @staticmethod
+    def _merge_offsets(index, appended):
+        merged = dict(index)
+        for key, offsets in appended.items():
+            # Appended offsets are all larger, so concatenating keeps them sorted
+            merged[key] = np.concatenate([index[key], offsets]) if key in index else offsets
+        return merged
+    
+    def extend(self, rows):
+        """
+        Build the index of this frame with rows appended at its end
+        
+        Only the appended rows are grouped; this index is left unchanged.
+        
+        Parameters:
+        -----------
+        rows : pandas.DataFrame
+            Rows appended after the last indexed row
+        
+        Returns:
+        --------
+        BalanceIndex
+            Index over size + len(rows) rows
+        """
+        start = self.size
+        extended = copy.copy(self)
+        extended.size = start + len(rows)
+        extended.by_year = self._merge_offsets(self.by_year, self._group_offsets(rows, 'year', start))
+        extended.by_period = self._merge_offsets(self.by_period, self._group_offsets(rows, ['year', 'month'], start))
+        extended.by_month = self._merge_offsets(self.by_month, self._group_offsets(rows, 'month', start))
+        extended.by_third_party = self._merge_offsets(
+            self.by_third_party, self._group_offsets(rows, 'third_party_id', start)
+        )
+        extended.by_account_type = self._merge_offsets(self.by_account_type, self._group_offsets(rows, 'name', start))
+        extended.code_tries = self.code_tries + [(start, CodePrefixTrie(rows['code'].to_numpy()))]
+        return extended
+    
+    def lookup_code_prefix(self, prefix):
+        """
+        Get row offsets of codes starting with prefix, in ascending row order
+        """
+        if len(self.code_tries) == 1:
+            return self.code_tries[0][1].lookup(prefix)
+        
+        # Blocks cover consecutive row ranges, so their results stay in order
+        return np.concatenate([trie.lookup(prefix) + start for start, trie in self.code_tries])
+    
+    def lookup(self, account_type=None, year=None, month=None, third_party_id=None, code_prefix=None):
+        """
+        Get row offsets matching every given criterion
+        
+        Parameters:
+        -----------
+        account_type : str, optional
+            Filter by account type (e.g., 'Activo', 'Pasivos')
+        year : int, optional
+            Filter by year
+        month : int, optional
+            Filter by month
+        third_party_id : int, optional
+            Filter by third party ID
+        code_prefix : str, optional
+            Filter by account code prefix (e.g., '4', '1.3')
+        
+        Returns:
+        --------
+        numpy.ndarray or None
+            Sorted row offsets, or None when no criterion was given
+        """
+        candidates = []
+        
+        if year and month:
+            candidates.append(self.by_period.get((year, month), _EMPTY))
+        elif year:
+            candidates.append(self.by_year.get(year, _EMPTY))
+        elif month:
+            candidates.append(self.by_month.get(month, _EMPTY))
+        
+        if account_type:
+            candidates.append(self.by_account_type.get(account_type, _EMPTY))
+        
+        if third_party_id:
+            candidates.append(self.by_third_party.get(third_party_id, _EMPTY))
+        
+        if code_prefix:
+            candidates.append(self.lookup_code_prefix(code_prefix))
+        
+        if not candidates:
+            return None
+        
+        # Intersect starting from the most selective offsets
+        candidates.sort(key=len)
+        return reduce(lambda left, right: np.intersect1d(left, right, assume_unique=True), candidates)
@@ -1,48 +1,1186 @@
 import pandas as pd
+import numpy as np
 import os
+import threading
+import time
 from pathlib import Path
+from app.services.balance_index import BalanceIndex
+from app.services import snapshot, sqlite_store
+
+# Account-code prefixes pre-aggregated in the cube. The empty prefix matches
+# every account and backs the all-accounts totals.
+CUBE_PREFIXES = ('', '1', '1.2', '1.3', '2.1', '2.2', '3', '4', '5', '6')
+
+# Storage modes for the balances table:
+# - memory: each process keeps a private copy (loaded from the snapshot when available)
+# - shared: numeric columns stay memory-mapped from the snapshot and are shared
+#   by every worker process on the host
+STORAGE_MODES = ('memory', 'shared')
+
+# Engines answering the queries:
+# - pandas: the table and its pre-aggregated cube live in each process
+# - sqlite: rows stay in a local SQLite database with indexes and aggregates
+#   are computed there with GROUP BY, so processes only hold query results
+BACKENDS = ('pandas', 'sqlite')
+
+# Dimensions kept in every cube slice
+CUBE_KEYS = ['year', 'month', 'period', 'third_party_id', 'third_party_type_id']
+
+# Values of every cube slice and their dtypes
+CUBE_VALUE_DTYPES = {
+    'debit_movement': 'float64',
+    'credit_movement': 'float64',
+    'final_balance': 'float64',
+    'final_balance_count': 'int64'
+}
+
+# Compact schema: low-cardinality strings become categoricals and calendar
+# fields use the narrowest integer type that holds them
+CATEGORICAL_COLUMNS = ['name', 'third_party_type_id', 'currency_id', 'code', 'period']
+CALENDAR_DTYPES = {'year': 'int16', 'month': 'int8', 'numeric_period': 'int32'}
+
+# Money columns that can be stored as fixed-point integers
+MONEY_COLUMNS = ['initial_balance', 'final_balance', 'debit_movement', 'credit_movement']
+
+class Dataset:
+    """
+    One loaded version of the balances table and the structures derived from it
+    
+    The secondary indexes and the cube are built on first use and never change
+    afterwards; a reload or an append builds a new Dataset instead of modifying
+    this one, so a request holding a Dataset keeps seeing consistent data.
+    """
+    def __init__(self, account_balances, version, money_scale=None, memory_report=None, source=None):
+        self.account_balances = account_balances
+        self.version = version
+        self.money_scale = money_scale
+        self.memory_report = memory_report
+        self.source = source
+        self.loaded_at = time.time()
+        self._lock = threading.RLock()
+        self._balance_index = None
+        self._account_cube = None
+        self._account_cube_frame = None
+    
+    @property
+    def balance_index(self):
+        """
+        Build and cache secondary indexes over account balances
+        """
+        if self._balance_index is None:
+            with self._lock:
+                if self._balance_index is None:
+                    self._balance_index = BalanceIndex(self.account_balances)
+        
+        return self._balance_index
+    
+    @property
+    def account_cube(self):
+        """
+        Build and cache the period x account-prefix x third party cube
+        
+        Returns:
+        --------
+        dict
+            Mapping of account-code prefix to a DataFrame with debit, credit and
+            final balance sums keyed by CUBE_KEYS
+        """
+        if self._account_cube is None:
+            with self._lock:
+                if self._account_cube is None:
+                    self._account_cube = self._build_account_cube(self.account_balances)
+        
+        return self._account_cube
+    
+    def _build_account_cube(self, df):
+        """
+        Aggregate account balances once per cube prefix
+        """
+        cube = {}
+        for prefix in CUBE_PREFIXES:
+            subset = df.take(self.balance_index.lookup(code_prefix=prefix)) if prefix else df
+            cube[prefix] = self._aggregate_cube_slice(subset)
+        
+        return cube
+    
+    def _aggregate_cube_slice(self, subset):
+        # Keep rows with missing keys so period totals match the raw data
+        aggregates = subset.groupby(CUBE_KEYS, dropna=False, observed=True).agg(
+            debit_movement=('debit_movement', 'sum'),
+            credit_movement=('credit_movement', 'sum'),
+            final_balance=('final_balance', 'sum'),
+            final_balance_count=('final_balance', 'count')
+        ).reset_index()
+        
+        # Fixed-point sums are exact; expose them as floats again
+        if self.money_scale:
+            for col in ['debit_movement', 'credit_movement', 'final_balance']:
+                aggregates[col] = aggregates[col].astype('float64') / self.money_scale
+        
+        return aggregates
+    
+    @property
+    def account_cube_frame(self):
+        """
+        All cube slices stacked in one frame with a 'prefix' column
+        
+        Lets a caller that needs several prefixes filter and aggregate them
+        in a single pass instead of once per prefix.
+        """
+        if self._account_cube_frame is None:
+            with self._lock:
+                if self._account_cube_frame is None:
+                    cube = self.account_cube
+                    frame = pd.concat(
+                        [slice_.assign(prefix=prefix) for prefix, slice_ in cube.items()],
+                        ignore_index=True
+                    )
+                    frame['prefix'] = frame['prefix'].astype(pd.CategoricalDtype(list(cube)))
+                    self._account_cube_frame = frame
+        
+        return self._account_cube_frame
+    
+    def warm_up(self):
+        """
+        Build every derived structure now instead of on first use
+        """
+        self.account_cube_frame
+        return self
+    
+    @property
+    def columns(self):
+        return list(self.account_balances.columns)
+    
+    @property
+    def row_count(self):
+        return len(self.account_balances)
+    
+    @property
+    def memory_bytes(self):
+        """
+        Bytes held by the table and the cube built so far
+        """
+        total = int(self.account_balances.memory_usage(deep=True, index=False).sum())
+        if self._account_cube is not None:
+            total += sum(int(cells.memory_usage(deep=True).sum()) for cells in self._account_cube.values())
+        if self._account_cube_frame is not None:
+            total += int(self._account_cube_frame.memory_usage(deep=True).sum())
+        return total
+    
+    def get_aggregates(self, prefixes='', year=None, month=None, third_party_id=None):
+        """
+        Cube rows of one or more prefixes; see DataLoader.get_aggregates
+        """
+        if isinstance(prefixes, str):
+            prefixes = (prefixes,)
+        
+        cube = self.account_cube
+        frames = [cube[prefix] for prefix in prefixes]
+        data = frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+        
+        if year:
+            data = data[data['year'] == year]
+        
+        if month:
+            data = data[data['month'] == month]
+        
+        if third_party_id:
+            data = data[data['third_party_id'] == third_party_id]
+        
+        return data
+    
+    def get_aggregates_by_prefix(self, prefixes=CUBE_PREFIXES, year=None, month=None, third_party_id=None):
+        """
+        Cube rows labeled by prefix; see DataLoader.get_aggregates_by_prefix
+        """
+        data = self.account_cube_frame
+        
+        mask = data['prefix'].isin(prefixes).to_numpy()
+        if year:
+            mask = mask & (data['year'] == year).to_numpy()
+        if month:
+            mask = mask & (data['month'] == month).to_numpy()
+        if third_party_id:
+            mask = mask & (data['third_party_id'] == third_party_id).to_numpy()
+        
+        return data[mask]
+    
+    def get_filtered_data(self, account_type=None, year=None, month=None, third_party_id=None, code_prefix=None):
+        """
+        Balances rows matching every criterion; see DataLoader.get_filtered_data
+        """
+        data = self.account_balances
+        
+        offsets = self.balance_index.lookup(
+            account_type=account_type,
+            year=year,
+            month=month,
+            third_party_id=third_party_id,
+            code_prefix=code_prefix
+        )
+        
+        if offsets is None:
+            return data
+        
+        return data.take(offsets)
+    
+    def iter_filtered_data(self, chunk_rows, account_type=None, year=None, month=None, third_party_id=None,
+                           code_prefix=None):
+        """
+        Matching balances rows in chunks; see DataLoader.iter_filtered_data
+        """
+        data = self.account_balances
+        
+        offsets = self.balance_index.lookup(
+            account_type=account_type,
+            year=year,
+            month=month,
+            third_party_id=third_party_id,
+            code_prefix=code_prefix
+        )
+        
+        # At least one chunk, even if empty, so the caller always gets the columns
+        if offsets is None:
+            for start in range(0, max(len(data), 1), chunk_rows):
+                yield data.iloc[start:start + chunk_rows]
+        else:
+            for start in range(0, max(len(offsets), 1), chunk_rows):
+                yield data.take(offsets[start:start + chunk_rows])
+    
+    def get_unique_values(self, column):
+        return self.account_balances[column].unique().tolist()
+    
+    def append(self, rows, version, memory_report=None, source=None):
+        """
+        Build the next Dataset with rows appended to this one
+        
+        The indexes are extended with the new rows only, and only the cube
+        cells of the periods present in rows are computed, from the rows of
+        those periods; every other cell is carried over. This Dataset is left
+        unchanged. The new table is a fresh copy, so memory-mapped columns of
+        this one end up in private memory.
+        
+        Parameters:
+        -----------
+        rows : pandas.DataFrame
+            Rows with the columns and dtypes of account_balances, except that
+            categorical columns hold plain values that may be new categories
+        version : int
+            Version of the new Dataset
+        memory_report : dict, optional
+            Memory report of the new Dataset
+        source : tuple, optional
+            Signature of the balances file the new Dataset matches
+        
+        Returns:
+        --------
+        Dataset
+            Dataset with the indexes and cube already built
+        """
+        df = self.account_balances
+        
+        # New categories go after the existing ones so existing codes stay valid
+        extended = {}
+        for col in df.columns:
+            if isinstance(df[col].dtype, pd.CategoricalDtype):
+                categories = df[col].cat.categories
+                added = pd.Index(rows[col].dropna().unique()).difference(categories)
+                if len(added):
+                    extended[col] = df[col].cat.add_categories(added.astype(categories.dtype))
+        if extended:
+            df = df.assign(**extended)
+        rows = rows.astype({
+            col: df[col].dtype for col in df.columns if isinstance(df[col].dtype, pd.CategoricalDtype)
+        })
+        
+        combined = pd.concat([df, rows], ignore_index=True)
+        balance_index = self.balance_index.extend(rows)
+        
+        # Rows of the touched periods, including ones loaded before when a period is extended
+        periods = list(rows[['year', 'month']].drop_duplicates().itertuples(index=False, name=None))
+        offsets = np.sort(np.concatenate([balance_index.by_period[period] for period in periods]))
+        affected = combined.take(offsets)
+        codes = affected['code'].astype(str)
+        
+        # Earlier cells of periods that already existed are replaced, not summed into
+        extended_periods = [period for period in periods if period in self.balance_index.by_period]
+        key_dtypes = {col: combined[col].dtype for col in CUBE_KEYS if col in extended}
+        
+        cube = {}
+        for prefix, cells in self.account_cube.items():
+            if extended_periods:
+                cells = cells[~pd.MultiIndex.from_frame(cells[['year', 'month']]).isin(extended_periods)]
+            if key_dtypes:
+                cells = cells.astype(key_dtypes)
+            
+            subset = affected[codes.str.startswith(prefix).to_numpy()] if prefix else affected
+            if not subset.empty:
+                cells = pd.concat([cells, self._aggregate_cube_slice(subset)], ignore_index=True)
+            cube[prefix] = cells
+        
+        dataset = Dataset(
+            combined, version, money_scale=self.money_scale, memory_report=memory_report, source=source
+        )
+        dataset._balance_index = balance_index
+        dataset._account_cube = cube
+        return dataset
+
+class SQLiteDataset:
+    """
+    One version of the balances table stored in a local SQLite database
+    
+    Offers the query methods of Dataset, but every call runs SQL against the
+    indexed table: aggregates are pushed down as GROUP BY queries returning
+    the same frames the pandas cube does. account_balances reads every row
+    and is only meant for model training.
+    """
+    money_scale = None
+    memory_report = None
+    
+    # Rows stay in the database file
+    memory_bytes = 0
+    
+    def __init__(self, db_path, version, source=None):
+        self.db_path = db_path
+        self.version = version
+        self.source = source
+        self.loaded_at = time.time()
+        self._local = threading.local()
+        self._column_dtypes = None
+    
+    @property
+    def connection(self):
+        # SQLite connections cannot be shared between threads
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite_store.connect(self.db_path)
+            self._local.connection = connection
+        
+        return connection
+    
+    @property
+    def column_dtypes(self):
+        if self._column_dtypes is None:
+            self._column_dtypes = sqlite_store.column_dtypes(self.connection)
+        return self._column_dtypes
+    
+    def _query(self, sql, params=()):
+        data = sqlite_store.read_frame(self.connection, sql, params)
+        
+        # Without rows every column comes back as object; use the declared types
+        if data.empty:
+            data = data.astype({col: self.column_dtypes[col] for col in data.columns if col in self.column_dtypes})
+        return data
+    
+    @staticmethod
+    def _cube_frame(data, extra_columns=()):
+        # Same columns, order and value dtypes as a slice of the pandas cube
+        return data[CUBE_KEYS + list(CUBE_VALUE_DTYPES) + list(extra_columns)].astype(CUBE_VALUE_DTYPES)
+    
+    @staticmethod
+    def _where(conditions):
+        conditions = [condition for condition in conditions if condition]
+        return f" WHERE {' AND '.join(conditions)}" if conditions else ""
+    
+    @staticmethod
+    def _filters(account_type=None, year=None, month=None, third_party_id=None):
+        conditions = []
+        params = []
+        for column, value in [('name', account_type), ('year', year), ('month', month), ('third_party_id', third_party_id)]:
+            if value:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+        return conditions, params
+    
+    def _aggregate_sql(self, prefixes, year=None, month=None, third_party_id=None):
+        conditions, params = self._filters(year=year, month=month, third_party_id=third_party_id)
+        prefix_sql, prefix_params = sqlite_store.prefix_condition(prefixes)
+        keys = ', '.join(CUBE_KEYS)
+        
+        # TOTAL returns 0.0 instead of NULL for groups without values, like pandas' sum
+        sql = (
+            f"SELECT {keys}, TOTAL(debit_movement) AS debit_movement, "
+            f"TOTAL(credit_movement) AS credit_movement, TOTAL(final_balance) AS final_balance, "
+            f"COUNT(final_balance) AS final_balance_count "
+            f"FROM {sqlite_store.TABLE}{self._where(conditions + [prefix_sql])} GROUP BY {keys}"
+        )
+        return sql, params + prefix_params
+    
+    def warm_up(self):
+        self.connection
+        return self
+    
+    @property
+    def columns(self):
+        return [row[1] for row in self.connection.execute(f"PRAGMA table_info({sqlite_store.TABLE})")]
+    
+    @property
+    def row_count(self):
+        return self.connection.execute(f"SELECT COUNT(*) FROM {sqlite_store.TABLE}").fetchone()[0]
+    
+    @property
+    def account_balances(self):
+        return self._query(f"SELECT * FROM {sqlite_store.TABLE} ORDER BY rowid")
+    
+    def get_aggregates(self, prefixes='', year=None, month=None, third_party_id=None):
+        """
+        Aggregate rows of one or more prefixes in SQL; see DataLoader.get_aggregates
+        """
+        if isinstance(prefixes, str):
+            prefixes = (prefixes,)
+        
+        sql, params = self._aggregate_sql(prefixes, year=year, month=month, third_party_id=third_party_id)
+        return self._cube_frame(self._query(f"{sql} ORDER BY {', '.join(CUBE_KEYS)}", params))
+    
+    def get_aggregates_by_prefix(self, prefixes=CUBE_PREFIXES, year=None, month=None, third_party_id=None):
+        """
+        Aggregate every prefix in one SQL statement; see DataLoader.get_aggregates_by_prefix
+        """
+        selects = []
+        params = []
+        for prefix in prefixes:
+            sql, prefix_params = self._aggregate_sql((prefix,), year=year, month=month, third_party_id=third_party_id)
+            selects.append(sql.replace("SELECT ", "SELECT ? AS prefix, ", 1))
+            params.extend([prefix] + prefix_params)
+        
+        data = self._cube_frame(self._query(" UNION ALL ".join(selects), params), extra_columns=['prefix'])
+        data['prefix'] = data['prefix'].astype(pd.CategoricalDtype(list(CUBE_PREFIXES)))
+        return data
+    
+    def get_filtered_data(self, account_type=None, year=None, month=None, third_party_id=None, code_prefix=None):
+        """
+        Balances rows matching every criterion; see DataLoader.get_filtered_data
+        """
+        conditions, params = self._filters(
+            account_type=account_type, year=year, month=month, third_party_id=third_party_id
+        )
+        if code_prefix:
+            prefix_sql, prefix_params = sqlite_store.prefix_condition((code_prefix,))
+            conditions.append(prefix_sql)
+            params.extend(prefix_params)
+        
+        return self._query(f"SELECT * FROM {sqlite_store.TABLE}{self._where(conditions)} ORDER BY rowid", params)
+    
+    def iter_filtered_data(self, chunk_rows, account_type=None, year=None, month=None, third_party_id=None,
+                           code_prefix=None):
+        """
+        Matching balances rows in chunks; see DataLoader.iter_filtered_data
+        
+        Each chunk is its own query resuming after the last rowid read, so no
+        cursor stays open between chunks and a chunk may be read from any thread.
+        """
+        conditions, params = self._filters(
+            account_type=account_type, year=year, month=month, third_party_id=third_party_id
+        )
+        if code_prefix:
+            prefix_sql, prefix_params = sqlite_store.prefix_condition((code_prefix,))
+            conditions.append(prefix_sql)
+            params.extend(prefix_params)
+        
+        last_rowid = 0
+        while True:
+            chunk = self._query(
+                f"SELECT rowid AS _rowid, * FROM {sqlite_store.TABLE}"
+                f"{self._where(conditions + ['rowid > ?'])} ORDER BY rowid LIMIT ?",
+                params + [last_rowid, chunk_rows]
+            )
+            if len(chunk):
+                last_rowid = int(chunk['_rowid'].iloc[-1])
+            
+            yield chunk.drop(columns='_rowid')
+            if len(chunk) < chunk_rows:
+                break
+    
+    def get_unique_values(self, column):
+        return [row[0] for row in self.connection.execute(f"SELECT DISTINCT {column} FROM {sqlite_store.TABLE}")]
+    
+    def append(self, rows, version, source=None):
+        """
+        Insert rows into the database and return the Dataset of the next version
+        
+        The database is shared with this Dataset, which sees the new rows too.
+        The indexes are updated by SQLite for the inserted rows only. The store
+        no longer matches the balances CSV, and is rebuilt on the next cold
+        start, unless record_source is called once the CSV has the rows too.
+        
+        Parameters:
+        -----------
+        rows : pandas.DataFrame
+            Validated rows with the table's columns
+        version : int
+            Version of the new Dataset
+        source : tuple, optional
+            Signature of the balances file the new Dataset matches
+        
+        Returns:
+        --------
+        SQLiteDataset
+        """
+        manifest = sqlite_store.read_manifest(self.db_path)
+        manifest['rows'] += len(rows)
+        manifest['source'] = None
+        
+        connection = sqlite_store.connect(self.db_path, readonly=False)
+        try:
+            rows.to_sql(sqlite_store.TABLE, connection, if_exists='append', index=False)
+            sqlite_store.write_manifest(connection, manifest)
+            connection.commit()
+        finally:
+            connection.close()
+        
+        return SQLiteDataset(self.db_path, version, source=source)
+    
+    def record_source(self, source_path):
+        """
+        Mark the store as built from source_path, after the rows appended to
+        the store were appended to that CSV as well
+        """
+        manifest = sqlite_store.read_manifest(self.db_path)
+        # Hashing the whole CSV would cost as much as the history; mtime and size identify it
+        manifest['source'] = sqlite_store.source_manifest(source_path, with_hash=False)
+        
+        connection = sqlite_store.connect(self.db_path, readonly=False)
+        try:
+            sqlite_store.write_manifest(connection, manifest)
+            connection.commit()
+        finally:
+            connection.close()
 
 class DataLoader:
     """
     Service for loading and preprocessing ERP data
+    
+    The loaded data lives in a Dataset. reload() builds the next Dataset while
+    the current one keeps serving, then swaps the reference and bumps version,
+    which invalidates cached responses.
     """
-    def __init__(self):
+    def __init__(self, use_snapshot=True, storage='memory', compact_dtypes=False, money_scale=None, backend='pandas',
+                 data_path=None):
         self.base_path = Path(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-        self.data_path = self.base_path / "data"
-        self._account_balances = None
+        self.data_path = Path(data_path) if data_path is not None else self.base_path / "data"
+        self.snapshots_path = self.data_path / "snapshots"
+        self.version = 0
+        self._dataset = None
+        self._load_lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self.configure(
+            use_snapshot=use_snapshot,
+            storage=storage,
+            compact_dtypes=compact_dtypes,
+            money_scale=money_scale,
+            backend=backend
+        )
+    
+    def configure(self, use_snapshot=True, storage='memory', compact_dtypes=False, money_scale=None, backend='pandas'):
+        """
+        Set how the balances table is loaded and stored
+        
+        Cached data is dropped so the next access reloads it with the new settings,
+        and the dataset version is bumped so cached responses are invalidated.
+        
+        Parameters:
+        -----------
+        use_snapshot : bool, optional
+            Load from and maintain the columnar snapshot
+        storage : str, optional
+            One of STORAGE_MODES. 'shared' implies use_snapshot.
+        compact_dtypes : bool, optional
+            Store CATEGORICAL_COLUMNS as categoricals and CALENDAR_DTYPES as
+            narrow integers
+        money_scale : int, optional
+            Store MONEY_COLUMNS as fixed-point int64 values multiplied by this
+            scale (e.g. 10**6), so sums are exact. Aggregates are converted
+            back to floats.
+        backend : str, optional
+            One of BACKENDS. storage, compact_dtypes and money_scale only
+            apply to the pandas backend.
+        """
+        if storage not in STORAGE_MODES:
+            raise ValueError(f"Unknown storage mode '{storage}'. Expected one of {STORAGE_MODES}")
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend '{backend}'. Expected one of {BACKENDS}")
+        
+        self.backend = backend
+        self.storage = storage
+        self.use_snapshot = use_snapshot or storage == 'shared'
+        self.compact_dtypes = compact_dtypes
+        self.money_scale = money_scale
+        self._dataset = None
+        self.version += 1
+    
+    @property
+    def dataset(self):
+        """
+        Current Dataset, loaded and warmed up on first access
+        
+        Callers that make several queries for one response can hold on to the
+        returned Dataset so all of them see the same version.
+        """
+        if self._dataset is None:
+            with self._load_lock:
+                if self._dataset is None:
+                    # Warmed up like reloads, so no request pays for the cube
+                    self._dataset = self._load_dataset(self.version).warm_up()
+        
+        return self._dataset
+    
+    def _load_dataset(self, version, rebuild=False):
+        """
+        Load the balances table into a new Dataset, or open the SQLite store
+        
+        With the sqlite backend the store is (re)built from the CSV when it
+        is missing, out of date or rebuild is set.
+        """
+        # Stat before reading so a change during the load is picked up by the next reload
+        source = self._source_signature()
+        
+        if self.backend == 'sqlite':
+            db_path = self.account_balances_store
+            if rebuild or not sqlite_store.store_is_current(db_path, self.account_balances_file):
+                os.makedirs(self.snapshots_path, exist_ok=True)
+                sqlite_store.build_store(db_path, self.account_balances_file, self._prepare_account_balances)
+            return SQLiteDataset(db_path, version, source=source)
+        
+        df = self._load_account_balances()
+        
+        memory_report = None
+        if self.compact_dtypes or self.money_scale:
+            df, memory_report = self._compact_account_balances(df)
+        
+        return Dataset(df, version, money_scale=self.money_scale, memory_report=memory_report, source=source)
+    
+    @property
+    def is_loaded(self):
+        return self._dataset is not None
+    
+    def unload(self):
+        """
+        Drop the loaded Dataset to free memory; the next access loads it again
+        
+        The version is kept since the data did not change, so responses
+        cached from it stay valid.
+        """
+        with self._reload_lock:
+            self._dataset = None
+    
+    def _source_signature(self):
+        try:
+            stat = os.stat(self.account_balances_file)
+            return stat.st_mtime_ns, stat.st_size
+        except OSError:
+            return None
+    
+    def source_changed(self):
+        """
+        Check whether the balances file changed since the current Dataset was loaded
+        """
+        dataset = self._dataset
+        return dataset is not None and self._source_signature() != dataset.source
+    
+    def reload(self, force=False):
+        """
+        Load the balances file again and swap it in once fully built
+        
+        The new Dataset, including its indexes and cube, is built while the
+        current one keeps serving requests. The reference is then replaced in
+        one assignment and version bumped afterwards, so requests already
+        running finish on the previous Dataset and cached responses of the
+        previous version are no longer served. Only one reload runs at a time.
+        
+        Parameters:
+        -----------
+        force : bool, optional
+            Reload even if the file did not change
+        
+        Returns:
+        --------
+        dict
+            Whether a new Dataset was swapped in, its version, rows and the
+            seconds the build took
+        """
+        with self._reload_lock:
+            current = self._dataset
+            if not force and current is not None and self._source_signature() == current.source:
+                return {"reloaded": False, "version": self.version, "rows": current.row_count}
+            
+            started_at = time.perf_counter()
+            dataset = self._load_dataset(self.version + 1, rebuild=force).warm_up()
+            
+            self._dataset = dataset
+            self.version = dataset.version
+            
+            return {
+                "reloaded": True,
+                "version": dataset.version,
+                "rows": dataset.row_count,
+                "seconds": time.perf_counter() - started_at
+            }
     
     @property
     def account_balances(self):
         """
         Load and cache account balances data
         """
-        if self._account_balances is None:
-            file_path = self.data_path / "accounting_account_balances.csv"
-            self._account_balances = pd.read_csv(file_path, dtype={'code': str})
+        return self.dataset.account_balances
+    
+    @property
+    def account_balances_file(self):
+        return self.data_path / "accounting_account_balances.csv"
+    
+    @property
+    def account_balances_snapshot(self):
+        return self.snapshots_path / "accounting_account_balances"
+    
+    @property
+    def account_balances_store(self):
+        return self.snapshots_path / "accounting_account_balances.sqlite"
+    
+    def _load_account_balances(self):
+        """
+        Load account balances from the columnar snapshot when it is up to date,
+        otherwise parse the CSV and refresh the snapshot
+        """
+        file_path = self.account_balances_file
+        shared = self.storage == 'shared'
+        categorical = CATEGORICAL_COLUMNS if self.compact_dtypes else ()
+        
+        if self.use_snapshot:
+            try:
+                if snapshot.snapshot_is_current(self.account_balances_snapshot, file_path):
+                    return snapshot.load_snapshot(
+                        self.account_balances_snapshot, shared=shared, categorical=categorical
+                    )
+            except (OSError, ValueError, KeyError):
+                pass  # Corrupt or unreadable snapshot, fall back to the CSV
+        
+        df = self._read_account_balances_csv(file_path)
+        
+        if self.use_snapshot:
+            try:
+                os.makedirs(self.account_balances_snapshot, exist_ok=True)
+                snapshot.write_snapshot(df, self.account_balances_snapshot, file_path)
+                
+                # Serve from the mapped files so this worker shares them as well
+                if shared:
+                    return snapshot.load_snapshot(
+                        self.account_balances_snapshot, shared=True, categorical=categorical
+                    )
+            except OSError:
+                pass  # Read-only data directory, keep serving from the CSV
+        
+        return df
+    
+    def _read_account_balances_csv(self, file_path):
+        """
+        Parse the account balances CSV and compute derived columns
+        """
+        return self._prepare_account_balances(pd.read_csv(file_path, dtype={'code': str}))
+    
+    def _prepare_account_balances(self, df):
+        """
+        Type parsed balances rows and compute derived columns
+        """
+        # Convert date columns to datetime
+        for col in ['created_at', 'updated_at']:
+            if col in df.columns:
+                df[col] = pd.to_datetime(df[col])
+        
+        # Create period column for easier time-based analysis
+        df['period'] = df['year'].astype(str) + '-' + \
+                       df['month'].astype(str).str.zfill(2)
+        
+        # Create numeric period for time series analysis
+        df['numeric_period'] = df['year'] * 12 + df['month']
+        
+        # Ensure only the code column is string type for string operations
+        # This keeps numeric columns as numbers for calculations
+        if 'code' in df.columns:
+            df['code'] = df['code'].astype(str)
+        
+        return df
+    
+    def _compact_account_balances(self, df):
+        """
+        Convert account balances to the compact schema and measure memory usage
+        
+        Returns:
+        --------
+        tuple
+            (df, memory report)
+        """
+        # Memory of the plain schema: from the snapshot manifest when the
+        # categoricals were loaded straight from it, otherwise measured here
+        before = {col: int(df[col].memory_usage(deep=True, index=False)) for col in df.columns}
+        manifest = snapshot.read_manifest(self.account_balances_snapshot) if self.use_snapshot else None
+        if manifest is not None and manifest.get('rows') == len(df):
+            for column in manifest['columns']:
+                if column['name'] in before and 'memory_bytes' in column:
+                    before[column['name']] = column['memory_bytes']
+        
+        if self.compact_dtypes:
+            for col in CATEGORICAL_COLUMNS:
+                if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+                    df[col] = df[col].astype('category')
             
-            # Convert date columns to datetime
-            for col in ['created_at', 'updated_at']:
-                if col in self._account_balances.columns:
-                    self._account_balances[col] = pd.to_datetime(self._account_balances[col])
+            for col, dtype in CALENDAR_DTYPES.items():
+                if col in df.columns and pd.api.types.is_integer_dtype(df[col].dtype):
+                    limits = np.iinfo(dtype)
+                    if df[col].empty or (df[col].min() >= limits.min and df[col].max() <= limits.max):
+                        df[col] = df[col].astype(dtype)
+        
+        if self.money_scale:
+            for col in MONEY_COLUMNS:
+                if col in df.columns:
+                    scaled = (df[col] * self.money_scale).round()
+                    df[col] = scaled.astype('Int64' if scaled.isna().any() else 'int64')
+        
+        after = {col: int(df[col].memory_usage(deep=True, index=False)) for col in df.columns}
+        memory_report = {
+            'before_bytes': sum(before.values()),
+            'after_bytes': sum(after.values()),
+            'columns': {
+                col: {'dtype': str(df[col].dtype), 'before_bytes': before[col], 'after_bytes': after[col]}
+                for col in df.columns
+            }
+        }
+        
+        return df, memory_report
+    
+    def get_memory_report(self):
+        """
+        Get memory usage of the balances table before and after compaction
+        
+        Returns:
+        --------
+        dict
+            Total and per-column bytes before and after applying the compact
+            schema. Both totals are equal when compaction is disabled.
+        """
+        dataset = self.dataset
+        df = dataset.account_balances
+        
+        if dataset.memory_report is None:
+            usage = {col: int(df[col].memory_usage(deep=True, index=False)) for col in df.columns}
+            return {
+                'before_bytes': sum(usage.values()),
+                'after_bytes': sum(usage.values()),
+                'columns': {
+                    col: {'dtype': str(df[col].dtype), 'before_bytes': size, 'after_bytes': size}
+                    for col, size in usage.items()
+                }
+            }
+        
+        return dataset.memory_report
+    
+    def append_periods(self, rows, persist=True):
+        """
+        Append balances rows of new periods without reloading the history
+        
+        The rows are validated, converted to the schema of the loaded table and
+        appended to it. The indexes are extended and only the cube cells of the
+        periods in the delta are computed (see Dataset.append), so the cost
+        grows with the delta rather than with the whole history. Rows of a
+        period that is already loaded are added to it and its cells recomputed.
+        With the sqlite backend the rows are inserted into the store instead.
+        The new Dataset is built before anything is written to the CSV and is
+        swapped in like a reload, bumping version.
+        
+        With storage='shared' the appended table is no longer memory-mapped:
+        concatenating copies the mapped columns into this process, so until
+        the next reload or restart it holds a private copy of the whole table
+        instead of sharing the snapshot with the other workers.
+        
+        Parameters:
+        -----------
+        rows : str, Path, pandas.DataFrame or list of dict
+            Delta CSV with the columns of the balances CSV, or the rows themselves
+        persist : bool, optional
+            Also append the rows to the balances CSV so they survive a restart
+            and reach other worker processes on their next reload. The snapshot
+            is rewritten from the CSV on the next cold start.
+        
+        Returns:
+        --------
+        dict
+            Appended rows, their periods, the new version, total rows and the
+            seconds the append took
+        
+        Raises:
+        -------
+        ValueError
+            When there are no rows, columns are missing or values cannot be
+            stored in the table's schema
+        """
+        started_at = time.perf_counter()
+        
+        if isinstance(rows, (str, Path)):
+            delta = pd.read_csv(rows, dtype={'code': str})
+        else:
+            delta = pd.DataFrame(rows)
+        
+        with self._reload_lock:
+            current = self.dataset
+            delta = self._validate_appended_rows(delta, current.columns)
+            if self.backend == 'pandas':
+                typed = self._type_appended_rows(delta, current.account_balances)
+            
+            # Build the new Dataset first so a failure leaves the CSV untouched
+            if self.backend == 'sqlite':
+                dataset = current.append(delta, self.version + 1, source=current.source)
+            else:
+                dataset = current.append(typed, self.version + 1, source=current.source).warm_up()
             
-            # Create period column for easier time-based analysis
-            self._account_balances['period'] = self._account_balances['year'].astype(str) + '-' + \
-                                              self._account_balances['month'].astype(str).str.zfill(2)
+            if current.memory_report is not None:
+                dataset.memory_report = self._extend_memory_report(
+                    current.memory_report, delta, typed, dataset.account_balances
+                )
             
-            # Create numeric period for time series analysis
-            self._account_balances['numeric_period'] = self._account_balances['year'] * 12 + self._account_balances['month']
+            if persist:
+                in_sync = self._source_signature() == current.source
+                self._append_to_csv(delta)
+                
+                # The file now matches the new Dataset unless it had already changed
+                if in_sync:
+                    dataset.source = self._source_signature()
+                    if self.backend == 'sqlite':
+                        dataset.record_source(self.account_balances_file)
+            
+            self._dataset = dataset
+            self.version = dataset.version
+        
+        periods = delta[['period']].drop_duplicates()['period'].tolist()
+        return {
+            "appended": len(delta),
+            "periods": sorted(periods),
+            "version": dataset.version,
+            "rows": dataset.row_count,
+            "seconds": time.perf_counter() - started_at
+        }
+    
+    def _validate_appended_rows(self, delta, table_columns):
+        """
+        Check appended rows and compute their derived columns
+        """
+        if delta.empty:
+            raise ValueError("No rows to append")
+        
+        columns = [col for col in table_columns if col not in ('period', 'numeric_period')]
+        missing = [col for col in columns if col not in delta.columns]
+        if missing:
+            raise ValueError(f"Missing columns: {', '.join(missing)}")
+        delta = delta[columns].copy()
+        
+        for col in ['year', 'month'] + MONEY_COLUMNS:
+            if col in delta.columns:
+                try:
+                    delta[col] = pd.to_numeric(delta[col])
+                except (ValueError, TypeError):
+                    raise ValueError(f"Column '{col}' must be numeric")
+        
+        periods = delta[['year', 'month']]
+        if periods.isna().any().any() or (periods % 1 != 0).any().any():
+            raise ValueError("Every row needs an integer year and month")
+        if not delta['month'].between(1, 12).all():
+            raise ValueError("Month must be between 1 and 12")
+        delta['year'] = delta['year'].astype('int64')
+        delta['month'] = delta['month'].astype('int64')
+        
+        if 'code' in delta.columns and delta['code'].isna().any():
+            raise ValueError("Every row needs an account code")
+        
+        return self._prepare_account_balances(delta)
+    
+    def _type_appended_rows(self, delta, table):
+        """
+        Convert validated rows to the dtypes of the loaded table
+        
+        Categorical columns keep plain values; Dataset.append extends the
+        categories.
+        """
+        typed = delta.copy()
+        
+        if self.money_scale:
+            for col in MONEY_COLUMNS:
+                if col in typed.columns:
+                    typed[col] = (typed[col] * self.money_scale).round()
+        
+        for col in table.columns:
+            dtype = table[col].dtype
+            if isinstance(dtype, pd.CategoricalDtype):
+                continue
+            
+            # Narrow integer columns would silently wrap around
+            if isinstance(dtype, np.dtype) and dtype.kind in 'iu' and typed[col].notna().all():
+                limits = np.iinfo(dtype)
+                if typed[col].min() < limits.min or typed[col].max() > limits.max:
+                    raise ValueError(f"Column '{col}' does not fit in {dtype}")
+            
+            try:
+                typed[col] = typed[col].astype(dtype)
+            except (ValueError, TypeError, OverflowError):
+                raise ValueError(f"Column '{col}' cannot be stored as {dtype}")
+        
+        return typed[list(table.columns)]
+    
+    def _append_to_csv(self, delta):
+        """
+        Append rows to the balances CSV in its own column order
+        """
+        file_path = self.account_balances_file
+        header = pd.read_csv(file_path, nrows=0).columns
+        
+        with open(file_path, 'rb+') as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b'\n':
+                    f.write(b'\n')
+        
+        delta.reindex(columns=header).to_csv(file_path, mode='a', header=False, index=False)
+    
+    @staticmethod
+    def _extend_memory_report(report, delta, typed, table):
+        """
+        Add the memory of appended rows to a memory report
+        """
+        columns = {}
+        for col, entry in report['columns'].items():
+            # Categoricals are cheap to measure whole; other columns add the delta
+            if isinstance(table[col].dtype, pd.CategoricalDtype):
+                after = int(table[col].memory_usage(deep=True, index=False))
+            else:
+                after = entry['after_bytes'] + int(typed[col].memory_usage(deep=True, index=False))
             
-            # Ensure only the code column is string type for string operations
-            # This keeps numeric columns as numbers for calculations
-            if 'code' in self._account_balances.columns:
-                self._account_balances['code'] = self._account_balances['code'].astype(str)
+            columns[col] = {
+                'dtype': entry['dtype'],
+                'before_bytes': entry['before_bytes'] + int(delta[col].memory_usage(deep=True, index=False)),
+                'after_bytes': after
+            }
+        
+        return {
+            'before_bytes': sum(entry['before_bytes'] for entry in columns.values()),
+            'after_bytes': sum(entry['after_bytes'] for entry in columns.values()),
+            'columns': columns
+        }
+    
+    def money_as_float(self, df):
+        """
+        Convert fixed-point money columns of a balances slice back to floats
+        
+        Returns the same frame when money is not stored as fixed-point.
+        """
+        if not self.dataset.money_scale:
+            return df
+        
+        df = df.copy()
+        for col in MONEY_COLUMNS:
+            if col in df.columns:
+                df[col] = df[col].astype('float64') / self.money_scale
+        return df
+    
+    def build_snapshot(self):
+        """
+        Parse the CSV and (re)write the columnar snapshot used for fast cold starts
+        
+        Returns:
+        --------
+        dict
+            Snapshot manifest
+        """
+        file_path = self.account_balances_file
+        df = self._read_account_balances_csv(file_path)
+        os.makedirs(self.account_balances_snapshot, exist_ok=True)
+        return snapshot.write_snapshot(df, self.account_balances_snapshot, file_path)
+    
+    @property
+    def balance_index(self):
+        """
+        Secondary indexes over account balances of the current Dataset
+        """
+        return self.dataset.balance_index
+    
+    @property
+    def account_cube(self):
+        """
+        Period x account-prefix x third party cube of the current Dataset
+        
+        Returns:
+        --------
+        dict
+            Mapping of account-code prefix to a DataFrame with debit, credit and
+            final balance sums keyed by CUBE_KEYS
+        """
+        return self.dataset.account_cube
+    
+    def get_aggregates(self, prefixes='', year=None, month=None, third_party_id=None):
+        """
+        Get pre-aggregated cube rows for one or more account-code prefixes
+        
+        Parameters:
+        -----------
+        prefixes : str or tuple of str, optional
+            Account-code prefixes from CUBE_PREFIXES. Prefixes must not overlap,
+            otherwise the same balances are counted twice. Defaults to all accounts.
+        year : int, optional
+            Filter by year
+        month : int, optional
+            Filter by month
+        third_party_id : int, optional
+            Filter by third party ID
         
-        return self._account_balances
+        Returns:
+        --------
+        pandas.DataFrame
+            Cube rows with CUBE_KEYS, debit_movement, credit_movement,
+            final_balance and final_balance_count columns
+        """
+        return self.dataset.get_aggregates(prefixes, year=year, month=month, third_party_id=third_party_id)
     
-    def get_filtered_data(self, account_type=None, year=None, month=None, third_party_id=None):
+    @property
+    def account_cube_frame(self):
+        """
+        All cube slices of the current Dataset stacked in one frame with a 'prefix' column
+        """
+        return self.dataset.account_cube_frame
+    
+    def get_aggregates_by_prefix(self, prefixes=CUBE_PREFIXES, year=None, month=None, third_party_id=None):
+        """
+        Get cube rows of several account-code prefixes, filtered once
+        
+        Unlike get_aggregates, prefixes may overlap (e.g. '' and '4'): rows are
+        labeled with the prefix they belong to instead of being summed together.
+        
+        Parameters:
+        -----------
+        prefixes : tuple of str, optional
+            Account-code prefixes from CUBE_PREFIXES
+        year : int, optional
+            Filter by year
+        month : int, optional
+            Filter by month
+        third_party_id : int, optional
+            Filter by third party ID
+        
+        Returns:
+        --------
+        pandas.DataFrame
+            Cube rows with a 'prefix' column in addition to the get_aggregates columns
+        """
+        return self.dataset.get_aggregates_by_prefix(
+            prefixes, year=year, month=month, third_party_id=third_party_id
+        )
+    
+    def get_filtered_data(self, account_type=None, year=None, month=None, third_party_id=None, code_prefix=None):
         """
         Get filtered account balances data based on specified criteria
         
+        The result is a read-only view: when no filter is given the cached
+        frame itself is returned, otherwise only the matching rows are taken
+        by intersecting the row offsets of the secondary indexes (or queried
+        from the sqlite backend). Callers must not modify it in place. With a
+        money_scale configured, money columns are fixed-point integers; see
+        money_as_float.
+        
         Parameters:
         -----------
         account_type : str, optional
@@ -53,27 +1191,61 @@ class DataLoader:
             Filter by month
         third_party_id : int, optional
             Filter by third party ID
-            
+        code_prefix : str, optional
+            Filter by account code prefix (e.g., '4', '1.3')
+        
         Returns:
         --------
         pandas.DataFrame
             Filtered account balances data
         """
-        data = self.account_balances.copy()
+        return self.dataset.get_filtered_data(
+            account_type=account_type,
+            year=year,
+            month=month,
+            third_party_id=third_party_id,
+            code_prefix=code_prefix
+        )
+    
+    def iter_filtered_data(self, chunk_rows, account_type=None, year=None, month=None, third_party_id=None,
+                           code_prefix=None):
+        """
+        Get the rows of get_filtered_data in chunks of at most chunk_rows
         
-        if account_type:
-            data = data[data['name'] == account_type]
+        Rows are read chunk by chunk from the current Dataset, which stays the
+        one iterated even if the data is reloaded meanwhile, so the first
+        chunk is available without materializing the whole result. At least
+        one chunk is produced, empty when nothing matches. Money columns are
+        stored as in get_filtered_data.
         
-        if year:
-            data = data[data['year'] == year]
-            
-        if month:
-            data = data[data['month'] == month]
-            
-        if third_party_id:
-            data = data[data['third_party_id'] == third_party_id]
-            
-        return data
+        Parameters:
+        -----------
+        chunk_rows : int
+            Maximum number of rows per chunk
+        account_type : str, optional
+            Filter by account type (e.g., 'Activo', 'Pasivos')
+        year : int, optional
+            Filter by year
+        month : int, optional
+            Filter by month
+        third_party_id : int, optional
+            Filter by third party ID
+        code_prefix : str, optional
+            Filter by account code prefix (e.g., '4', '1.3')
+        
+        Returns:
+        --------
+        iterator of pandas.DataFrame
+            Chunks of the filtered account balances data, in table order
+        """
+        return self.dataset.iter_filtered_data(
+            chunk_rows,
+            account_type=account_type,
+            year=year,
+            month=month,
+            third_party_id=third_party_id,
+            code_prefix=code_prefix
+        )
     
     def get_unique_periods(self):
         """
@@ -84,7 +1256,7 @@ class DataLoader:
         list
             List of unique periods in format 'YYYY-MM'
         """
-        return sorted(self.account_balances['period'].unique().tolist())
+        return sorted(self.dataset.get_unique_values('period'))
     
     def get_unique_account_types(self):
         """
@@ -95,7 +1267,7 @@ class DataLoader:
         list
             List of unique account types
         """
-        return sorted(self.account_balances['name'].unique().tolist())
+        return sorted(self.dataset.get_unique_values('name'))
     
     def get_unique_third_parties(self):
         """
@@ -106,7 +1278,7 @@ class DataLoader:
         list
             List of unique third party IDs
         """
-        return sorted(self.account_balances['third_party_id'].unique().tolist())
+        return sorted(self.dataset.get_unique_values('third_party_id'))
 
 # Singleton instance
 data_loader = DataLoader()
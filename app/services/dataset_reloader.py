@@ -0,0 +1,112 @@
+import threading
+import time
+from app.services.data_loader import data_loader
+
+class DatasetReloader:
+    """
+    Reloads the balances dataset in the background
+    
+    A reload is started on demand (e.g. from the admin endpoint) or by a
+    watcher thread that polls the balances file and reloads when it changes.
+    Requests keep being served from the current dataset while the next one is
+    built; see DataLoader.reload.
+    """
+    def __init__(self, data_loader):
+        self.data_loader = data_loader
+        self._lock = threading.Lock()
+        self._reload_thread = None
+        self._watch_thread = None
+        self._stop = threading.Event()
+        self.interval = None
+        self.reloads = 0
+        self.last_result = None
+        self.last_error = None
+        self.last_finished_at = None
+    
+    def _reload(self, force=False):
+        try:
+            result = self.data_loader.reload(force=force)
+            with self._lock:
+                self.last_result = result
+                self.last_error = None
+                if result['reloaded']:
+                    self.reloads += 1
+        except Exception as e:
+            with self._lock:
+                self.last_error = str(e)
+        finally:
+            with self._lock:
+                self.last_finished_at = time.time()
+    
+    def trigger(self, force=False):
+        """
+        Start a reload in a background thread
+        
+        Parameters:
+        -----------
+        force : bool, optional
+            Reload even if the file did not change
+        
+        Returns:
+        --------
+        bool
+            False if a triggered reload is already running
+        """
+        with self._lock:
+            if self._reload_thread is not None and self._reload_thread.is_alive():
+                return False
+            
+            self._reload_thread = threading.Thread(
+                target=self._reload, kwargs={'force': force}, name="dataset-reload", daemon=True
+            )
+            self._reload_thread.start()
+            return True
+    
+    def start_watching(self, interval):
+        """
+        Poll the balances file every interval seconds and reload when it changes
+        """
+        with self._lock:
+            if self._watch_thread is not None and self._watch_thread.is_alive():
+                return
+            
+            self.interval = interval
+            self._stop.clear()
+            self._watch_thread = threading.Thread(target=self._watch, name="dataset-watcher", daemon=True)
+            self._watch_thread.start()
+    
+    def _watch(self):
+        while not self._stop.wait(self.interval):
+            if self.data_loader.source_changed():
+                self._reload()
+    
+    def stop_watching(self):
+        """
+        Stop the watcher thread
+        """
+        self._stop.set()
+    
+    def get_status(self):
+        """
+        Get the current dataset version and the outcome of the last reload
+        
+        Returns:
+        --------
+        dict
+            Version, whether a reload is running or the file is watched, the
+            number of reloads and the last result or error
+        """
+        with self._lock:
+            return {
+                'dataset_version': self.data_loader.version,
+                'reloading': self._reload_thread is not None and self._reload_thread.is_alive(),
+                'watching': self._watch_thread is not None and self._watch_thread.is_alive(),
+                'interval_seconds': self.interval,
+                'reloads': self.reloads,
+                'last_result': self.last_result,
+                'last_error': self.last_error,
+                'last_finished_at': self.last_finished_at
+            }
+
+# Singleton instance
+dataset_reloader = DatasetReloader(data_loader)
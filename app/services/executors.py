@@ -0,0 +1,155 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+class ExecutorBusyError(RuntimeError):
+    """
+    Raised when an executor's queue is full and a call is rejected
+    """
+
+class BoundedExecutor:
+    """
+    Thread pool with a bounded queue for blocking service calls
+    
+    Async request handlers hand CPU-bound pandas/statsmodels work to the pool
+    so the event loop stays free. At most max_workers calls run at once and at
+    most max_queue wait; further calls are rejected with ExecutorBusyError
+    instead of piling up, which keeps latency bounded under load.
+    """
+    def __init__(self, name, max_workers=4, max_queue=64):
+        self.name = name
+        self._lock = threading.Lock()
+        self._executor = None
+        self.configure(max_workers=max_workers, max_queue=max_queue)
+    
+    def configure(self, max_workers=4, max_queue=64):
+        """
+        Set the pool size and queue bound and reset the metrics
+        
+        Meant to be called at startup, before any call is submitted.
+        
+        Parameters:
+        -----------
+        max_workers : int, optional
+            Calls running at the same time
+        max_queue : int, optional
+            Calls allowed to wait for a free worker
+        """
+        with self._lock:
+            previous = self._executor
+            self.max_workers = max_workers
+            self.max_queue = max_queue
+            self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{self.name}-executor")
+            self._pending = 0
+            self._running = 0
+            self.submitted = 0
+            self.completed = 0
+            self.failed = 0
+            self.rejected = 0
+            self.max_queue_depth = 0
+            self._wait_seconds = 0.0
+            self._max_wait_seconds = 0.0
+            self._run_seconds = 0.0
+        
+        if previous is not None:
+            previous.shutdown(wait=False)
+    
+    def submit(self, fn, *args, **kwargs):
+        """
+        Schedule fn(*args, **kwargs) on the pool
+        
+        Returns:
+        --------
+        concurrent.futures.Future
+            Future with the call result
+        
+        Raises:
+        -------
+        ExecutorBusyError
+            When max_workers calls are running and max_queue are waiting
+        """
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                raise ExecutorBusyError(f"The {self.name} executor is busy, try again later")
+            
+            self._pending += 1
+            self.submitted += 1
+            self.max_queue_depth = max(self.max_queue_depth, self._pending - self._running)
+            executor = self._executor
+        
+        enqueued_at = time.perf_counter()
+        
+        def task():
+            started_at = time.perf_counter()
+            with self._lock:
+                self._running += 1
+                self._wait_seconds += started_at - enqueued_at
+                self._max_wait_seconds = max(self._max_wait_seconds, started_at - enqueued_at)
+            
+            failed = False
+            try:
+                return fn(*args, **kwargs)
+            except BaseException:
+                failed = True
+                raise
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._run_seconds += time.perf_counter() - started_at
+                    if failed:
+                        self.failed += 1
+                    else:
+                        self.completed += 1
+        
+        def release(future):
+            # Runs on every outcome, also when the call is cancelled before it starts
+            with self._lock:
+                self._pending -= 1
+        
+        try:
+            future = executor.submit(task)
+        except BaseException:
+            release(None)
+            raise
+        future.add_done_callback(release)
+        return future
+    
+    async def run(self, fn, *args, **kwargs):
+        """
+        Run fn(*args, **kwargs) on the pool and await its result
+        """
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+    
+    def get_stats(self):
+        """
+        Get queue depth, throughput and latency metrics
+        
+        Returns:
+        --------
+        dict
+            Pool bounds, running and queued calls, counters and average and
+            maximum time spent waiting in the queue and running
+        """
+        with self._lock:
+            finished = self.completed + self.failed
+            started = finished + self._running
+            return {
+                'max_workers': self.max_workers,
+                'max_queue': self.max_queue,
+                'running': self._running,
+                'queued': self._pending - self._running,
+                'max_queue_depth': self.max_queue_depth,
+                'submitted': self.submitted,
+                'completed': self.completed,
+                'failed': self.failed,
+                'rejected': self.rejected,
+                'avg_wait_ms': self._wait_seconds / started * 1000 if started else 0.0,
+                'max_wait_ms': self._max_wait_seconds * 1000,
+                'avg_run_ms': self._run_seconds / finished * 1000 if finished else 0.0
+            }
+
+# Separate pools so slow model fitting never starves the KPI endpoints
+kpi_executor = BoundedExecutor('kpi', max_workers=4, max_queue=64)
+ml_executor = BoundedExecutor('ml', max_workers=2, max_queue=8)
@@ -0,0 +1,195 @@
+import pandas as pd
+from app.services.data_loader import CUBE_PREFIXES, MONEY_COLUMNS
+
+# Rows encoded and sent per chunk of a streamed export
+CHUNK_ROWS = 10_000
+
+# Media type of every export format
+FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'arrow': 'application/vnd.apache.arrow.stream'
+}
+
+# Columns summed in the period series
+SERIES_VALUES = ['debit_movement', 'credit_movement', 'final_balance']
+
+class ExportFormatUnavailable(RuntimeError):
+    """
+    Raised when the library an export format needs is not installed
+    """
+
+def _import_pyarrow():
+    # Optional dependency, only needed for Arrow exports
+    try:
+        import pyarrow
+        import pyarrow.ipc
+    except ImportError:
+        raise ExportFormatUnavailable("Arrow export requires pyarrow (pip install pyarrow)")
+    return pyarrow
+
+def balance_rows(dataset, chunk_rows=CHUNK_ROWS, **filters):
+    """
+    Filtered balances rows of a Dataset in chunks, with money as floats
+    
+    Parameters:
+    -----------
+    dataset : Dataset or SQLiteDataset
+        Dataset to read; holding it keeps the export consistent across reloads
+    chunk_rows : int, optional
+        Maximum number of rows per chunk
+    **filters
+        get_filtered_data criteria (account_type, year, month, ...)
+    
+    Returns:
+    --------
+    iterator of pandas.DataFrame
+        Chunks in table order; at least one, possibly empty
+    """
+    for chunk in dataset.iter_filtered_data(chunk_rows, **filters):
+        if dataset.money_scale:
+            chunk = chunk.assign(**{
+                col: chunk[col].astype('float64') / dataset.money_scale
+                for col in MONEY_COLUMNS if col in chunk.columns
+            })
+        yield chunk
+
+def period_series(dataset, prefixes=CUBE_PREFIXES, by_third_party=False, year=None, month=None,
+                  third_party_id=None):
+    """
+    Debit, credit and final balance per account prefix and period
+    
+    Built from the pre-aggregated cube (or a GROUP BY on the sqlite
+    backend), so its size depends on periods and prefixes, not on rows.
+    
+    Parameters:
+    -----------
+    dataset : Dataset or SQLiteDataset
+        Dataset to aggregate
+    prefixes : list of str, optional
+        Account-code prefixes from CUBE_PREFIXES; they may overlap
+    by_third_party : bool, optional
+        Keep one series per third party instead of summing them
+    year : int, optional
+        Filter by year
+    month : int, optional
+        Filter by month
+    third_party_id : int, optional
+        Filter by third party ID
+    
+    Returns:
+    --------
+    pandas.DataFrame
+        One row per prefix, period (and third party), sorted by them
+    
+    Raises:
+    -------
+    ValueError
+        When a prefix is not pre-aggregated
+    """
+    unknown = [prefix for prefix in prefixes if prefix not in CUBE_PREFIXES]
+    if unknown:
+        raise ValueError(f"Unknown prefixes {unknown}; available: {list(CUBE_PREFIXES)}")
+    
+    data = dataset.get_aggregates_by_prefix(
+        tuple(prefixes), year=year, month=month, third_party_id=third_party_id
+    )
+    
+    keys = ['prefix', 'year', 'month', 'period']
+    if by_third_party:
+        keys += ['third_party_id', 'third_party_type_id']
+    
+    return data.groupby(keys, dropna=False, observed=True)[SERIES_VALUES].sum().reset_index()
+
+def frame_chunks(frame, chunk_rows=CHUNK_ROWS):
+    """
+    Slices of an in-memory frame; at least one, possibly empty
+    """
+    for start in range(0, max(len(frame), 1), chunk_rows):
+        yield frame.iloc[start:start + chunk_rows]
+
+def _ndjson(chunks):
+    for chunk in chunks:
+        if len(chunk):
+            yield chunk.to_json(orient='records', lines=True, date_format='iso', force_ascii=False).encode('utf-8')
+
+class _IPCSink:
+    """
+    File-like object collecting what the Arrow writer emits until it is sent
+    """
+    def __init__(self):
+        self.buffers = []
+        self.closed = False
+    
+    def write(self, data):
+        self.buffers.append(bytes(data))
+        return len(data)
+    
+    def flush(self):
+        pass
+    
+    def close(self):
+        self.closed = True
+    
+    def take(self):
+        data = b''.join(self.buffers)
+        self.buffers = []
+        return data
+
+def _plain_columns(chunk):
+    # Categoricals would become dictionaries that differ between chunks,
+    # which an IPC stream cannot carry without replacing them
+    categorical = [col for col in chunk.columns if isinstance(chunk[col].dtype, pd.CategoricalDtype)]
+    if not categorical:
+        return chunk
+    return chunk.assign(**{col: chunk[col].astype(chunk[col].cat.categories.dtype) for col in categorical})
+
+def _arrow(chunks, pa):
+    sink = _IPCSink()
+    writer = None
+    for chunk in chunks:
+        chunk = _plain_columns(chunk)
+        if writer is None:
+            # The first chunk, even when empty, fixes the schema of the stream
+            schema = pa.Schema.from_pandas(chunk, preserve_index=False)
+            writer = pa.ipc.new_stream(sink, schema)
+        
+        if len(chunk):
+            writer.write_batch(pa.RecordBatch.from_pandas(chunk, schema=schema, preserve_index=False))
+        yield sink.take()
+    
+    if writer is not None:
+        writer.close()
+        yield sink.take()
+
+def encode(chunks, fmt):
+    """
+    Encode DataFrame chunks as a byte stream, one piece per chunk
+    
+    NDJSON writes one JSON object per row; Arrow writes an IPC stream with
+    one record batch per chunk. Nothing is encoded until the stream is
+    iterated, and only one chunk is held at a time.
+    
+    Parameters:
+    -----------
+    chunks : iterator of pandas.DataFrame
+        Chunks sharing the same columns
+    fmt : str
+        Key of FORMATS
+    
+    Returns:
+    --------
+    iterator of bytes
+        Encoded stream
+    
+    Raises:
+    -------
+    ValueError
+        When the format is unknown
+    ExportFormatUnavailable
+        When the format needs a library that is not installed
+    """
+    if fmt == 'ndjson':
+        return _ndjson(chunks)
+    if fmt == 'arrow':
+        return _arrow(chunks, _import_pyarrow())
+    raise ValueError(f"Unknown export format '{fmt}'; available: {list(FORMATS)}")
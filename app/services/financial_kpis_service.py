@@ -1,14 +1,72 @@
+import copy
 import pandas as pd
 import numpy as np
 from app.services.data_loader import data_loader
+from app.services.kpi_results import SalesAnalysis, AccountsAnalysis, ExpensesAnalysis, group_by_period
+from app.services.response_cache import ResponseCache, cached_response
+
+# Parameters that identify a cached KPI response
+KPI_CACHE_KEY = ('year', 'month', 'third_party_id', 'top_n')
+
+# Account-code prefixes behind each figure of the cash flow and the financial summary
+OPERATING_PREFIXES = ('4', '5', '6')
+INVESTMENT_PREFIXES = ('1.2',)
+FINANCING_PREFIXES = ('2.1', '2.2', '3')
+SALES_PREFIXES = ('4',)
+EXPENSE_PREFIXES = ('5', '6')
+RECEIVABLE_PREFIXES = ('1.3',)
+PAYABLE_PREFIXES = ('2.1', '2.2')
+PURCHASE_PREFIXES = ('6',)
+SUMMARY_PREFIXES = ('', '1.2', '1.3', '2.1', '2.2', '3', '4', '5', '6')
 
 class FinancialKPIsService:
     """
     Service for calculating financial KPIs based on ERP data
+    
+    The singleton serves the default dataset; each tenant gets its own
+    instance over its own DataLoader, sharing one response cache under the
+    tenant's namespace. Every cached method resolves the current Dataset once
+    and runs all of its queries against it (see pinned), so a reload during
+    a request cannot mix two versions in one response.
     """
-    def __init__(self):
-        self.data_loader = data_loader
+    def __init__(self, loader=None, cache=None, cache_namespace=None):
+        self.data_loader = loader if loader is not None else data_loader
+        self.cache = cache if cache is not None else ResponseCache()
+        self.cache_namespace = cache_namespace
+        self._dataset = None
+    
+    @property
+    def dataset(self):
+        """
+        Dataset queried: the pinned one, otherwise the loader's current one
+        """
+        return self._dataset if self._dataset is not None else self.data_loader.dataset
+    
+    def pinned(self, dataset):
+        """
+        Get a copy of the service whose queries all run against dataset
+        
+        The copy shares the loader and the response cache.
+        """
+        if self._dataset is dataset:
+            return self
+        
+        service = copy.copy(self)
+        service._dataset = dataset
+        return service
+    
+    def _net_flow_by_period(self, prefixes, year=None, month=None):
+        """
+        Net flow (credit - debit) per period for the given account prefixes
+        """
+        flow = group_by_period(
+            self.dataset.get_aggregates(prefixes, year=year, month=month),
+            ['debit_movement', 'credit_movement']
+        )
+        flow['net_flow'] = flow['credit_movement'] - flow['debit_movement']
+        return flow
     
+    @cached_response(*KPI_CACHE_KEY)
     def calculate_cash_flow(self, year=None, month=None):
         """
         Calculate cash flow KPIs
@@ -19,30 +77,17 @@ class FinancialKPIsService:
             Filter by year
         month : int, optional
             Filter by month
-            
+        
         Returns:
         --------
         dict
             Dictionary containing cash flow KPIs
         """
-        # Get data
-        df = self.data_loader.account_balances.copy()
-        
-        # Filter by year and month if provided
-        if year:
-            df = df[df['year'] == year]
-        if month:
-            df = df[df['month'] == month]
-        
         # Group by period for time series analysis
-        period_df = df.groupby(['year', 'month', 'period']).agg({
-            'debit_movement': 'sum',
-            'credit_movement': 'sum',
-            'final_balance': 'sum'
-        }).reset_index()
-        
-        # Sort by period
-        period_df = period_df.sort_values(['year', 'month'])
+        period_df = group_by_period(
+            self.dataset.get_aggregates('', year=year, month=month),
+            ['debit_movement', 'credit_movement', 'final_balance']
+        )
         
         # Calculate cash flow components
         # For this example, we'll use a simplified approach:
@@ -51,28 +96,13 @@ class FinancialKPIsService:
         # - Financing cash flow: Transactions related to debt and equity
         
         # Get operating accounts (simplified approach)
-        operating_df = df[df['code'].str.startswith(('4', '5', '6'))]
-        operating_cash_flow = operating_df.groupby(['year', 'month', 'period']).agg({
-            'debit_movement': 'sum',
-            'credit_movement': 'sum'
-        }).reset_index()
-        operating_cash_flow['net_flow'] = operating_cash_flow['credit_movement'] - operating_cash_flow['debit_movement']
+        operating_cash_flow = self._net_flow_by_period(OPERATING_PREFIXES, year, month)
         
         # Get investment accounts (simplified approach)
-        investment_df = df[df['code'].str.startswith('1.2')]
-        investment_cash_flow = investment_df.groupby(['year', 'month', 'period']).agg({
-            'debit_movement': 'sum',
-            'credit_movement': 'sum'
-        }).reset_index()
-        investment_cash_flow['net_flow'] = investment_cash_flow['credit_movement'] - investment_cash_flow['debit_movement']
+        investment_cash_flow = self._net_flow_by_period(INVESTMENT_PREFIXES, year, month)
         
         # Get financing accounts (simplified approach)
-        financing_df = df[df['code'].str.startswith(('2.1', '2.2', '3'))]
-        financing_cash_flow = financing_df.groupby(['year', 'month', 'period']).agg({
-            'debit_movement': 'sum',
-            'credit_movement': 'sum'
-        }).reset_index()
-        financing_cash_flow['net_flow'] = financing_cash_flow['credit_movement'] - financing_cash_flow['debit_movement']
+        financing_cash_flow = self._net_flow_by_period(FINANCING_PREFIXES, year, month)
         
         # Prepare result
         result = {
@@ -98,14 +128,15 @@ class FinancialKPIsService:
         result['accumulated_cash_flow'] = accumulated_flow
         result['total_cash_flow'] = {
             period: (
-                result['operating_cash_flow'].get(period, 0) + 
-                result['investment_cash_flow'].get(period, 0) + 
+                result['operating_cash_flow'].get(period, 0) +
+                result['investment_cash_flow'].get(period, 0) +
                 result['financing_cash_flow'].get(period, 0)
             ) for period in result['periods']
         }
         
         return result
     
+    @cached_response(*KPI_CACHE_KEY)
     def analyze_sales(self, year=None, month=None, third_party_id=None):
         """
         Analyze sales data
@@ -118,53 +149,27 @@ class FinancialKPIsService:
             Filter by month
         third_party_id : int, optional
             Filter by third party ID
-            
+        
         Returns:
         --------
         dict
             Dictionary containing sales analysis KPIs
         """
-        # Get data
-        df = self.data_loader.account_balances.copy()
-        
-        # Filter by year and month if provided
-        if year:
-            df = df[df['year'] == year]
-        if month:
-            df = df[df['month'] == month]
-        if third_party_id:
-            df = df[df['third_party_id'] == third_party_id]
-        
-        # Filter for revenue accounts (code starting with 4)
-        sales_df = df[df['code'].str.startswith('4')]
-        
-        # Group by period for time series analysis
-        period_sales = sales_df.groupby(['year', 'month', 'period']).agg({
-            'credit_movement': 'sum'  # Credit movements represent revenue
-        }).reset_index()
-        
-        # Group by third party for customer analysis
-        customer_sales = sales_df.groupby(['third_party_id', 'third_party_type_id']).agg({
-            'credit_movement': 'sum'
-        }).reset_index().sort_values('credit_movement', ascending=False)
-        
-        # Calculate sales growth
-        period_sales = period_sales.sort_values(['year', 'month'])
-        period_sales['previous_sales'] = period_sales['credit_movement'].shift(1)
-        period_sales['sales_growth'] = (period_sales['credit_movement'] - period_sales['previous_sales']) / period_sales['previous_sales'] * 100
-        period_sales['sales_growth'] = period_sales['sales_growth'].fillna(0)
-        
-        # Prepare result
-        result = {
-            'periods': period_sales['period'].tolist(),
-            'total_sales': period_sales.set_index('period')['credit_movement'].to_dict(),
-            'sales_growth': period_sales.set_index('period')['sales_growth'].to_dict(),
-            'top_customers': customer_sales.head(10).to_dict(orient='records'),
-            'total_sales_amount': sales_df['credit_movement'].sum()
-        }
+        return self.sales_analysis(year=year, month=month, third_party_id=third_party_id).to_dict()
+    
+    @cached_response(*KPI_CACHE_KEY)
+    def sales_analysis(self, year=None, month=None, third_party_id=None):
+        """
+        Get a lazily evaluated sales analysis
         
-        return result
+        Returns:
+        --------
+        SalesAnalysis
+            Analysis whose fields are computed on first access
+        """
+        return SalesAnalysis(self.dataset, year=year, month=month, third_party_id=third_party_id)
     
+    @cached_response(*KPI_CACHE_KEY)
     def analyze_accounts_receivable_payable(self, year=None, month=None):
         """
         Analyze accounts receivable and payable
@@ -175,79 +180,27 @@ class FinancialKPIsService:
             Filter by year
         month : int, optional
             Filter by month
-            
+        
         Returns:
         --------
         dict
             Dictionary containing accounts receivable and payable KPIs
         """
-        # Get data
-        df = self.data_loader.account_balances.copy()
-        
-        # Filter by year and month if provided
-        if year:
-            df = df[df['year'] == year]
-        if month:
-            df = df[df['month'] == month]
-        
-        # Filter for accounts receivable (code starting with 1.3)
-        receivables_df = df[df['code'].str.startswith('1.3')]
-        
-        # Filter for accounts payable (code starting with 2.1 or 2.2)
-        payables_df = df[df['code'].str.startswith(('2.1', '2.2'))]
-        
-        # Group by period for time series analysis
-        period_receivables = receivables_df.groupby(['year', 'month', 'period']).agg({
-            'final_balance': 'sum'
-        }).reset_index()
-        
-        period_payables = payables_df.groupby(['year', 'month', 'period']).agg({
-            'final_balance': 'sum'
-        }).reset_index()
-        
-        # Calculate average balances
-        avg_receivables = receivables_df['final_balance'].mean()
-        avg_payables = payables_df['final_balance'].mean()
-        
-        # Calculate receivables turnover (simplified)
-        # Ideally, we would use sales / average receivables
-        sales_df = df[df['code'].str.startswith('4')]
-        total_sales = sales_df['credit_movement'].sum()
-        
-        if avg_receivables > 0:
-            receivables_turnover = total_sales / avg_receivables
-            days_sales_outstanding = 365 / receivables_turnover if receivables_turnover > 0 else 0
-        else:
-            receivables_turnover = 0
-            days_sales_outstanding = 0
-        
-        # Calculate payables turnover (simplified)
-        # Ideally, we would use purchases / average payables
-        purchases_df = df[df['code'].str.startswith('6')]  # Cost of goods sold
-        total_purchases = purchases_df['debit_movement'].sum()
-        
-        if avg_payables > 0:
-            payables_turnover = total_purchases / avg_payables
-            days_payables_outstanding = 365 / payables_turnover if payables_turnover > 0 else 0
-        else:
-            payables_turnover = 0
-            days_payables_outstanding = 0
-        
-        # Prepare result
-        result = {
-            'periods': sorted(set(period_receivables['period'].tolist() + period_payables['period'].tolist())),
-            'accounts_receivable': period_receivables.set_index('period')['final_balance'].to_dict(),
-            'accounts_payable': period_payables.set_index('period')['final_balance'].to_dict(),
-            'avg_accounts_receivable': float(avg_receivables),
-            'avg_accounts_payable': float(avg_payables),
-            'receivables_turnover': float(receivables_turnover),
-            'days_sales_outstanding': float(days_sales_outstanding),
-            'payables_turnover': float(payables_turnover),
-            'days_payables_outstanding': float(days_payables_outstanding)
-        }
+        return self.accounts_analysis(year=year, month=month).to_dict()
+    
+    @cached_response(*KPI_CACHE_KEY)
+    def accounts_analysis(self, year=None, month=None):
+        """
+        Get a lazily evaluated accounts receivable and payable analysis
         
-        return result
+        Returns:
+        --------
+        AccountsAnalysis
+            Analysis whose fields are computed on first access
+        """
+        return AccountsAnalysis(self.dataset, year=year, month=month)
     
+    @cached_response(*KPI_CACHE_KEY)
     def analyze_expenses_by_supplier(self, year=None, month=None, top_n=10):
         """
         Analyze expenses by supplier
@@ -260,55 +213,115 @@ class FinancialKPIsService:
             Filter by month
         top_n : int, optional
             Number of top suppliers to return
-            
+        
         Returns:
         --------
         dict
             Dictionary containing expenses by supplier KPIs
         """
-        # Get data
-        df = self.data_loader.account_balances.copy()
+        return self.expenses_analysis(year=year, month=month, top_n=top_n).to_dict()
+    
+    @cached_response(*KPI_CACHE_KEY)
+    def expenses_analysis(self, year=None, month=None, top_n=10):
+        """
+        Get a lazily evaluated expenses by supplier analysis
         
-        # Filter by year and month if provided
-        if year:
-            df = df[df['year'] == year]
-        if month:
-            df = df[df['month'] == month]
+        Returns:
+        --------
+        ExpensesAnalysis
+            Analysis whose fields are computed on first access
+        """
+        return ExpensesAnalysis(self.dataset, year=year, month=month, top_n=top_n)
+    
+    @cached_response(*KPI_CACHE_KEY)
+    def calculate_financial_summary(self, year=None, month=None):
+        """
+        Calculate the financial summary in a single pass over the cube
         
-        # Filter for expense accounts (code starting with 5 or 6)
-        expenses_df = df[df['code'].str.startswith(('5', '6'))]
+        Produces the same figures as combining calculate_cash_flow, analyze_sales,
+        analyze_accounts_receivable_payable and analyze_expenses_by_supplier, but
+        filters the cube once and derives every figure from one aggregation by
+        account prefix and period.
         
-        # Group by supplier
-        supplier_expenses = expenses_df.groupby(['third_party_id', 'third_party_type_id']).agg({
-            'debit_movement': 'sum'  # Debit movements represent expenses
-        }).reset_index().sort_values('debit_movement', ascending=False)
+        Parameters:
+        -----------
+        year : int, optional
+            Filter by year
+        month : int, optional
+            Filter by month
         
-        # Group by period for time series analysis
-        period_expenses = expenses_df.groupby(['year', 'month', 'period']).agg({
-            'debit_movement': 'sum'
-        }).reset_index().sort_values(['year', 'month'])
+        Returns:
+        --------
+        dict
+            Dictionary containing the financial summary
+        """
+        aggregates = self.dataset.get_aggregates_by_prefix(SUMMARY_PREFIXES, year=year, month=month)
+        
+        # One aggregation backs every figure; rows without a period only count in totals
+        by_period = aggregates.groupby(['prefix', 'year', 'month', 'period'], dropna=False, observed=True).agg({
+            'debit_movement': 'sum',
+            'credit_movement': 'sum',
+            'final_balance': 'sum',
+            'final_balance_count': 'sum'
+        }).reset_index()
+        by_period['net_flow'] = by_period['credit_movement'] - by_period['debit_movement']
+        
+        totals = by_period.groupby('prefix', observed=False).sum(numeric_only=True)
+        dated = by_period[by_period['period'].notna()]
+        net_flow = dated.groupby('prefix', observed=False)['net_flow'].sum()
+        
+        def total(prefixes, column):
+            return float(totals.loc[list(prefixes), column].sum())
         
-        # Calculate total expenses
-        total_expenses = expenses_df['debit_movement'].sum()
+        def mean_final_balance(prefixes):
+            count = totals.loc[list(prefixes), 'final_balance_count'].sum()
+            return totals.loc[list(prefixes), 'final_balance'].sum() / count if count > 0 else np.nan
         
-        # Calculate percentage of total for each supplier
-        if total_expenses > 0:
-            supplier_expenses['percentage'] = supplier_expenses['debit_movement'] / total_expenses * 100
+        all_periods = dated[dated['prefix'] == ''].sort_values(['year', 'month'])
+        
+        total_sales = total(SALES_PREFIXES, 'credit_movement')
+        total_expenses = total(EXPENSE_PREFIXES, 'debit_movement')
+        
+        # Same simplified turnover ratios as analyze_accounts_receivable_payable
+        avg_receivables = mean_final_balance(RECEIVABLE_PREFIXES)
+        avg_payables = mean_final_balance(PAYABLE_PREFIXES)
+        
+        if avg_receivables > 0:
+            receivables_turnover = total_sales / avg_receivables
+            days_sales_outstanding = 365 / receivables_turnover if receivables_turnover > 0 else 0
         else:
-            supplier_expenses['percentage'] = 0
+            days_sales_outstanding = 0
         
-        # Get top suppliers
-        top_suppliers = supplier_expenses.head(top_n).to_dict(orient='records')
+        total_purchases = total(PURCHASE_PREFIXES, 'debit_movement')
+        if avg_payables > 0:
+            payables_turnover = total_purchases / avg_payables
+            days_payables_outstanding = 365 / payables_turnover if payables_turnover > 0 else 0
+        else:
+            days_payables_outstanding = 0
         
-        # Prepare result
-        result = {
-            'periods': period_expenses['period'].tolist(),
-            'total_expenses': period_expenses.set_index('period')['debit_movement'].to_dict(),
-            'top_suppliers': top_suppliers,
-            'total_expenses_amount': float(total_expenses)
+        operating = float(net_flow[list(OPERATING_PREFIXES)].sum())
+        investment = float(net_flow[list(INVESTMENT_PREFIXES)].sum())
+        financing = float(net_flow[list(FINANCING_PREFIXES)].sum())
+        
+        summary = {
+            "periods": all_periods['period'].tolist(),
+            "total_sales": total_sales,
+            "total_expenses": total_expenses,
+            "net_profit": total_sales - total_expenses,
+            "profit_margin": (total_sales - total_expenses) / total_sales * 100 if total_sales > 0 else 0,
+            "accounts_receivable": float(avg_receivables),
+            "accounts_payable": float(avg_payables),
+            "days_sales_outstanding": float(days_sales_outstanding),
+            "days_payables_outstanding": float(days_payables_outstanding),
+            "cash_flow_summary": {
+                "operating": operating,
+                "investment": investment,
+                "financing": financing,
+                "total": operating + investment + financing
+            }
         }
         
-        return result
+        return summary
 
 # Singleton instance
 financial_kpis_service = FinancialKPIsService()
@@ -0,0 +1,246 @@
+import numpy as np
+from functools import cached_property
+
+def group_by_period(aggregates, columns):
+    """
+    Sum cube columns per period, sorted chronologically
+    """
+    return aggregates.groupby(['year', 'month', 'period'], observed=True).agg(
+        {column: 'sum' for column in columns}
+    ).reset_index().sort_values(['year', 'month'])
+
+def group_by_third_party(aggregates, column):
+    """
+    Sum a cube column per third party, largest first
+    """
+    return aggregates.groupby(['third_party_id', 'third_party_type_id'], observed=True).agg({
+        column: 'sum'
+    }).reset_index().sort_values(column, ascending=False)
+
+def mean_final_balance(aggregates):
+    """
+    Row-level mean of final_balance recovered from cube sums and counts
+    """
+    count = aggregates['final_balance_count'].sum()
+    return aggregates['final_balance'].sum() / count if count > 0 else np.nan
+
+class SalesAnalysis:
+    """
+    Lazily evaluated sales analysis
+    
+    Each field is computed on first access and kept, so an endpoint that only
+    returns part of the analysis does not pay for the rest. Fields are always
+    computed from the Dataset the analysis was created with, even when it is
+    cached and the data is reloaded before a field is first read.
+    """
+    def __init__(self, dataset, year=None, month=None, third_party_id=None):
+        self.dataset = dataset
+        self.year = year
+        self.month = month
+        self.third_party_id = third_party_id
+    
+    @cached_property
+    def sales(self):
+        # Revenue accounts (code starting with 4)
+        return self.dataset.get_aggregates(
+            '4', year=self.year, month=self.month, third_party_id=self.third_party_id
+        )
+    
+    @cached_property
+    def period_sales(self):
+        # Credit movements represent revenue
+        period_sales = group_by_period(self.sales, ['credit_movement'])
+        
+        # Calculate sales growth
+        period_sales['previous_sales'] = period_sales['credit_movement'].shift(1)
+        period_sales['sales_growth'] = (period_sales['credit_movement'] - period_sales['previous_sales']) / period_sales['previous_sales'] * 100
+        period_sales['sales_growth'] = period_sales['sales_growth'].fillna(0)
+        return period_sales
+    
+    @cached_property
+    def periods(self):
+        return self.period_sales['period'].tolist()
+    
+    @cached_property
+    def total_sales(self):
+        return self.period_sales.set_index('period')['credit_movement'].to_dict()
+    
+    @cached_property
+    def sales_growth(self):
+        return self.period_sales.set_index('period')['sales_growth'].to_dict()
+    
+    @cached_property
+    def top_customers(self):
+        return group_by_third_party(self.sales, 'credit_movement').head(10).to_dict(orient='records')
+    
+    @cached_property
+    def total_sales_amount(self):
+        return self.sales['credit_movement'].sum()
+    
+    def to_dict(self):
+        """
+        Evaluate every field
+        """
+        return {
+            'periods': self.periods,
+            'total_sales': self.total_sales,
+            'sales_growth': self.sales_growth,
+            'top_customers': self.top_customers,
+            'total_sales_amount': self.total_sales_amount
+        }
+
+class AccountsAnalysis:
+    """
+    Lazily evaluated accounts receivable and payable analysis
+    
+    Receivable and payable figures are independent, so asking for one side only
+    aggregates the accounts and turnover totals that side needs.
+    """
+    def __init__(self, dataset, year=None, month=None):
+        self.dataset = dataset
+        self.year = year
+        self.month = month
+    
+    @cached_property
+    def receivables(self):
+        # Accounts receivable (code starting with 1.3)
+        return self.dataset.get_aggregates('1.3', year=self.year, month=self.month)
+    
+    @cached_property
+    def payables(self):
+        # Accounts payable (code starting with 2.1 or 2.2)
+        return self.dataset.get_aggregates(('2.1', '2.2'), year=self.year, month=self.month)
+    
+    @cached_property
+    def period_receivables(self):
+        return group_by_period(self.receivables, ['final_balance'])
+    
+    @cached_property
+    def period_payables(self):
+        return group_by_period(self.payables, ['final_balance'])
+    
+    @cached_property
+    def receivable_periods(self):
+        return sorted(set(self.period_receivables['period'].tolist()))
+    
+    @cached_property
+    def payable_periods(self):
+        return sorted(set(self.period_payables['period'].tolist()))
+    
+    @cached_property
+    def periods(self):
+        # Union of both sides, so it aggregates receivables and payables
+        return sorted(set(self.receivable_periods) | set(self.payable_periods))
+    
+    @cached_property
+    def accounts_receivable(self):
+        return self.period_receivables.set_index('period')['final_balance'].to_dict()
+    
+    @cached_property
+    def accounts_payable(self):
+        return self.period_payables.set_index('period')['final_balance'].to_dict()
+    
+    @cached_property
+    def avg_accounts_receivable(self):
+        return float(mean_final_balance(self.receivables))
+    
+    @cached_property
+    def avg_accounts_payable(self):
+        return float(mean_final_balance(self.payables))
+    
+    @cached_property
+    def receivables_turnover(self):
+        # Simplified: ideally sales / average receivables
+        if self.avg_accounts_receivable > 0:
+            total_sales = self.dataset.get_aggregates('4', year=self.year, month=self.month)['credit_movement'].sum()
+            return float(total_sales / self.avg_accounts_receivable)
+        return 0.0
+    
+    @cached_property
+    def days_sales_outstanding(self):
+        return float(365 / self.receivables_turnover) if self.receivables_turnover > 0 else 0.0
+    
+    @cached_property
+    def payables_turnover(self):
+        # Simplified: ideally purchases / average payables, with cost of goods sold as purchases
+        if self.avg_accounts_payable > 0:
+            total_purchases = self.dataset.get_aggregates('6', year=self.year, month=self.month)['debit_movement'].sum()
+            return float(total_purchases / self.avg_accounts_payable)
+        return 0.0
+    
+    @cached_property
+    def days_payables_outstanding(self):
+        return float(365 / self.payables_turnover) if self.payables_turnover > 0 else 0.0
+    
+    def to_dict(self):
+        """
+        Evaluate every field
+        """
+        return {
+            'periods': self.periods,
+            'accounts_receivable': self.accounts_receivable,
+            'accounts_payable': self.accounts_payable,
+            'avg_accounts_receivable': self.avg_accounts_receivable,
+            'avg_accounts_payable': self.avg_accounts_payable,
+            'receivables_turnover': self.receivables_turnover,
+            'days_sales_outstanding': self.days_sales_outstanding,
+            'payables_turnover': self.payables_turnover,
+            'days_payables_outstanding': self.days_payables_outstanding
+        }
+
+class ExpensesAnalysis:
+    """
+    Lazily evaluated expenses by supplier analysis
+    
+    The supplier ranking is only built when top_suppliers is accessed.
+    """
+    def __init__(self, dataset, year=None, month=None, top_n=10):
+        self.dataset = dataset
+        self.year = year
+        self.month = month
+        self.top_n = top_n
+    
+    @cached_property
+    def expenses(self):
+        # Expense accounts (code starting with 5 or 6)
+        return self.dataset.get_aggregates(('5', '6'), year=self.year, month=self.month)
+    
+    @cached_property
+    def period_expenses(self):
+        # Debit movements represent expenses
+        return group_by_period(self.expenses, ['debit_movement'])
+    
+    @cached_property
+    def periods(self):
+        return self.period_expenses['period'].tolist()
+    
+    @cached_property
+    def total_expenses(self):
+        return self.period_expenses.set_index('period')['debit_movement'].to_dict()
+    
+    @cached_property
+    def total_expenses_amount(self):
+        return float(self.expenses['debit_movement'].sum())
+    
+    @cached_property
+    def top_suppliers(self):
+        supplier_expenses = group_by_third_party(self.expenses, 'debit_movement')
+        
+        # Calculate percentage of total for each supplier
+        if self.total_expenses_amount > 0:
+            supplier_expenses['percentage'] = supplier_expenses['debit_movement'] / self.total_expenses_amount * 100
+        else:
+            supplier_expenses['percentage'] = 0
+        
+        return supplier_expenses.head(self.top_n).to_dict(orient='records')
+    
+    def to_dict(self):
+        """
+        Evaluate every field
+        """
+        return {
+            'periods': self.periods,
+            'total_expenses': self.total_expenses,
+            'top_suppliers': self.top_suppliers,
+            'total_expenses_amount': self.total_expenses_amount
+        }
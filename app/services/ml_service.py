@@ -5,8 +5,19 @@ from statsmodels.tsa.statespace.sarimax import SARIMAX
 from sklearn.ensemble import IsolationForest
 import joblib
 import os
+import threading
 from pathlib import Path
+from app.services.balance_index import CodePrefixTrie
 from app.services.data_loader import data_loader
+from app.services.model_registry import ModelRegistry
+from app.services.segment_forecasting import SEGMENT_COLUMNS, MODEL_TYPES, build_segment_series, forecast_segments
+from app.services.row_anomalies import FEATURES, build_row_features, score_rows
+
+# Forecasts are precomputed up to this many periods ahead when a model is trained
+FORECAST_MAX_HORIZON = 24
+
+# Significance level of the cached forecast confidence intervals
+FORECAST_ALPHA = 0.05
 
 class MLService:
     """
@@ -23,6 +34,129 @@ class MLService:
         # Model file paths
         self.sales_forecast_model_path = self.models_path / "sales_forecast_model.pkl"
         self.anomaly_detection_model_path = self.models_path / "anomaly_detection_model.pkl"
+        self.segment_forecast_model_path = self.models_path / "sales_forecast_segments.pkl"
+        self.row_anomaly_model_path = self.models_path / "row_anomaly_model.pkl"
+        
+        # Loaded models, reloaded only when their artifact changes
+        self.models = ModelRegistry()
+        
+        # Forecasting reuses the shared statsmodels results object
+        self._forecast_lock = threading.Lock()
+    
+    def warm_up(self):
+        """
+        Load the trained models into memory ahead of the first prediction
+        
+        Returns:
+        --------
+        list
+            Artifacts that were loaded
+        """
+        # Prepared the same way predictions read them, so they hit the cache
+        return self.models.warm_up({
+            self.sales_forecast_model_path: self._prepare_sales_forecast_model,
+            self.anomaly_detection_model_path: self._prepare_anomaly_detection_model,
+            self.segment_forecast_model_path: None,
+            self.row_anomaly_model_path: None
+        })
+    
+    def _save_model(self, model_data, path):
+        """
+        Write a model artifact atomically
+        
+        The artifact is dumped to a temporary file next to it and renamed, so a
+        concurrent load sees either the previous model or the new one, never a
+        partially written file.
+        """
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            joblib.dump(model_data, tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    
+    def _group_by_numeric_period(self, aggregates, columns):
+        """
+        Sum cube columns per period, keyed and sorted by numeric period
+        """
+        grouped = aggregates.groupby(['year', 'month'], observed=True).agg(
+            {column: 'sum' for column in columns}
+        ).reset_index()
+        
+        # Calendar columns may be narrow ints in compact mode
+        grouped['year'] = grouped['year'].astype('int64')
+        grouped['month'] = grouped['month'].astype('int64')
+        grouped.insert(2, 'numeric_period', grouped['year'] * 12 + grouped['month'])
+        
+        return grouped.sort_values('numeric_period')
+    
+    @staticmethod
+    def _period_label(numeric_period):
+        year = numeric_period // 12
+        month = numeric_period % 12
+        if month == 0:
+            month = 12
+            year -= 1
+        return f"{year}-{month:02d}"
+    
+    def _build_sales_forecast(self, model, last_period, historical_data, horizon=FORECAST_MAX_HORIZON):
+        """
+        Forecast sales with confidence intervals, formatted for the API
+        
+        Parameters:
+        -----------
+        model : statsmodels results
+            Fitted SARIMA/ARIMA model
+        last_period : int
+            Numeric period of the last observation
+        historical_data : Series
+            Training series indexed by numeric period
+        horizon : int, optional
+            Number of periods to forecast
+        
+        Returns:
+        --------
+        dict
+            Forecast periods, values and interval bounds plus the historical
+            series; a shorter horizon is a prefix of every forecast list
+        """
+        forecast = model.get_forecast(steps=horizon)
+        conf_int = np.asarray(forecast.conf_int(alpha=FORECAST_ALPHA))
+        forecast_index = range(last_period + 1, last_period + horizon + 1)
+        
+        return {
+            "forecast_periods": [self._period_label(idx) for idx in forecast_index],
+            "forecast_values": [float(val) for val in np.asarray(forecast.predicted_mean)],
+            "forecast_lower": [float(val) for val in conf_int[:, 0]],
+            "forecast_upper": [float(val) for val in conf_int[:, 1]],
+            "historical_periods": [f"{idx//12}-{idx%12:02d}" for idx in historical_data.index],
+            "historical_values": [float(val) for val in historical_data.values],
+        }
+    
+    def _prepare_sales_forecast_model(self, model_data):
+        # Artifacts trained before forecasts were precomputed get them on load
+        if 'forecast' in model_data:
+            return model_data
+        
+        model_data = dict(model_data)
+        with self._forecast_lock:
+            model_data['forecast'] = self._build_sales_forecast(
+                model_data['model'], model_data['last_period'], model_data['data']
+            )
+        return model_data
+    
+    def _sales_series(self):
+        """
+        Monthly revenue series indexed by numeric period
+        """
+        # Get pre-aggregated sales data for revenue accounts (code starting with 4)
+        sales_df = self.data_loader.get_aggregates('4')
+        
+        # Group by period for time series analysis
+        period_sales = self._group_by_numeric_period(sales_df, ['credit_movement'])  # Credit movements represent revenue
+        
+        return period_sales.set_index('numeric_period')['credit_movement']
     
     def train_sales_forecast_model(self, force_retrain=False):
         """
@@ -32,7 +166,7 @@ class MLService:
         -----------
         force_retrain : bool, optional
             Force retraining of the model even if it already exists
-            
+        
         Returns:
         --------
         dict
@@ -42,19 +176,8 @@ class MLService:
         if os.path.exists(self.sales_forecast_model_path) and not force_retrain:
             return {"message": "Model already exists. Use force_retrain=True to retrain."}
         
-        # Get sales data
-        df = self.data_loader.account_balances.copy()
-        
-        # Filter for revenue accounts (code starting with 4)
-        sales_df = df[df['code'].str.startswith('4')]
-        
-        # Group by period for time series analysis
-        period_sales = sales_df.groupby(['year', 'month', 'numeric_period']).agg({
-            'credit_movement': 'sum'  # Credit movements represent revenue
-        }).reset_index().sort_values('numeric_period')
-        
         # Prepare time series data
-        ts_data = period_sales.set_index('numeric_period')['credit_movement']
+        ts_data = self._sales_series()
         
         # Check if we have enough data
         if len(ts_data) < 4:
@@ -66,10 +189,12 @@ class MLService:
             model_fit = model.fit(disp=False)
             
             # Save the model
-            joblib.dump({
+            self._save_model({
                 'model': model_fit,
+                'model_type': 'SARIMA',
                 'last_period': ts_data.index[-1],
-                'data': ts_data
+                'data': ts_data,
+                'forecast': self._build_sales_forecast(model_fit, ts_data.index[-1], ts_data)
             }, self.sales_forecast_model_path)
             
             return {
@@ -85,10 +210,12 @@ class MLService:
                 model_fit = model.fit()
                 
                 # Save the model
-                joblib.dump({
+                self._save_model({
                     'model': model_fit,
+                    'model_type': 'ARIMA',
                     'last_period': ts_data.index[-1],
-                    'data': ts_data
+                    'data': ts_data,
+                    'forecast': self._build_sales_forecast(model_fit, ts_data.index[-1], ts_data)
                 }, self.sales_forecast_model_path)
                 
                 return {
@@ -111,12 +238,15 @@ class MLService:
         -----------
         periods : int, optional
             Number of periods to forecast
-            
+        
         Returns:
         --------
         dict
-            Sales forecast results
+            Sales forecast results with confidence interval bounds
         """
+        if periods < 1:
+            return {"error": "The number of periods to forecast must be at least 1."}
+        
         # Check if model exists
         if not os.path.exists(self.sales_forecast_model_path):
             # Train model if it doesn't exist
@@ -125,41 +255,249 @@ class MLService:
                 return training_result
         
         try:
-            # Load the model
-            model_data = joblib.load(self.sales_forecast_model_path)
-            model = model_data['model']
-            last_period = model_data['last_period']
-            historical_data = model_data['data']
+            # Load the model with its precomputed forecast, from memory unless the artifact changed
+            model_data = self.models.get(self.sales_forecast_model_path, prepare=self._prepare_sales_forecast_model)
+            forecast = model_data['forecast']
             
-            # Make forecast
-            forecast = model.forecast(steps=periods)
-            forecast_index = range(last_period + 1, last_period + periods + 1)
+            if periods > len(forecast['forecast_values']):
+                # Beyond the cached horizon, forecast on demand
+                with self._forecast_lock:
+                    return self._build_sales_forecast(
+                        model_data['model'], model_data['last_period'], model_data['data'], horizon=periods
+                    )
             
-            # Convert forecast to dictionary
-            forecast_dict = {idx: val for idx, val in zip(forecast_index, forecast)}
+            # Forecasts for shorter horizons are prefixes of the cached one
+            result = dict(forecast)
+            for key in ('forecast_periods', 'forecast_values', 'forecast_lower', 'forecast_upper'):
+                result[key] = forecast[key][:periods]
             
-            # Convert numeric periods to year-month format
-            period_mapping = {}
-            for idx in forecast_index:
-                year = idx // 12
-                month = idx % 12
-                if month == 0:
-                    month = 12
-                    year -= 1
-                period_mapping[idx] = f"{year}-{month:02d}"
+            return result
+        
+        except Exception as e:
+            return {"error": f"Failed to predict sales: {str(e)}"}
+    
+    def update_sales_forecast_model(self):
+        """
+        Append periods newer than the model's last_period to the fitted model
+        
+        The new observations extend the state-space model without refitting
+        its parameters, and the cached forecast is rebuilt from the updated
+        state. When there is no model yet, or the new periods cannot be
+        appended (e.g. a gap in the periods), the model is trained from scratch.
+        
+        Returns:
+        --------
+        dict
+            Update results, including the periods that were added
+        """
+        if not os.path.exists(self.sales_forecast_model_path):
+            return self.train_sales_forecast_model()
+        
+        model_data = self.models.get(self.sales_forecast_model_path, prepare=self._prepare_sales_forecast_model)
+        last_period = model_data['last_period']
+        
+        # Only periods after the last one the model has seen are new
+        ts_data = self._sales_series()
+        new_data = ts_data[ts_data.index > last_period]
+        
+        if new_data.empty:
+            return {
+                "message": "Sales forecast model is up to date",
+                "last_period": self._period_label(last_period)
+            }
+        
+        try:
+            model_fit = model_data['model'].append(new_data)
+            data = pd.concat([model_data['data'], new_data])
+        except Exception:
+            # Appending requires consecutive periods; refit instead
+            return self.train_sales_forecast_model(force_retrain=True)
+        
+        try:
+            # Save the model
+            self._save_model({
+                'model': model_fit,
+                'model_type': model_data.get('model_type'),
+                'last_period': data.index[-1],
+                'data': data,
+                'forecast': self._build_sales_forecast(model_fit, data.index[-1], data)
+            }, self.sales_forecast_model_path)
             
-            # Prepare result with confidence intervals
-            result = {
-                "forecast_periods": [period_mapping[idx] for idx in forecast_index],
-                "forecast_values": [float(val) for val in forecast],
-                "historical_periods": [period_mapping.get(idx, f"{idx//12}-{idx%12:02d}") for idx in historical_data.index],
-                "historical_values": [float(val) for val in historical_data.values],
+            return {
+                "message": "Sales forecast model updated with new periods",
+                "model_type": model_data.get('model_type'),
+                "new_periods": [self._period_label(idx) for idx in new_data.index],
+                "periods_used": len(data)
             }
+        
+        except Exception as e:
+            return {"error": f"Failed to update sales forecast model: {str(e)}"}
+    
+    def train_segment_forecasts(self, force_retrain=False, workers=None):
+        """
+        Train sales forecasts per customer and per revenue sub-account
+        
+        Every segment series is fitted with SARIMA, falling back to ARIMA and
+        then to a naive seasonal forecast, across a process pool. Forecasts for
+        FORECAST_MAX_HORIZON periods are stored in a single artifact; the
+        fitted models themselves are not kept.
+        
+        Parameters:
+        -----------
+        force_retrain : bool, optional
+            Force retraining even if the forecasts already exist
+        workers : int, optional
+            Worker processes; defaults to the number of CPUs
+        
+        Returns:
+        --------
+        dict
+            Training results
+        """
+        # Check if forecasts already exist and we're not forcing a retrain
+        if os.path.exists(self.segment_forecast_model_path) and not force_retrain:
+            return {"message": "Segment forecasts already exist. Use force_retrain=True to retrain."}
+        
+        # Revenue accounts (code starting with 4), credit movements represent revenue
+        revenue = self.data_loader.money_as_float(self.data_loader.get_filtered_data(code_prefix='4'))
+        segments, periods, values = build_segment_series(revenue)
+        
+        # Check if we have enough data
+        if len(periods) == 0:
+            return {"error": "No revenue data to forecast."}
+        
+        try:
+            model_types, forecasts = forecast_segments(values, FORECAST_MAX_HORIZON, workers=workers)
+            segments['model_type'] = pd.Categorical.from_codes(model_types, categories=list(MODEL_TYPES))
             
-            return result
+            # Save the forecasts
+            self._save_model({
+                'segments': segments,
+                'forecast': forecasts,
+                'last_period': int(periods[-1]),
+                'periods_used': len(periods)
+            }, self.segment_forecast_model_path)
+            
+            return {
+                "message": "Segment sales forecasts trained successfully",
+                "segments": len(segments),
+                "model_types": {model_type: int(count) for model_type, count in segments['model_type'].value_counts().items()},
+                "periods_used": len(periods)
+            }
         
         except Exception as e:
-            return {"error": f"Failed to predict sales: {str(e)}"}
+            return {"error": f"Failed to train segment sales forecasts: {str(e)}"}
+    
+    def predict_segment_sales(self, segment_type=None, segment_id=None, periods=3, offset=0, limit=100):
+        """
+        Get precomputed sales forecasts per segment
+        
+        Parameters:
+        -----------
+        segment_type : str, optional
+            Filter by segment type, one of SEGMENT_COLUMNS
+        segment_id : str, optional
+            Filter by third party ID or account code
+        periods : int, optional
+            Number of periods to forecast, at most FORECAST_MAX_HORIZON
+        offset : int, optional
+            Number of matching segments to skip
+        limit : int, optional
+            Maximum number of segments to return
+        
+        Returns:
+        --------
+        dict
+            Forecast periods, total matching segments and, per segment, the
+            model used and its forecast values
+        """
+        if segment_type is not None and segment_type not in SEGMENT_COLUMNS:
+            return {"error": f"Unknown segment type '{segment_type}'. Expected one of {list(SEGMENT_COLUMNS)}"}
+        if periods > FORECAST_MAX_HORIZON:
+            return {"error": f"Segment forecasts cover at most {FORECAST_MAX_HORIZON} periods."}
+        
+        # Check if forecasts exist
+        if not os.path.exists(self.segment_forecast_model_path):
+            # Train forecasts if they don't exist
+            training_result = self.train_segment_forecasts()
+            if "error" in training_result:
+                return training_result
+        
+        try:
+            # Load the forecasts, from memory unless the artifact changed
+            model_data = self.models.get(self.segment_forecast_model_path)
+            segments = model_data['segments']
+            last_period = model_data['last_period']
+            
+            mask = np.ones(len(segments), dtype=bool)
+            if segment_type is not None:
+                mask = mask & (segments['segment_type'] == segment_type).to_numpy()
+            if segment_id is not None:
+                mask = mask & (segments['segment_id'] == str(segment_id)).to_numpy()
+            
+            positions = np.flatnonzero(mask)
+            page = positions[offset:offset + limit]
+            forecast = model_data['forecast'][page, :periods]
+            
+            return {
+                "forecast_periods": [self._period_label(idx) for idx in range(last_period + 1, last_period + periods + 1)],
+                "total_segments": int(len(positions)),
+                "segments": [
+                    {
+                        "segment_type": segments['segment_type'].iat[position],
+                        "segment_id": segments['segment_id'].iat[position],
+                        "model_type": segments['model_type'].iat[position],
+                        "forecast_values": forecast[row].tolist()
+                    }
+                    for row, position in enumerate(page)
+                ]
+            }
+        
+        except Exception as e:
+            return {"error": f"Failed to get segment sales forecasts: {str(e)}"}
+    
+    def _cash_flow_series(self):
+        """
+        Monthly debit, credit and net flow over all accounts
+        """
+        # Get pre-aggregated cash flow data for all accounts
+        df = self.data_loader.get_aggregates('')
+        
+        # Calculate daily net cash flow (simplified)
+        cash_flow_df = self._group_by_numeric_period(df, ['debit_movement', 'credit_movement'])
+        
+        cash_flow_df['net_flow'] = cash_flow_df['credit_movement'] - cash_flow_df['debit_movement']
+        
+        return cash_flow_df
+    
+    def _score_cash_flow(self, model, cash_flow_df):
+        """
+        Add is_anomaly and anomaly_score columns to a copy of the cash flow
+        """
+        cash_flow_df = cash_flow_df.copy()
+        
+        # Prepare features for anomaly detection
+        X = cash_flow_df[['net_flow']].values
+        
+        # Predict anomalies
+        # -1 for anomalies, 1 for normal points
+        predictions = model.predict(X)
+        anomaly_scores = model.decision_function(X)
+        
+        # Add predictions to dataframe
+        cash_flow_df['is_anomaly'] = predictions == -1
+        cash_flow_df['anomaly_score'] = anomaly_scores
+        
+        return cash_flow_df
+    
+    def _prepare_anomaly_detection_model(self, model_data):
+        # Artifacts trained before scores were stored get them on load
+        if 'anomaly_score' in model_data['data'].columns:
+            return model_data
+        
+        model_data = dict(model_data)
+        model_data['data'] = self._score_cash_flow(model_data['model'], model_data['data'])
+        return model_data
     
     def train_anomaly_detection_model(self, force_retrain=False):
         """
@@ -169,7 +507,7 @@ class MLService:
         -----------
         force_retrain : bool, optional
             Force retraining of the model even if it already exists
-            
+        
         Returns:
         --------
         dict
@@ -179,16 +517,7 @@ class MLService:
         if os.path.exists(self.anomaly_detection_model_path) and not force_retrain:
             return {"message": "Model already exists. Use force_retrain=True to retrain."}
         
-        # Get cash flow data
-        df = self.data_loader.account_balances.copy()
-        
-        # Calculate daily net cash flow (simplified)
-        cash_flow_df = df.groupby(['year', 'month', 'numeric_period']).agg({
-            'debit_movement': 'sum',
-            'credit_movement': 'sum'
-        }).reset_index()
-        
-        cash_flow_df['net_flow'] = cash_flow_df['credit_movement'] - cash_flow_df['debit_movement']
+        cash_flow_df = self._cash_flow_series()
         
         # Check if we have enough data
         if len(cash_flow_df) < 10:
@@ -202,10 +531,10 @@ class MLService:
             model = IsolationForest(contamination=0.1, random_state=42)
             model.fit(X)
             
-            # Save the model
-            joblib.dump({
+            # Save the model with the scores of the training periods
+            self._save_model({
                 'model': model,
-                'data': cash_flow_df
+                'data': self._score_cash_flow(model, cash_flow_df)
             }, self.anomaly_detection_model_path)
             
             return {
@@ -234,23 +563,10 @@ class MLService:
                 return training_result
         
         try:
-            # Load the model
-            model_data = joblib.load(self.anomaly_detection_model_path)
-            model = model_data['model']
+            # Load the model with its stored scores, from memory unless the artifact changed
+            model_data = self.models.get(self.anomaly_detection_model_path, prepare=self._prepare_anomaly_detection_model)
             cash_flow_df = model_data['data'].copy()
             
-            # Prepare features for anomaly detection
-            X = cash_flow_df[['net_flow']].values
-            
-            # Predict anomalies
-            # -1 for anomalies, 1 for normal points
-            predictions = model.predict(X)
-            anomaly_scores = model.decision_function(X)
-            
-            # Add predictions to dataframe
-            cash_flow_df['is_anomaly'] = predictions == -1
-            cash_flow_df['anomaly_score'] = anomaly_scores
-            
             # Create period column for output
             cash_flow_df['period'] = cash_flow_df['year'].astype(str) + '-' + cash_flow_df['month'].astype(str).str.zfill(2)
             
@@ -271,6 +587,181 @@ class MLService:
         
         except Exception as e:
             return {"error": f"Failed to detect anomalies: {str(e)}"}
+    
+    def train_row_anomaly_model(self, force_retrain=False, n_jobs=-1):
+        """
+        Score every (account code, third party, period) row for anomalies
+        
+        An Isolation Forest is fitted on debit, credit and balance change plus
+        their z-scores against each row's own account and third party history,
+        and the whole table is scored in one vectorized pass. The scores are
+        stored sorted, so anomalies can be paged without rescoring.
+        
+        Parameters:
+        -----------
+        force_retrain : bool, optional
+            Force retraining of the model even if it already exists
+        n_jobs : int, optional
+            Parallel jobs for fitting and scoring; -1 uses every CPU
+        
+        Returns:
+        --------
+        dict
+            Training results
+        """
+        # Check if model already exists and we're not forcing a retrain
+        if os.path.exists(self.row_anomaly_model_path) and not force_retrain:
+            return {"message": "Model already exists. Use force_retrain=True to retrain."}
+        
+        balances = self.data_loader.money_as_float(self.data_loader.account_balances)
+        rows = build_row_features(balances)
+        
+        # Check if we have enough data
+        if len(rows) < 10:
+            return {"error": "Not enough data to train a row anomaly detection model. Need at least 10 rows."}
+        
+        try:
+            model, scores = score_rows(rows, n_jobs=n_jobs)
+            scores['period'] = [self._period_label(idx) for idx in scores['numeric_period']]
+            
+            # Save the model with the sorted scores and their code prefix index
+            self._save_model({
+                'model': model,
+                'scores': scores,
+                'code_index': CodePrefixTrie(scores['code'].to_numpy())
+            }, self.row_anomaly_model_path)
+            
+            return {
+                "message": "Row anomaly detection model trained successfully",
+                "model_type": "IsolationForest",
+                "rows_scored": len(scores),
+                "anomaly_count": int(scores['is_anomaly'].sum())
+            }
+        
+        except Exception as e:
+            return {"error": f"Failed to train row anomaly detection model: {str(e)}"}
+    
+    def get_row_anomalies(self, offset=0, limit=50, only_anomalies=True, code_prefix=None, third_party_id=None):
+        """
+        Page through stored row anomaly scores, most anomalous first
+        
+        Parameters:
+        -----------
+        offset : int, optional
+            Number of matching rows to skip
+        limit : int, optional
+            Maximum number of rows to return
+        only_anomalies : bool, optional
+            Return only rows flagged as anomalies
+        code_prefix : str, optional
+            Filter by account code prefix (e.g., '4', '1.3')
+        third_party_id : int, optional
+            Filter by third party ID
+        
+        Returns:
+        --------
+        dict
+            Total matching rows and the requested page with keys, features
+            and anomaly score
+        """
+        # Check if model exists
+        if not os.path.exists(self.row_anomaly_model_path):
+            # Train model if it doesn't exist
+            training_result = self.train_row_anomaly_model()
+            if "error" in training_result:
+                return training_result
+        
+        try:
+            # Load the stored scores, from memory unless the artifact changed
+            artifact = self.models.get(self.row_anomaly_model_path)
+            scores = artifact['scores']
+            
+            mask = np.ones(len(scores), dtype=bool)
+            if only_anomalies:
+                mask = mask & scores['is_anomaly'].to_numpy()
+            if code_prefix is not None:
+                # Artifacts saved without the index are indexed on each request
+                code_index = artifact.get('code_index') or CodePrefixTrie(scores['code'].to_numpy())
+                matches = np.zeros(len(scores), dtype=bool)
+                matches[code_index.lookup(code_prefix)] = True
+                mask = mask & matches
+            if third_party_id is not None:
+                mask = mask & (scores['third_party_id'] == third_party_id).to_numpy()
+            
+            positions = np.flatnonzero(mask)
+            page = scores.iloc[positions[offset:offset + limit]]
+            columns = ['code', 'third_party_id', 'period'] + FEATURES + ['anomaly_score']
+            
+            return {
+                "total": int(len(positions)),
+                "offset": offset,
+                "limit": limit,
+                "rows": page[columns].to_dict(orient='records')
+            }
+        
+        except Exception as e:
+            return {"error": f"Failed to get row anomalies: {str(e)}"}
+    
+    def update_anomaly_detection_model(self):
+        """
+        Score periods newer than the model's data without refitting
+        
+        Only the new periods are scored with the existing Isolation Forest and
+        appended to the stored scores. Without a model it is trained from scratch.
+        
+        Returns:
+        --------
+        dict
+            Update results, including the periods that were scored
+        """
+        if not os.path.exists(self.anomaly_detection_model_path):
+            return self.train_anomaly_detection_model()
+        
+        model_data = self.models.get(self.anomaly_detection_model_path, prepare=self._prepare_anomaly_detection_model)
+        data = model_data['data']
+        last_period = data['numeric_period'].max()
+        
+        # Only periods after the last one the model has seen are new
+        cash_flow_df = self._cash_flow_series()
+        new_data = cash_flow_df[cash_flow_df['numeric_period'] > last_period]
+        
+        if new_data.empty:
+            return {
+                "message": "Anomaly detection model is up to date",
+                "last_period": self._period_label(last_period)
+            }
+        
+        try:
+            new_scores = self._score_cash_flow(model_data['model'], new_data)
+            
+            # Save the model
+            self._save_model({
+                'model': model_data['model'],
+                'data': pd.concat([data, new_scores], ignore_index=True)
+            }, self.anomaly_detection_model_path)
+            
+            return {
+                "message": "Anomaly detection scores updated with new periods",
+                "new_periods": [self._period_label(idx) for idx in new_scores['numeric_period']],
+                "new_anomalies": int(new_scores['is_anomaly'].sum())
+            }
+        
+        except Exception as e:
+            return {"error": f"Failed to update anomaly detection model: {str(e)}"}
+    
+    def update_models(self):
+        """
+        Bring the sales forecast and anomaly detection models up to the latest period
+        
+        Returns:
+        --------
+        dict
+            Update results per model
+        """
+        return {
+            "sales_forecast": self.update_sales_forecast_model(),
+            "anomaly_detection": self.update_anomaly_detection_model()
+        }
 
 # Singleton instance
 ml_service = MLService()
@@ -0,0 +1,112 @@
+import os
+import threading
+import joblib
+
+class ModelRegistry:
+    """
+    In-memory cache of loaded model artifacts
+    
+    An artifact is unpickled once and served from memory while its file is
+    unchanged. The file's mtime, size and inode identify the artifact version;
+    since artifacts are replaced atomically, a retrained model gets a new
+    version and is reloaded on the next access.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+        self.loads = 0
+        self.hits = 0
+    
+    @staticmethod
+    def _artifact_version(path):
+        stat = os.stat(path)
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+    
+    def get(self, path, prepare=None):
+        """
+        Get the contents of a model artifact, loading it only when it changed
+        
+        Loaded artifacts are shared between callers and must not be modified.
+        
+        Parameters:
+        -----------
+        path : str or Path
+            Artifact written with joblib.dump
+        prepare : callable, optional
+            Applied to the artifact once per load; its return value is what
+            is cached, so derived data is computed once per artifact version.
+            An artifact cached with another prepare callable is loaded again.
+        
+        Returns:
+        --------
+        object
+            The unpickled artifact
+        
+        Raises:
+        -------
+        FileNotFoundError
+            When the artifact does not exist
+        """
+        key = str(path)
+        version = self._artifact_version(path)
+        
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version and entry[1] == prepare:
+                self.hits += 1
+                return entry[2]
+        
+        model_data = joblib.load(path)
+        if prepare is not None:
+            model_data = prepare(model_data)
+        
+        with self._lock:
+            self._entries[key] = (version, prepare, model_data)
+            self.loads += 1
+        
+        return model_data
+    
+    def warm_up(self, artifacts):
+        """
+        Load the artifacts that exist so the first requests find them in memory
+        
+        Parameters:
+        -----------
+        artifacts : dict
+            Mapping of artifact path to the prepare callable its readers pass
+            to get (or None). Missing artifacts are skipped, and so are those
+            that fail to load, so the request reading them reports the error.
+        
+        Returns:
+        --------
+        list
+            Paths that were loaded
+        """
+        loaded = []
+        for path, prepare in artifacts.items():
+            if not os.path.exists(path):
+                continue
+            try:
+                self.get(path, prepare=prepare)
+            except Exception:
+                continue
+            loaded.append(str(path))
+        return loaded
+    
+    def clear(self):
+        """
+        Drop every loaded artifact
+        """
+        with self._lock:
+            self._entries.clear()
+    
+    def get_stats(self):
+        """
+        Get loaded artifacts and load/hit counters
+        """
+        with self._lock:
+            return {
+                'models': sorted(self._entries),
+                'loads': self.loads,
+                'hits': self.hits
+            }
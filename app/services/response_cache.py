@@ -0,0 +1,189 @@
+import copy
+import functools
+import inspect
+import threading
+import time
+from collections import OrderedDict
+
+def _detached(value):
+    # Plain responses are handed out as copies so a caller changing one cannot
+    # change what later callers get; other objects (lazy analyses) are shared
+    if isinstance(value, (dict, list)):
+        return copy.deepcopy(value)
+    return value
+
+class ResponseCache:
+    """
+    In-process LRU cache with a time-to-live for computed responses
+    
+    Entries are keyed by namespace, method name and call parameters and tagged
+    with the dataset version they were computed from; an entry from another
+    version is treated as a miss, so reloading the dataset invalidates every
+    response. Services over different datasets share one cache under their
+    own namespace.
+    """
+    def __init__(self, max_entries=256, ttl=300):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.configure(max_entries=max_entries, ttl=ttl)
+    
+    def configure(self, max_entries=256, ttl=300):
+        """
+        Set the cache bounds and drop every entry
+        
+        Parameters:
+        -----------
+        max_entries : int, optional
+            Maximum number of cached responses; the least recently used one is
+            evicted first. 0 disables the cache.
+        ttl : float, optional
+            Seconds a response stays valid. None keeps it until evicted or
+            invalidated by a new dataset version.
+        """
+        with self._lock:
+            self.max_entries = max_entries
+            self.ttl = ttl
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+            self.expirations = 0
+    
+    def get_or_compute(self, method, key, version, compute, namespace=None):
+        """
+        Return the cached response for (method, key), computing it on a miss
+        
+        Dict and list responses are returned as copies of the cached one, so
+        callers may modify them. Other objects are shared between callers and
+        must not be modified.
+        
+        Parameters:
+        -----------
+        method : str
+            Name of the computation
+        key : tuple
+            Hashable call parameters
+        version : hashable
+            Version of the data the response is computed from
+        compute : callable
+            Produces the response when it is not cached
+        namespace : hashable, optional
+            Dataset the response belongs to, e.g. a tenant id
+        
+        Returns:
+        --------
+        object
+            The cached or freshly computed response
+        """
+        cache_key = (namespace, method, key)
+        now = time.monotonic()
+        
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            hit = False
+            if entry is not None:
+                entry_version, expires_at, value = entry
+                hit = entry_version == version and (expires_at is None or now < expires_at)
+                if hit:
+                    self._entries.move_to_end(cache_key)
+                    self.hits += 1
+                else:
+                    del self._entries[cache_key]
+                    if entry_version == version:
+                        self.expirations += 1
+            
+            if not hit:
+                self.misses += 1
+        
+        # Copied outside the lock so other callers are not held up
+        if hit:
+            return _detached(value)
+        
+        value = compute()
+        
+        if self.max_entries > 0:
+            with self._lock:
+                expires_at = now + self.ttl if self.ttl is not None else None
+                self._entries[cache_key] = (version, expires_at, value)
+                self._entries.move_to_end(cache_key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+            return _detached(value)
+        
+        return value
+    
+    def clear(self):
+        """
+        Drop every cached response, keeping the counters
+        """
+        with self._lock:
+            self._entries.clear()
+    
+    def clear_namespace(self, namespace):
+        """
+        Drop the cached responses of one namespace
+        """
+        with self._lock:
+            for cache_key in [cache_key for cache_key in self._entries if cache_key[0] == namespace]:
+                del self._entries[cache_key]
+    
+    def get_stats(self):
+        """
+        Get cache size and hit/miss counters
+        
+        Returns:
+        --------
+        dict
+            Entries, bounds, hits, misses, hit ratio, evictions and expirations
+        """
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / requests if requests else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations
+            }
+
+def cached_response(*key_params):
+    """
+    Cache a service method's result in the service's response cache
+    
+    The decorated method's instance must expose a ``cache`` (ResponseCache),
+    the ``dataset`` it queries, ``pinned(dataset)`` returning an instance
+    whose queries all run against that dataset, and a ``cache_namespace``.
+    The dataset is resolved once per call: the method runs on the pinned
+    instance, so its queries and nested cached calls read one version, and
+    the response is cached under that dataset's version. The key is the
+    method name plus the given parameters, with defaults applied, so
+    ``analyze_sales()`` and ``analyze_sales(year=None)`` share one entry.
+    
+    Parameters:
+    -----------
+    *key_params : str
+        Names of the method parameters that identify a response
+    """
+    def decorator(method):
+        signature = inspect.signature(method)
+        
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            key = tuple(bound.arguments.get(name) for name in key_params)
+            dataset = self.dataset
+            service = self.pinned(dataset)
+            return self.cache.get_or_compute(
+                method.__name__, key, dataset.version,
+                lambda: method(service, *args, **kwargs),
+                namespace=self.cache_namespace
+            )
+        
+        return wrapper
+    
+    return decorator
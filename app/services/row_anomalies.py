@@ -0,0 +1,82 @@
+from sklearn.ensemble import IsolationForest
+
+# Rows are scored per account code, third party and period
+ROW_KEYS = ['code', 'third_party_id', 'numeric_period']
+
+# Each (code, third party) pair is the history a row is compared with
+HISTORY_KEYS = ['code', 'third_party_id']
+
+AMOUNT_FEATURES = ['debit_movement', 'credit_movement', 'balance_delta']
+
+FEATURES = AMOUNT_FEATURES + [f"{column}_zscore" for column in AMOUNT_FEATURES]
+
+def build_row_features(balances):
+    """
+    Aggregate balances to one row per ROW_KEYS with anomaly features
+    
+    Besides the period's debit, credit and balance change, every amount is
+    expressed as a z-score against the same account and third party in other
+    periods, so a movement that is normal for the ledger but unusual for that
+    pair still stands out. Pairs with a single period or a constant amount get
+    a z-score of 0.
+    
+    Parameters:
+    -----------
+    balances : pandas.DataFrame
+        Balances rows with float money columns
+    
+    Returns:
+    --------
+    pandas.DataFrame
+        ROW_KEYS plus FEATURES columns
+    """
+    rows = balances.groupby(ROW_KEYS, observed=True).agg({
+        'debit_movement': 'sum',
+        'credit_movement': 'sum',
+        'initial_balance': 'sum',
+        'final_balance': 'sum'
+    }).reset_index()
+    
+    rows['balance_delta'] = rows['final_balance'] - rows['initial_balance']
+    rows = rows.drop(columns=['initial_balance', 'final_balance'])
+    
+    history = rows.groupby(HISTORY_KEYS, observed=True)[AMOUNT_FEATURES]
+    mean = history.transform('mean')
+    std = history.transform('std', ddof=0)
+    zscores = (rows[AMOUNT_FEATURES] - mean) / std.where(std > 0)
+    for column in AMOUNT_FEATURES:
+        rows[f"{column}_zscore"] = zscores[column].fillna(0.0)
+    
+    return rows
+
+def score_rows(rows, contamination=0.01, n_jobs=-1):
+    """
+    Fit an Isolation Forest on every row and score the whole table at once
+    
+    Parameters:
+    -----------
+    rows : pandas.DataFrame
+        Output of build_row_features
+    contamination : float, optional
+        Expected share of anomalous rows
+    n_jobs : int, optional
+        Parallel jobs for fitting and scoring; -1 uses every CPU
+    
+    Returns:
+    --------
+    tuple
+        (model, scored) where scored is rows with is_anomaly and
+        anomaly_score columns, most anomalous first
+    """
+    X = rows[FEATURES].to_numpy(dtype='float64')
+    
+    model = IsolationForest(contamination=contamination, random_state=42, n_jobs=n_jobs)
+    model.fit(X)
+    
+    # Lower scores are more anomalous; negative ones fall below the contamination threshold
+    scores = model.decision_function(X)
+    
+    scored = rows.copy()
+    scored['anomaly_score'] = scores
+    scored['is_anomaly'] = scores < 0
+    return model, scored.sort_values('anomaly_score', kind='stable').reset_index(drop=True)
@@ -0,0 +1,158 @@
+import multiprocessing
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+import numpy as np
+import pandas as pd
+from statsmodels.tsa.arima.model import ARIMA
+from statsmodels.tsa.statespace.sarimax import SARIMAX
+
+# Segment type -> balances column identifying the segment
+SEGMENT_COLUMNS = {
+    'third_party': 'third_party_id',
+    'account': 'code'
+}
+
+# Models tried for each series, in order
+MODEL_TYPES = ('SARIMA', 'ARIMA', 'naive_seasonal')
+
+SEASONAL_PERIOD = 12
+
+# Shortest series worth fitting each model on
+MIN_SARIMA_PERIODS = 2 * SEASONAL_PERIOD
+MIN_ARIMA_PERIODS = 4
+
+# Series fitted per worker task
+BATCH_SIZE = 64
+
+def build_segment_series(revenue):
+    """
+    Build one monthly revenue series per segment from a single groupby
+    
+    Revenue is summed once per (third party, account code, period); the series
+    of every segment type are derived from that small frame. Periods without
+    movements count as zero revenue.
+    
+    Parameters:
+    -----------
+    revenue : pandas.DataFrame
+        Balances rows of revenue accounts with float credit_movement
+    
+    Returns:
+    --------
+    tuple
+        (segments, periods, values) where segments has segment_type and
+        segment_id columns, periods are the consecutive numeric periods and
+        values holds one row per segment and one column per period
+    """
+    grouped = revenue.groupby(
+        list(SEGMENT_COLUMNS.values()) + ['numeric_period'], observed=True
+    )['credit_movement'].sum()
+    
+    if grouped.empty:
+        return pd.DataFrame({'segment_type': [], 'segment_id': []}), np.array([], dtype='int64'), np.empty((0, 0))
+    
+    numeric_periods = grouped.index.get_level_values('numeric_period')
+    periods = np.arange(numeric_periods.min(), numeric_periods.max() + 1)
+    
+    segment_types = []
+    segment_ids = []
+    values = []
+    for segment_type, column in SEGMENT_COLUMNS.items():
+        series = grouped.groupby(level=[column, 'numeric_period'], observed=True).sum().unstack(fill_value=0.0)
+        series = series.reindex(columns=periods, fill_value=0.0)
+        segment_types.extend([segment_type] * len(series))
+        segment_ids.extend(str(segment_id) for segment_id in series.index)
+        values.append(series.to_numpy(dtype='float64'))
+    
+    segments = pd.DataFrame({
+        'segment_type': pd.Categorical(segment_types, categories=list(SEGMENT_COLUMNS)),
+        'segment_id': segment_ids
+    })
+    return segments, periods, np.vstack(values)
+
+def naive_seasonal_forecast(values, horizon):
+    """
+    Repeat the last season, or the last value when there is no full season
+    """
+    if len(values) >= SEASONAL_PERIOD:
+        last_season = values[-SEASONAL_PERIOD:]
+        return np.array([last_season[step % SEASONAL_PERIOD] for step in range(horizon)], dtype='float64')
+    return np.full(horizon, values[-1], dtype='float64')
+
+def fit_series(values, horizon):
+    """
+    Forecast one series, falling back from SARIMA to ARIMA to naive seasonal
+    
+    A model is skipped when the series is too short for it, and abandoned
+    when fitting fails or its forecast is not finite. Constant series go
+    straight to the naive forecast.
+    
+    Returns:
+    --------
+    tuple
+        (index in MODEL_TYPES, forecast values)
+    """
+    if np.ptp(values) > 0:
+        if len(values) >= MIN_SARIMA_PERIODS:
+            try:
+                model_fit = SARIMAX(values, order=(1, 1, 1), seasonal_order=(1, 1, 1, SEASONAL_PERIOD)).fit(disp=False)
+                forecast = np.asarray(model_fit.forecast(steps=horizon), dtype='float64')
+                if np.isfinite(forecast).all():
+                    return 0, forecast
+            except Exception:
+                pass
+        
+        if len(values) >= MIN_ARIMA_PERIODS:
+            try:
+                model_fit = ARIMA(values, order=(1, 1, 1)).fit()
+                forecast = np.asarray(model_fit.forecast(steps=horizon), dtype='float64')
+                if np.isfinite(forecast).all():
+                    return 1, forecast
+            except Exception:
+                pass
+    
+    return 2, naive_seasonal_forecast(values, horizon)
+
+def fit_batch(values, horizon):
+    """
+    Forecast every row of a 2D array of series
+    """
+    # Short series make statsmodels warn on nearly every fit
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        return [fit_series(row, horizon) for row in values]
+
+def forecast_segments(values, horizon, workers=None, batch_size=BATCH_SIZE):
+    """
+    Forecast many series in parallel across a process pool
+    
+    Parameters:
+    -----------
+    values : numpy.ndarray
+        One series per row
+    horizon : int
+        Number of periods to forecast
+    workers : int, optional
+        Worker processes; defaults to the number of CPUs. 1 fits in-process.
+    batch_size : int, optional
+        Series per worker task
+    
+    Returns:
+    --------
+    tuple
+        (model_types, forecasts) with the MODEL_TYPES index used for each
+        series and one forecast row per series
+    """
+    batches = [values[start:start + batch_size] for start in range(0, len(values), batch_size)]
+    
+    if workers == 1 or len(batches) <= 1:
+        results = [fit_batch(batch, horizon) for batch in batches]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+            results = list(executor.map(fit_batch, batches, repeat(horizon)))
+    
+    fitted = [result for batch in results for result in batch]
+    model_types = np.array([model_type for model_type, _ in fitted], dtype='int8')
+    forecasts = np.vstack([forecast for _, forecast in fitted]) if fitted else np.empty((0, horizon))
+    return model_types, forecasts
@@ -0,0 +1,228 @@
+import hashlib
+import json
+import os
+import shutil
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+# Bump when the on-disk layout changes so stale snapshots are rebuilt
+SNAPSHOT_FORMAT_VERSION = 2
+
+MANIFEST_FILE = "current.json"
+
+def file_sha256(path, chunk_size=1 << 20):
+    """
+    Compute the SHA-256 of a file without reading it into memory at once
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def read_manifest(snapshot_dir):
+    """
+    Read the manifest of the current snapshot, or None if there is none
+    """
+    try:
+        with open(Path(snapshot_dir) / MANIFEST_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+def _write_manifest(snapshot_dir, manifest):
+    # Write to a temporary file and rename so readers never see a partial manifest
+    tmp_path = Path(snapshot_dir) / f"{MANIFEST_FILE}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, Path(snapshot_dir) / MANIFEST_FILE)
+
+def snapshot_is_current(snapshot_dir, source_path):
+    """
+    Check whether the snapshot was built from the current source file
+    
+    The source mtime and size are compared first; when only the mtime changed,
+    the file hash decides and the manifest is refreshed if the content is the same.
+    
+    Parameters:
+    -----------
+    snapshot_dir : str or Path
+        Directory holding the snapshot
+    source_path : str or Path
+        Source CSV file the snapshot was built from
+    
+    Returns:
+    --------
+    bool
+        True if the snapshot can be loaded instead of parsing the source
+    """
+    manifest = read_manifest(snapshot_dir)
+    if manifest is None or manifest.get("format") != SNAPSHOT_FORMAT_VERSION:
+        return False
+    
+    source = manifest["source"]
+    stat = os.stat(source_path)
+    if stat.st_mtime_ns == source["mtime_ns"] and stat.st_size == source["size"]:
+        return True
+    
+    if stat.st_size != source["size"] or file_sha256(source_path) != source["sha256"]:
+        return False
+    
+    # Same content with a new mtime (e.g. copied on deploy): remember the new mtime
+    source["mtime_ns"] = stat.st_mtime_ns
+    try:
+        _write_manifest(snapshot_dir, manifest)
+    except OSError:
+        pass
+    return True
+
+def write_snapshot(df, snapshot_dir, source_path):
+    """
+    Write a typed columnar snapshot of a DataFrame
+    
+    Numeric, boolean and datetime columns are stored as one .npy file each so
+    they can be memory-mapped. String and categorical columns are dictionary
+    encoded as int32 codes plus a sorted categories array (code -1 marks a
+    missing value).
+    
+    Each snapshot lives in its own directory named after the source hash, and
+    the manifest pointing at it is swapped atomically, so concurrent readers
+    always see a complete snapshot.
+    
+    Parameters:
+    -----------
+    df : pandas.DataFrame
+        Data to store, including derived columns
+    snapshot_dir : str or Path
+        Directory holding the snapshot
+    source_path : str or Path
+        Source CSV file the data was parsed from
+    
+    Returns:
+    --------
+    dict
+        The new manifest
+    """
+    snapshot_dir = Path(snapshot_dir)
+    stat = os.stat(source_path)
+    sha256 = file_sha256(source_path)
+    
+    directory = f"v{SNAPSHOT_FORMAT_VERSION}-{sha256[:16]}"
+    target = snapshot_dir / directory
+    tmp_target = snapshot_dir / f"{directory}.{os.getpid()}.tmp"
+    shutil.rmtree(tmp_target, ignore_errors=True)
+    os.makedirs(tmp_target)
+    
+    columns = []
+    for position, name in enumerate(df.columns):
+        series = df[name]
+        file_stem = f"{position:03d}"
+        memory_bytes = int(series.memory_usage(deep=True, index=False))
+        
+        if pd.api.types.is_numeric_dtype(series.dtype) or pd.api.types.is_bool_dtype(series.dtype) \
+                or pd.api.types.is_datetime64_any_dtype(series.dtype):
+            np.save(tmp_target / f"{file_stem}.npy", series.to_numpy())
+            columns.append({
+                "name": name,
+                "kind": "array",
+                "file": f"{file_stem}.npy",
+                "memory_bytes": memory_bytes
+            })
+        else:
+            codes, categories = pd.factorize(series, sort=True)
+            np.save(tmp_target / f"{file_stem}.codes.npy", codes.astype(np.int32))
+            np.save(tmp_target / f"{file_stem}.categories.npy", np.asarray(categories, dtype=str))
+            columns.append({
+                "name": name,
+                "kind": "dictionary",
+                "file": f"{file_stem}.codes.npy",
+                "categories": f"{file_stem}.categories.npy",
+                "dtype": str(series.dtype),
+                "memory_bytes": memory_bytes
+            })
+    
+    # Another worker may have published the same snapshot in the meantime
+    if target.exists():
+        shutil.rmtree(tmp_target, ignore_errors=True)
+    else:
+        try:
+            os.rename(tmp_target, target)
+        except OSError:
+            shutil.rmtree(tmp_target, ignore_errors=True)
+    
+    manifest = {
+        "format": SNAPSHOT_FORMAT_VERSION,
+        "directory": directory,
+        "rows": len(df),
+        "source": {
+            "path": str(source_path),
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "sha256": sha256
+        },
+        "columns": columns
+    }
+    _write_manifest(snapshot_dir, manifest)
+    
+    # Drop snapshots of older source versions. Files still mapped by other
+    # processes stay readable until they are unmapped.
+    for entry in snapshot_dir.iterdir():
+        if entry.is_dir() and entry.name != directory and not entry.name.endswith(".tmp"):
+            shutil.rmtree(entry, ignore_errors=True)
+    
+    return manifest
+
+def load_snapshot(snapshot_dir, mmap=True, shared=False, categorical=()):
+    """
+    Load the current snapshot as a DataFrame
+    
+    Parameters:
+    -----------
+    snapshot_dir : str or Path
+        Directory holding the snapshot
+    mmap : bool, optional
+        With shared, memory-map the column files instead of reading them
+        eagerly. Private loads always read them eagerly.
+    shared : bool, optional
+        Keep numeric columns backed by the read-only memory maps instead of
+        copying them into the DataFrame. Every process mapping the same
+        snapshot then shares one physical copy through the OS page cache.
+    categorical : iterable of str, optional
+        Dictionary-encoded columns to return as pandas Categoricals built
+        straight from the stored codes, without decoding the strings
+    
+    Returns:
+    --------
+    pandas.DataFrame
+        Snapshot data with the same columns and dtypes it was written with
+    """
+    manifest = read_manifest(snapshot_dir)
+    if manifest is None:
+        raise FileNotFoundError(f"No snapshot found in {snapshot_dir}")
+    
+    directory = Path(snapshot_dir) / manifest["directory"]
+    # A private load reads each column straight into its own array; mapping it
+    # first would only be copied again when the DataFrame is built
+    mmap_mode = "r" if mmap and shared else None
+    
+    data = {}
+    for column in manifest["columns"]:
+        values = np.load(directory / column["file"], mmap_mode=mmap_mode)
+        
+        if column["kind"] == "dictionary" and column["name"] in categorical:
+            categories = np.load(directory / column["categories"])
+            data[column["name"]] = pd.Categorical.from_codes(np.asarray(values), categories=categories)
+        elif column["kind"] == "dictionary":
+            categories = np.load(directory / column["categories"]).astype(object)
+            decoded = categories.take(values) if len(categories) else np.empty(len(values), dtype=object)
+            decoded[values < 0] = None
+            series = pd.Series(decoded, dtype=object)
+            if column["dtype"] not in ("object", "category"):
+                series = series.astype(column["dtype"])
+            data[column["name"]] = series
+        else:
+            data[column["name"]] = values
+    
+    # copy=False keeps one block per column so no consolidation copy is made
+    return pd.DataFrame(data, copy=False)
@@ -0,0 +1,224 @@
+import json
+import os
+import sqlite3
+import pandas as pd
+from pathlib import Path
+from app.services.snapshot import file_sha256
+
+# Bump when the table layout changes so stale stores are rebuilt
+STORE_FORMAT_VERSION = 1
+
+TABLE = "balances"
+META_TABLE = "store_meta"
+
+# Covering the filters the KPI and ML queries use. ix_balances_cube holds
+# every column of the aggregate query, so unfiltered aggregates scan it in
+# GROUP BY order instead of reading the table.
+INDEXES = {
+    'ix_balances_period_code': ['year', 'month', 'code', 'third_party_id'],
+    'ix_balances_code': ['code'],
+    'ix_balances_third_party': ['third_party_id', 'year', 'month'],
+    'ix_balances_cube': [
+        'year', 'month', 'period', 'third_party_id', 'third_party_type_id',
+        'code', 'debit_movement', 'credit_movement', 'final_balance'
+    ]
+}
+
+# Stored as text by to_sql and parsed back when reading
+DATE_COLUMNS = ['created_at', 'updated_at']
+
+# pandas dtype of each column type to_sql declares
+DECLARED_DTYPES = {'INTEGER': 'int64', 'REAL': 'float64', 'TEXT': 'str'}
+
+# CSV rows parsed and inserted per batch while building the store
+CHUNK_ROWS = 100_000
+
+def connect(db_path, readonly=True):
+    """
+    Open a connection to the store; read-only unless writing is needed
+    """
+    if readonly:
+        return sqlite3.connect(f"{Path(db_path).resolve().as_uri()}?mode=ro", uri=True)
+    return sqlite3.connect(db_path)
+
+def read_manifest(db_path):
+    """
+    Read the manifest of the store, or None if there is no usable store
+    """
+    if not os.path.exists(db_path):
+        return None
+    
+    try:
+        conn = connect(db_path)
+        try:
+            row = conn.execute(f"SELECT value FROM {META_TABLE} WHERE key = 'manifest'").fetchone()
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return None
+    
+    return json.loads(row[0]) if row else None
+
+def write_manifest(conn, manifest):
+    """
+    Replace the manifest; the caller commits
+    """
+    conn.execute(f"CREATE TABLE IF NOT EXISTS {META_TABLE} (key TEXT PRIMARY KEY, value TEXT)")
+    conn.execute(
+        f"INSERT OR REPLACE INTO {META_TABLE} (key, value) VALUES ('manifest', ?)",
+        (json.dumps(manifest),)
+    )
+
+def source_manifest(source_path, with_hash=True):
+    """
+    Identify the source file a store is built from
+    
+    Without the hash, a source whose mtime changes is always rebuilt.
+    """
+    stat = os.stat(source_path)
+    return {
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "sha256": file_sha256(source_path) if with_hash else None
+    }
+
+def store_is_current(db_path, source_path):
+    """
+    Check whether the store was built from the current source file
+    
+    Same rules as snapshot.snapshot_is_current: mtime and size first, the file
+    hash when only the mtime changed.
+    
+    Parameters:
+    -----------
+    db_path : str or Path
+        SQLite database file
+    source_path : str or Path
+        Source CSV file the store was built from
+    
+    Returns:
+    --------
+    bool
+        True if the store can be queried instead of rebuilding it
+    """
+    manifest = read_manifest(db_path)
+    if manifest is None or manifest.get("format") != STORE_FORMAT_VERSION or manifest.get("source") is None:
+        return False
+    
+    source = manifest["source"]
+    stat = os.stat(source_path)
+    if stat.st_mtime_ns == source["mtime_ns"] and stat.st_size == source["size"]:
+        return True
+    
+    if stat.st_size != source["size"] or source["sha256"] is None or file_sha256(source_path) != source["sha256"]:
+        return False
+    
+    # Same content with a new mtime: remember the new mtime
+    source["mtime_ns"] = stat.st_mtime_ns
+    try:
+        conn = connect(db_path, readonly=False)
+        try:
+            write_manifest(conn, manifest)
+            conn.commit()
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        pass
+    return True
+
+def build_store(db_path, source_path, prepare, chunk_rows=CHUNK_ROWS):
+    """
+    Load the source CSV into a new SQLite store
+    
+    The CSV is read in chunks, so memory use does not grow with the file.
+    Indexes are created after the rows are inserted, and the finished file
+    replaces the previous store atomically.
+    
+    Parameters:
+    -----------
+    db_path : str or Path
+        SQLite database file to (re)write
+    source_path : str or Path
+        Balances CSV
+    prepare : callable
+        Applied to every parsed chunk to compute derived columns
+    chunk_rows : int, optional
+        CSV rows per chunk
+    
+    Returns:
+    --------
+    dict
+        Store manifest
+    """
+    tmp_path = Path(f"{db_path}.{os.getpid()}.tmp")
+    if tmp_path.exists():
+        tmp_path.unlink()
+    
+    source = source_manifest(source_path)
+    rows = 0
+    conn = connect(tmp_path, readonly=False)
+    try:
+        for chunk in pd.read_csv(source_path, dtype={'code': str}, chunksize=chunk_rows):
+            chunk = prepare(chunk)
+            chunk.to_sql(TABLE, conn, if_exists='append', index=False)
+            rows += len(chunk)
+        
+        for name, columns in INDEXES.items():
+            conn.execute(f"CREATE INDEX {name} ON {TABLE} ({', '.join(columns)})")
+        
+        # Planner statistics, so the index matching the filters is picked
+        conn.execute("ANALYZE")
+        
+        manifest = {"format": STORE_FORMAT_VERSION, "rows": rows, "source": source}
+        write_manifest(conn, manifest)
+        conn.commit()
+    finally:
+        conn.close()
+    
+    os.replace(tmp_path, db_path)
+    return manifest
+
+def prefix_condition(prefixes):
+    """
+    WHERE clause matching account codes that start with any of the prefixes
+    
+    Prefixes are turned into ranges (code >= '1.3' AND code < '1.4') so the
+    code indexes are used. The empty prefix matches every row.
+    
+    Returns:
+    --------
+    tuple
+        (sql, params); sql is None when every row matches
+    """
+    if any(prefix == '' for prefix in prefixes):
+        return None, []
+    
+    clauses = []
+    params = []
+    for prefix in prefixes:
+        clauses.append("(code >= ? AND code < ?)")
+        params.extend([prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)])
+    
+    return f"({' OR '.join(clauses)})", params
+
+def read_frame(conn, sql, params=()):
+    """
+    Run a query and return its rows as a DataFrame with dates parsed
+    """
+    df = pd.read_sql_query(sql, conn, params=list(params))
+    for col in DATE_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col])
+    return df
+
+def column_dtypes(conn):
+    """
+    pandas dtypes of the table's columns, from the types declared in the store
+    
+    Dates are left out; read_frame parses them.
+    """
+    return {
+        row[1]: DECLARED_DTYPES[row[2]]
+        for row in conn.execute(f"PRAGMA table_info({TABLE})")
+        if row[2] in DECLARED_DTYPES
+    }
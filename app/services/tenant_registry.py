@@ -0,0 +1,247 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from app.services.data_loader import DataLoader, data_loader
+from app.services.financial_kpis_service import FinancialKPIsService, financial_kpis_service
+
+# Tenant ids name a directory, so only plain names are accepted
+TENANT_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+class UnknownTenantError(KeyError):
+    """
+    Raised when a tenant id is invalid or has no balances file
+    """
+    def __str__(self):
+        return f"Unknown tenant '{self.args[0]}'"
+
+class Tenant:
+    """
+    DataLoader and KPI service of one tenant
+    """
+    def __init__(self, tenant_id, loader, kpi_service):
+        self.tenant_id = tenant_id
+        self.data_loader = loader
+        self.kpi_service = kpi_service
+        self.dataset = None
+        self.memory_bytes = 0
+        self.last_access = None
+        self.loads = 0
+        self.in_use = 0
+
+class TenantRegistry:
+    """
+    Datasets of many tenants served from one process
+    
+    Each tenant has a directory under tenants_path with its own balances CSV
+    and snapshots. Its dataset is loaded on the first request that names it
+    and kept in an LRU bounded by max_bytes: once the loaded datasets exceed
+    the bound, the least recently used ones are dropped from memory, except
+    those a request is still using. Tenants always load through the columnar
+    snapshot, so bringing an evicted tenant
+    back reads the snapshot instead of parsing the CSV again. Memory therefore
+    grows with the tenants in use, not with the tenants configured.
+    
+    Requests without a tenant id use the default data_loader and
+    financial_kpis_service, which are never evicted.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tenants = OrderedDict()
+        self.default = Tenant(None, data_loader, financial_kpis_service)
+        self.configure()
+    
+    def configure(self, tenants_path=None, max_bytes=1 << 30, data_options=None):
+        """
+        Set where tenants live, the memory bound and how datasets are loaded
+        
+        Loaded tenants are dropped.
+        
+        Parameters:
+        -----------
+        tenants_path : str or Path, optional
+            Directory holding one subdirectory per tenant; defaults to
+            app/data/tenants
+        max_bytes : int, optional
+            Memory the loaded tenant datasets may use together. Datasets in
+            use by a request are never evicted, so they may exceed it meanwhile.
+        data_options : dict, optional
+            DataLoader.configure options shared by every tenant
+        """
+        with self._lock:
+            for tenant in self._tenants.values():
+                self.default.kpi_service.cache.clear_namespace(tenant.tenant_id)
+            
+            self.tenants_path = Path(tenants_path) if tenants_path else data_loader.data_path / "tenants"
+            self.max_bytes = max_bytes
+            self.data_options = dict(data_options or {}, use_snapshot=True)
+            self._tenants.clear()
+            self.loads = 0
+            self.evictions = 0
+    
+    def _create_tenant(self, tenant_id):
+        tenant_path = self.tenants_path / tenant_id
+        loader = DataLoader(data_path=tenant_path, **self.data_options)
+        if not loader.account_balances_file.exists():
+            raise UnknownTenantError(tenant_id)
+        
+        kpi_service = FinancialKPIsService(
+            loader=loader, cache=self.default.kpi_service.cache, cache_namespace=tenant_id
+        )
+        return Tenant(tenant_id, loader, kpi_service)
+    
+    def acquire(self, tenant_id=None):
+        """
+        Get a tenant with its dataset loaded and mark it in use
+        
+        A tenant in use is not evicted, so its dataset stays accounted in
+        max_bytes until release is called. Other tenants may be evicted to
+        make room for it.
+        
+        Parameters:
+        -----------
+        tenant_id : str, optional
+            Tenant directory name; None is the default dataset
+        
+        Returns:
+        --------
+        tuple
+            (tenant, dataset) where dataset is the Dataset to answer with
+        
+        Raises:
+        -------
+        UnknownTenantError
+            When the id is invalid or the tenant has no balances file
+        """
+        if tenant_id is None:
+            return self.default, self.default.data_loader.dataset
+        
+        if not TENANT_ID_PATTERN.match(tenant_id):
+            raise UnknownTenantError(tenant_id)
+        
+        with self._lock:
+            tenant = self._tenants.get(tenant_id)
+            if tenant is None:
+                tenant = self._create_tenant(tenant_id)
+                self._tenants[tenant_id] = tenant
+            
+            self._tenants.move_to_end(tenant_id)
+            tenant.last_access = time.time()
+            tenant.in_use += 1
+        
+        try:
+            # Loading happens outside the registry lock so other tenants keep being served
+            dataset = tenant.data_loader.dataset
+            self._account(tenant, dataset)
+        except BaseException:
+            self.release(tenant)
+            raise
+        return tenant, dataset
+    
+    def release(self, tenant):
+        """
+        Mark a tenant returned by acquire as no longer in use
+        """
+        if tenant.tenant_id is None:
+            return
+        with self._lock:
+            tenant.in_use -= 1
+            if not tenant.in_use:
+                # Evictions skipped while it was in use can happen now
+                self._evict()
+    
+    def _account(self, tenant, dataset):
+        """
+        Record the dataset a tenant has loaded and evict others if needed
+        """
+        if tenant.dataset is dataset:
+            return
+        
+        memory_bytes = dataset.memory_bytes
+        with self._lock:
+            if tenant.dataset is not dataset:
+                tenant.dataset = dataset
+                tenant.memory_bytes = memory_bytes
+                tenant.loads += 1
+                self.loads += 1
+                self._evict()
+    
+    def _evict(self):
+        """
+        Drop least recently used datasets until the loaded ones fit in max_bytes
+        
+        Tenants in use and the most recently used one are kept.
+        """
+        loaded = sum(tenant.memory_bytes for tenant in self._tenants.values())
+        for tenant in list(self._tenants.values())[:-1]:
+            if loaded <= self.max_bytes:
+                break
+            if tenant.in_use or tenant.dataset is None:
+                continue
+            
+            tenant.data_loader.unload()
+            self.default.kpi_service.cache.clear_namespace(tenant.tenant_id)
+            loaded -= tenant.memory_bytes
+            tenant.dataset = None
+            tenant.memory_bytes = 0
+            self.evictions += 1
+    
+    def run(self, tenant_id, fn, *args, **kwargs):
+        """
+        Call fn with the tenant's KPI service as first argument
+        
+        The service is pinned to the dataset acquired for the call, and the
+        tenant stays in use until fn returns. Meant to be submitted to an
+        executor, so loading a tenant does not block the event loop.
+        """
+        tenant, dataset = self.acquire(tenant_id)
+        try:
+            return fn(tenant.kpi_service.pinned(dataset), *args, **kwargs)
+        finally:
+            self.release(tenant)
+    
+    def update(self, tenant_id, fn, *args, **kwargs):
+        """
+        Call fn with the tenant's DataLoader as first argument to change its data
+        
+        For DataLoader.reload or DataLoader.append_periods on a tenant. The
+        dataset the loader ends up with is accounted before returning.
+        """
+        tenant, _ = self.acquire(tenant_id)
+        try:
+            result = fn(tenant.data_loader, *args, **kwargs)
+            if tenant.tenant_id is not None:
+                self._account(tenant, tenant.data_loader.dataset)
+            return result
+        finally:
+            self.release(tenant)
+    
+    def get_stats(self):
+        """
+        Get the loaded tenants, their memory and load/eviction counters
+        """
+        with self._lock:
+            loaded = [
+                {
+                    'tenant_id': tenant.tenant_id,
+                    'memory_bytes': tenant.memory_bytes,
+                    'dataset_version': tenant.data_loader.version,
+                    'last_access': tenant.last_access,
+                    'loads': tenant.loads,
+                    'in_use': tenant.in_use
+                }
+                for tenant in reversed(self._tenants.values()) if tenant.dataset is not None
+            ]
+            return {
+                'tenants_path': str(self.tenants_path),
+                'max_bytes': self.max_bytes,
+                'loaded_bytes': sum(tenant['memory_bytes'] for tenant in loaded),
+                'known_tenants': len(self._tenants),
+                'loaded': loaded,
+                'loads': self.loads,
+                'evictions': self.evictions
+            }
+
+# Singleton instance
+tenant_registry = TenantRegistry()
@@ -0,0 +1,227 @@
+import multiprocessing
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from app.services.data_loader import data_loader
+from app.services.ml_service import ml_service
+
+# Job kind -> MLService training method
+TRAINING_METHODS = {
+    'sales_forecast': 'train_sales_forecast_model',
+    'anomaly_detection': 'train_anomaly_detection_model',
+    'segment_forecast': 'train_segment_forecasts',
+    'row_anomaly_detection': 'train_row_anomaly_model',
+    'model_update': 'update_models'
+}
+
+# Finished jobs kept for status polling; older ones are forgotten first
+MAX_FINISHED_JOBS = 100
+
+def _init_worker(data_options):
+    # Workers are spawned, so load the dataset the same way the API does
+    data_loader.configure(**data_options)
+
+def _result_error(result):
+    # Training methods report failures with an 'error' key; update_models nests one result per model
+    if 'error' in result:
+        return result['error']
+    errors = [f"{name}: {value['error']}" for name, value in result.items()
+              if isinstance(value, dict) and 'error' in value]
+    return '; '.join(errors) or None
+
+def _run_training(method_name, params):
+    started_at = time.time()
+    
+    # Workers outlive jobs; pick up a balances file that changed since the last one
+    data_loader.reload()
+    result = getattr(ml_service, method_name)(**params)
+    return started_at, result
+
+class TrainingJobQueue:
+    """
+    Runs MLService training in a process pool and tracks it as jobs
+    
+    Each job gets an id whose status can be polled. Jobs for the same model
+    run one after another, so it is never fitted twice at once: a request
+    with other parameters (e.g. force_retrain) waits for the job in flight,
+    and one with the same parameters as a queued or training job gets that
+    job instead.
+    """
+    def __init__(self, max_workers=1):
+        self._lock = threading.Lock()
+        self._executor = None
+        self._jobs = OrderedDict()
+        self._futures = {}
+        self._queues = {}
+        self.configure(max_workers=max_workers)
+    
+    def configure(self, max_workers=1, data_options=None):
+        """
+        Set the number of training processes and how they load the dataset
+        
+        Meant to be called at startup, before any job is submitted.
+        
+        Parameters:
+        -----------
+        max_workers : int, optional
+            Models trained at the same time
+        data_options : dict, optional
+            Keyword arguments for data_loader.configure in the worker processes
+        """
+        with self._lock:
+            previous = self._executor
+            self.max_workers = max_workers
+            self.data_options = data_options or {}
+            self._executor = None
+        
+        if previous is not None:
+            previous.shutdown(wait=False)
+    
+    def _get_executor(self):
+        if self._executor is None:
+            # Spawn rather than fork: the API process runs executor threads
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+                initargs=(self.data_options,)
+            )
+        return self._executor
+    
+    def submit(self, kind, **params):
+        """
+        Queue a training job, or return the pending one with the same parameters
+        
+        Parameters:
+        -----------
+        kind : str
+            One of TRAINING_METHODS
+        **params
+            Keyword arguments for the training method, e.g. force_retrain
+        
+        Returns:
+        --------
+        tuple
+            (job, created) where job is the job status dict and created is
+            False when a queued or running job was returned
+        """
+        if kind not in TRAINING_METHODS:
+            raise ValueError(f"Unknown training job '{kind}'. Expected one of {list(TRAINING_METHODS)}")
+        
+        with self._lock:
+            queue = self._queues.setdefault(kind, [])
+            for queued_id in queue:
+                if self._jobs[queued_id]['params'] == params:
+                    return self._job_status(queued_id), False
+            
+            job_id = uuid.uuid4().hex
+            self._jobs[job_id] = {
+                'job_id': job_id,
+                'kind': kind,
+                'params': params,
+                'status': 'queued',
+                'created_at': time.time(),
+                'started_at': None,
+                'finished_at': None,
+                'result': None,
+                'error': None
+            }
+            queue.append(job_id)
+            # Only the first job of a model is handed to the pool; the rest wait for it
+            future = self._start(job_id) if len(queue) == 1 else None
+        
+        if future is not None:
+            self._watch(job_id, future)
+        
+        with self._lock:
+            return self._job_status(job_id), True
+    
+    def _start(self, job_id):
+        # Called with the lock held
+        job = self._jobs[job_id]
+        try:
+            future = self._get_executor().submit(
+                _run_training, TRAINING_METHODS[job['kind']], job['params']
+            )
+        except BrokenProcessPool:
+            self._executor = None
+            future = self._get_executor().submit(
+                _run_training, TRAINING_METHODS[job['kind']], job['params']
+            )
+        self._futures[job_id] = future
+        return future
+    
+    def _watch(self, job_id, future):
+        # Outside the lock: the callback runs right away if the future is already done
+        future.add_done_callback(lambda f: self._finish(job_id, f))
+    
+    def _finish(self, job_id, future):
+        started = None
+        with self._lock:
+            job = self._jobs[job_id]
+            job['finished_at'] = time.time()
+            
+            try:
+                job['started_at'], job['result'] = future.result()
+                job['error'] = _result_error(job['result'])
+                job['status'] = 'failed' if job['error'] else 'completed'
+            except Exception as e:
+                job['status'] = 'failed'
+                job['error'] = str(e)
+                if isinstance(e, BrokenProcessPool):
+                    # A worker died; start a fresh pool for the next job
+                    self._executor = None
+            
+            del self._futures[job_id]
+            queue = self._queues[job['kind']]
+            queue.remove(job_id)
+            
+            # Hand the next job of this model to the pool
+            while queue and started is None:
+                try:
+                    started = queue[0], self._start(queue[0])
+                except Exception as e:
+                    waiting = self._jobs[queue.pop(0)]
+                    waiting.update(status='failed', error=str(e), finished_at=time.time())
+            
+            finished = [key for key, value in self._jobs.items() if value['finished_at'] is not None]
+            for key in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+                del self._jobs[key]
+        
+        if started is not None:
+            self._watch(*started)
+    
+    def _job_status(self, job_id):
+        job = dict(self._jobs[job_id])
+        future = self._futures.get(job_id)
+        if future is not None and future.running():
+            job['status'] = 'running'
+        return job
+    
+    def get_job(self, job_id):
+        """
+        Get the status of a job, or None if it is unknown or was forgotten
+        
+        Returns:
+        --------
+        dict
+            Job id, kind, parameters, status (queued, running, completed or
+            failed), timestamps and the training result or error
+        """
+        with self._lock:
+            if job_id not in self._jobs:
+                return None
+            return self._job_status(job_id)
+    
+    def list_jobs(self):
+        """
+        Get the status of every known job, newest first
+        """
+        with self._lock:
+            return [self._job_status(job_id) for job_id in reversed(self._jobs)]
+
+# Singleton instance
+training_jobs = TrainingJobQueue()
@@ -0,0 +1,12 @@
+#!/usr/bin/env python3
+# Copyright 2025 Anti-Patrones
+# This work is licensed under a Creative Commons Attribution-ShareAlike 4.0 International License.
+# http://creativecommons.org/licenses/by-sa/4.0/
+
+from app.services.data_loader import data_loader
+
+if __name__ == '__main__':
+    manifest = data_loader.build_snapshot()
+    
+    print(f"Snapshot escrito en {data_loader.account_balances_snapshot / manifest['directory']}")
+    print(f"Filas: {manifest['rows']} (origen: {manifest['source']['path']})")
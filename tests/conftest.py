@@ -0,0 +1,18 @@
+import shutil
+from pathlib import Path
+
+import pytest
+
+BALANCES_CSV = Path(__file__).resolve().parent.parent / "app" / "data" / "accounting_account_balances.csv"
+
+
+@pytest.fixture
+def balances_dir(tmp_path):
+    """
+    Data directory holding a copy of the balances CSV, so snapshots and
+    stores are written outside the repository
+    """
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    shutil.copy(BALANCES_CSV, data_dir / BALANCES_CSV.name)
+    return data_dir
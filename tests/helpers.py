@@ -0,0 +1,24 @@
+import math
+
+import pytest
+
+
+def assert_same_response(actual, expected, path="response"):
+    """
+    Compare two KPI responses, allowing float rounding differences
+    """
+    if isinstance(expected, dict):
+        assert isinstance(actual, dict), path
+        assert actual.keys() == expected.keys(), path
+        for key in expected:
+            assert_same_response(actual[key], expected[key], f"{path}[{key!r}]")
+    elif isinstance(expected, list):
+        assert isinstance(actual, list) and len(actual) == len(expected), path
+        for i, (a, e) in enumerate(zip(actual, expected)):
+            assert_same_response(a, e, f"{path}[{i}]")
+    elif isinstance(expected, float) and math.isnan(expected):
+        assert isinstance(actual, float) and math.isnan(actual), path
+    elif isinstance(expected, float):
+        assert actual == pytest.approx(expected, rel=1e-9, abs=1e-6), path
+    else:
+        assert actual == expected, path
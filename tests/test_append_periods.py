@@ -0,0 +1,92 @@
+import pandas as pd
+import pytest
+
+from app.services import sqlite_store
+from app.services.data_loader import DataLoader
+from app.services.financial_kpis_service import FinancialKPIsService
+from tests.conftest import BALANCES_CSV
+from tests.helpers import assert_same_response
+from tests.test_sqlite_backend import FILTERS, KPI_METHODS
+
+LOADER_OPTIONS = [
+    {},
+    {'compact_dtypes': True, 'money_scale': 1_000_000},
+    {'backend': 'sqlite'},
+]
+
+
+@pytest.fixture
+def split_balances(tmp_path):
+    """
+    Data directory with the balances CSV minus its last period and part of
+    the one before, and those rows as the delta to append
+    """
+    rows = pd.read_csv(BALANCES_CSV, dtype={'code': str})
+    periods = rows[['year', 'month']].drop_duplicates().sort_values(['year', 'month'])
+    last, previous = [tuple(period) for period in periods.tail(2).itertuples(index=False)][::-1]
+    
+    in_last = (rows['year'] == last[0]) & (rows['month'] == last[1])
+    in_previous = (rows['year'] == previous[0]) & (rows['month'] == previous[1])
+    # Half of the previous period is appended too, so an existing period gets extended
+    delta_mask = in_last | (in_previous & (rows.index % 2 == 0))
+    
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    rows[~delta_mask].to_csv(data_dir / BALANCES_CSV.name, index=False)
+    return data_dir, rows[delta_mask]
+
+
+@pytest.fixture(scope='module')
+def full_service():
+    return FinancialKPIsService(loader=DataLoader(data_path=BALANCES_CSV.parent, use_snapshot=False))
+
+
+def assert_matches_full_load(loader, full_service):
+    service = FinancialKPIsService(loader=loader)
+    for method in KPI_METHODS:
+        for filters in FILTERS:
+            expected = getattr(full_service, method)(**filters)
+            actual = getattr(service, method)(**filters)
+            assert_same_response(actual, expected, f"{method}{filters}")
+
+
+@pytest.mark.parametrize('options', LOADER_OPTIONS)
+def test_append_matches_full_load(split_balances, full_service, options):
+    data_dir, delta = split_balances
+    loader = DataLoader(data_path=data_dir, **options)
+    loader.dataset
+    
+    result = loader.append_periods(delta)
+    
+    assert result['appended'] == len(delta)
+    assert result['version'] == 2
+    assert not loader.source_changed()
+    if loader.backend == 'sqlite':
+        # The store was stamped with the CSV it now matches, so a cold start reuses it
+        assert sqlite_store.store_is_current(loader.account_balances_store, loader.account_balances_file)
+    assert_matches_full_load(loader, full_service)
+
+
+@pytest.mark.parametrize('options', LOADER_OPTIONS)
+def test_reload_after_append_matches_full_load(split_balances, full_service, options):
+    data_dir, delta = split_balances
+    loader = DataLoader(data_path=data_dir, **options)
+    loader.dataset
+    loader.append_periods(delta)
+    
+    # The persisted rows are what a reload and a cold start read back
+    assert loader.reload(force=True)['reloaded']
+    assert_matches_full_load(loader, full_service)
+    assert_matches_full_load(DataLoader(data_path=data_dir, **options), full_service)
+
+
+def test_append_without_persist_leaves_csv(split_balances, full_service):
+    data_dir, delta = split_balances
+    before = (data_dir / BALANCES_CSV.name).read_bytes()
+    loader = DataLoader(data_path=data_dir)
+    loader.dataset
+    
+    loader.append_periods(delta, persist=False)
+    
+    assert (data_dir / BALANCES_CSV.name).read_bytes() == before
+    assert_matches_full_load(loader, full_service)
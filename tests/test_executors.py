@@ -0,0 +1,35 @@
+import asyncio
+import threading
+
+from app.services.executors import BoundedExecutor
+
+
+def test_cancelled_queued_calls_free_their_slots():
+    executor = BoundedExecutor('test', max_workers=1, max_queue=2)
+    started = threading.Event()
+    release = threading.Event()
+    
+    def blocking():
+        started.set()
+        release.wait(5)
+        return 'done'
+    
+    async def scenario():
+        running = asyncio.ensure_future(executor.run(blocking))
+        await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+        queued = [asyncio.ensure_future(executor.run(lambda: 'queued')) for _ in range(2)]
+        await asyncio.sleep(0)
+        assert executor.get_stats()['queued'] == 2
+        
+        # A client disconnecting cancels the awaiting task and its queued future
+        for task in queued:
+            task.cancel()
+        await asyncio.gather(*queued, return_exceptions=True)
+        
+        release.set()
+        return await running
+    
+    assert asyncio.run(scenario()) == 'done'
+    stats = executor.get_stats()
+    assert stats['queued'] == 0 and stats['running'] == 0
+    assert stats['completed'] == 1
@@ -0,0 +1,38 @@
+import joblib
+
+from app.services.model_registry import ModelRegistry
+
+
+def add_forecast(model_data):
+    return dict(model_data, forecast=[1.0, 2.0])
+
+
+def test_warm_up_caches_prepared_artifact(tmp_path):
+    path = tmp_path / "model.pkl"
+    joblib.dump({'model': 'legacy'}, path)
+    registry = ModelRegistry()
+    
+    assert registry.warm_up({path: add_forecast}) == [str(path)]
+    assert registry.get(path, prepare=add_forecast)['forecast'] == [1.0, 2.0]
+    assert (registry.loads, registry.hits) == (1, 1)
+
+
+def test_artifact_cached_with_other_prepare_is_loaded_again(tmp_path):
+    path = tmp_path / "model.pkl"
+    joblib.dump({'model': 'legacy'}, path)
+    registry = ModelRegistry()
+    
+    assert 'forecast' not in registry.get(path)
+    assert registry.get(path, prepare=add_forecast)['forecast'] == [1.0, 2.0]
+    assert registry.loads == 2
+
+
+def test_warm_up_skips_missing_and_broken_artifacts(tmp_path):
+    path = tmp_path / "model.pkl"
+    joblib.dump({'model': 'legacy'}, path)
+    
+    def broken(model_data):
+        raise ValueError("cannot forecast")
+    
+    registry = ModelRegistry()
+    assert registry.warm_up({tmp_path / "missing.pkl": None, path: broken}) == []
@@ -0,0 +1,112 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.data import parse_sql_to_csv
+from app.data.parse_sql_to_csv import (
+    iter_sql_statements,
+    process_value,
+    read_values_csv,
+    read_values_texts,
+    scan_values,
+    tokenize_values,
+    type_column,
+)
+
+# Tipos base, como los entrega parse_create_table_schema
+COLUMN_TYPES = ['bigint', 'varchar', 'decimal', 'timestamp']
+
+
+def scanned_columns(values_texts, column_types):
+    # Lectura de referencia forzando scan_values, sin el camino rápido
+    scanned = [result for result in (scan_values(text, len(column_types)) for text in values_texts) if result]
+    null_literals = []
+    rows = 0
+    for result in scanned:
+        null_literals.extend(rows * len(column_types) + index for index in result[4])
+        rows += result[2]
+    return read_values_csv(b"\n".join(result[0] for result in scanned),
+                           np.logical_or.reduce([result[1] for result in scanned]),
+                           len(column_types), column_types, null_literals)
+
+
+def test_only_unquoted_null_is_null():
+    columns = tokenize_values("(1,'NULL',NULL),(2,NULL,'NULL'),(3,'a''NULL''','x')")
+    
+    assert columns[1].tolist() == ['NULL', None, "a'NULL'"]
+    assert columns[2].tolist() == [None, 'NULL', 'x']
+    assert process_value("'NULL'") == 'NULL'
+    assert process_value('NULL') is None
+
+
+def test_quoted_null_in_typed_batch():
+    texts = ["(1,'NULL',1.50,'2024-01-01 00:00:00')", "(2,NULL,NULL,NULL),(3, 'NULL' ,2.00,NULL)"]
+    columns = read_values_texts(texts, 4, COLUMN_TYPES)
+    
+    assert columns[0].tolist() == [1, 2, 3]
+    assert columns[1].tolist() == ['NULL', None, 'NULL']
+    assert columns[2].tolist()[::2] == [1.5, 2.0]
+
+
+@pytest.fixture
+def paths(monkeypatch):
+    # Cuenta qué camino toma read_values_texts
+    calls = {'split': 0, 'scan': 0}
+    
+    def spy(name, function):
+        def wrapper(*args, **kwargs):
+            calls[name] += 1
+            return function(*args, **kwargs)
+        return wrapper
+    
+    monkeypatch.setattr(parse_sql_to_csv, 'split_values', spy('split', parse_sql_to_csv.split_values))
+    monkeypatch.setattr(parse_sql_to_csv, 'scan_values', spy('scan', parse_sql_to_csv.scan_values))
+    return calls
+
+
+@pytest.mark.parametrize("texts, fast", [
+    (["(1,'a',1.00,NULL),(2,'b),(c',2.00,NULL)"], False),
+    (["(1,'a',1.00,NULL),(2,CONCAT('b','c'),2.00,NULL)"], False),
+    (["(1,'a',1.00,NULL),(2,'b',2.00)", "(3,'c',3.00,NULL,4)"], False),
+    (["(1,'a',1.00,NULL)", "(2,'b',2.00,NULL)\n,(3,'c',3.00,NULL)"], False),
+    (["(9007199254740993,'a',1.00,NULL),(NULL,'b',2.00,'2024-01-31 10:00:00')"], True),
+    (["(1,'a''b',1.50,'2024-01-31 10:00:00')", "(2,'c\\'d',NULL,NULL),(3,'',-2.25,'2024-02-01')"], True),
+])
+def test_split_rows_match_scanned_rows(paths, texts, fast):
+    actual_columns = read_values_texts(texts, 4, COLUMN_TYPES)
+    
+    assert paths['split'] == len(texts)
+    assert (paths['scan'] == 0) == fast
+    for actual, expected in zip(actual_columns, scanned_columns(texts, COLUMN_TYPES)):
+        pd.testing.assert_series_equal(actual, expected)
+
+
+def test_large_integers_with_nulls_stay_exact():
+    columns = read_values_texts(["(9007199254740993,'a',1.00,NULL),(NULL,'b',2.00,NULL)"], 4, COLUMN_TYPES)
+    
+    assert columns[0].dtype == 'Int64'
+    assert columns[0][0] == 9007199254740993
+    assert columns[0].isna().tolist() == [False, True]
+
+
+def test_dates_parse_as_iso_and_report_coerced(capsys):
+    series = pd.Series(['2024-01-31', '2024-02-01 10:30:00', '0000-00-00', None], name='created_at')
+    
+    values = type_column(series, 'datetime')
+    
+    assert values.tolist()[:2] == [pd.Timestamp('2024-01-31'), pd.Timestamp('2024-02-01 10:30:00')]
+    assert values.isna().tolist() == [False, False, True, True]
+    assert "1 fechas inválidas" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 7, 1 << 16])
+def test_statements_split_across_chunks(chunk_size):
+    statements = [
+        "INSERT INTO t VALUES (1,'a;b','c\\'d'),(2,'e''f',NULL);",
+        "\n-- nota; sin fin\n/* bloque; */ INSERT INTO t VALUES (3,\"g;\",`h`);",
+        "\nINSERT INTO t VALUES " + ",".join(f"({i},'v{i}')" for i in range(200)) + ";",
+    ]
+    
+    assert list(iter_sql_statements(io.StringIO("".join(statements)), chunk_size=chunk_size)) == statements
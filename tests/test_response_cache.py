@@ -0,0 +1,21 @@
+from app.services.response_cache import ResponseCache
+
+
+def test_callers_get_copies_of_cached_responses():
+    cache = ResponseCache()
+    first = cache.get_or_compute('summary', (2024,), 1, lambda: {'periods': ['2024-01']})
+    first['periods'].append('changed')
+    
+    again = cache.get_or_compute('summary', (2024,), 1, lambda: None)
+    again['periods'].clear()
+    
+    assert cache.get_or_compute('summary', (2024,), 1, lambda: None) == {'periods': ['2024-01']}
+    assert cache.get_stats()['hits'] == 2
+
+
+def test_other_versions_miss():
+    cache = ResponseCache()
+    cache.get_or_compute('summary', (), 1, lambda: {'version': 1})
+    
+    assert cache.get_or_compute('summary', (), 2, lambda: {'version': 2}) == {'version': 2}
+    assert cache.get_stats()['misses'] == 2
@@ -0,0 +1,52 @@
+import pandas as pd
+import pytest
+
+from app.services.data_loader import DataLoader
+from app.services.financial_kpis_service import FinancialKPIsService
+from tests.helpers import assert_same_response
+
+KPI_METHODS = [
+    'calculate_cash_flow',
+    'calculate_financial_summary',
+    'analyze_sales',
+    'analyze_accounts_receivable_payable',
+    'analyze_expenses_by_supplier',
+]
+
+# The last two match no rows
+FILTERS = [{}, {'year': 2024}, {'year': 2024, 'month': 3}, {'year': 1999}, {'year': 2024, 'month': 12}]
+
+
+@pytest.fixture
+def loaders(balances_dir):
+    return DataLoader(data_path=balances_dir), DataLoader(data_path=balances_dir, backend='sqlite')
+
+
+@pytest.mark.parametrize('filters', FILTERS)
+@pytest.mark.parametrize('method', KPI_METHODS)
+def test_kpis_match_pandas_backend(loaders, method, filters):
+    pandas_loader, sqlite_loader = loaders
+    expected = getattr(FinancialKPIsService(loader=pandas_loader), method)(**filters)
+    actual = getattr(FinancialKPIsService(loader=sqlite_loader), method)(**filters)
+    assert_same_response(actual, expected)
+
+
+@pytest.mark.parametrize('filters', [{'year': 1999}, {'year': 2024, 'third_party_id': -1}])
+def test_empty_aggregates_keep_cube_schema(loaders, filters):
+    pandas_loader, sqlite_loader = loaders
+    
+    expected = pandas_loader.get_aggregates('4', **filters)
+    actual = sqlite_loader.get_aggregates('4', **filters)
+    assert actual.empty
+    pd.testing.assert_frame_equal(actual.reset_index(drop=True), expected.reset_index(drop=True))
+    
+    expected = pandas_loader.get_aggregates_by_prefix(('', '4'), **filters)
+    actual = sqlite_loader.get_aggregates_by_prefix(('', '4'), **filters)
+    pd.testing.assert_frame_equal(actual.reset_index(drop=True), expected.reset_index(drop=True))
+
+
+def test_empty_filtered_data_keeps_table_schema(loaders):
+    pandas_loader, sqlite_loader = loaders
+    expected = pandas_loader.get_filtered_data(year=1999).dtypes.drop(['created_at', 'updated_at'])
+    actual = sqlite_loader.get_filtered_data(year=1999).dtypes.drop(['created_at', 'updated_at'])
+    pd.testing.assert_series_equal(actual, expected)
@@ -0,0 +1,103 @@
+import shutil
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.routers import financial_kpis, ml_predictions
+from app.routers.errors import register_error_handlers
+from app.services.executors import ExecutorBusyError, kpi_executor
+from app.services.data_loader import DataLoader
+from app.services.financial_kpis_service import FinancialKPIsService
+from app.services.tenant_registry import TenantRegistry, UnknownTenantError
+from tests.conftest import BALANCES_CSV
+from tests.helpers import assert_same_response
+
+
+@pytest.fixture
+def registry(tmp_path):
+    for tenant_id in ('acme', 'globex'):
+        tenant_dir = tmp_path / tenant_id
+        tenant_dir.mkdir()
+        shutil.copy(BALANCES_CSV, tenant_dir / BALANCES_CSV.name)
+    
+    registry = TenantRegistry()
+    # Any second dataset exceeds the bound, so only tenants in use are kept
+    registry.configure(tenants_path=tmp_path, max_bytes=1)
+    yield registry
+    registry.configure()
+
+
+def test_tenant_in_use_is_not_evicted(registry):
+    def nested(service):
+        other, _ = registry.acquire('globex')
+        registry.release(other)
+        acme = registry._tenants['acme']
+        return service.dataset, acme.dataset, acme.data_loader.is_loaded, registry.evictions
+    
+    pinned, accounted, loaded, evictions = registry.run('acme', nested)
+    
+    assert pinned is accounted and loaded
+    assert evictions == 0
+    
+    # Released, it is no longer the most recently used one and goes
+    assert registry._tenants['acme'].dataset is None
+    assert registry._tenants['globex'].dataset is not None
+    assert registry.evictions == 1
+
+
+def test_run_answers_from_the_acquired_dataset(registry):
+    result = registry.run('acme', FinancialKPIsService.calculate_financial_summary, year=2024)
+    
+    # The tenant holds a copy of the default balances
+    expected = registry.run(None, FinancialKPIsService.calculate_financial_summary, year=2024)
+    assert_same_response(result, expected, 'summary')
+    assert registry._tenants['acme'].in_use == 0
+
+
+def test_update_accounts_the_new_dataset(registry):
+    tenant, before = registry.acquire('acme')
+    registry.release(tenant)
+    
+    result = registry.update('acme', DataLoader.reload, force=True)
+    
+    assert result['reloaded']
+    assert tenant.dataset is tenant.data_loader.dataset
+    assert tenant.dataset is not before
+    assert tenant.loads == 2
+
+
+def test_unknown_tenant(registry):
+    with pytest.raises(UnknownTenantError):
+        registry.run('initech', FinancialKPIsService.calculate_financial_summary)
+
+
+def test_ml_endpoints_reject_tenants():
+    app = FastAPI()
+    app.include_router(ml_predictions.router, prefix="/api/ml")
+    client = TestClient(app)
+    
+    response = client.get("/api/ml/jobs", params={"tenant_id": "acme"})
+    
+    assert response.status_code == 400
+    assert "tenant_id" in response.json()["detail"]
+    assert client.get("/api/ml/jobs").status_code == 200
+
+
+def test_service_errors_map_to_http_responses(monkeypatch):
+    app = FastAPI()
+    register_error_handlers(app)
+    app.include_router(financial_kpis.router, prefix="/api/kpis/financial")
+    client = TestClient(app)
+    
+    response = client.get("/api/kpis/financial/summary", params={"tenant_id": "initech"})
+    assert response.status_code == 404
+    assert "initech" in response.json()["detail"]
+    
+    async def busy(fn, *args, **kwargs):
+        raise ExecutorBusyError("kpi executor is busy")
+    monkeypatch.setattr(kpi_executor, 'run', busy)
+    
+    response = client.get("/api/kpis/financial/summary")
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
@@ -0,0 +1,67 @@
+from concurrent.futures import Future
+
+import pytest
+
+from app.services.training_jobs import TrainingJobQueue
+
+
+class FakeExecutor:
+    """
+    Executor whose futures are resolved by the test
+    """
+    def __init__(self):
+        self.submitted = []
+    
+    def submit(self, fn, method_name, params):
+        future = Future()
+        self.submitted.append((method_name, params, future))
+        return future
+    
+    def shutdown(self, wait=True):
+        pass
+
+
+@pytest.fixture
+def jobs(monkeypatch):
+    queue = TrainingJobQueue()
+    executor = FakeExecutor()
+    monkeypatch.setattr(queue, '_get_executor', lambda: executor)
+    return queue, executor
+
+
+def test_same_request_joins_pending_job(jobs):
+    queue, executor = jobs
+    first, created = queue.submit('sales_forecast', force_retrain=False)
+    again, joined = queue.submit('sales_forecast', force_retrain=False)
+    
+    assert created and not joined
+    assert again['job_id'] == first['job_id']
+    assert len(executor.submitted) == 1
+
+
+def test_forced_request_waits_for_job_in_flight(jobs):
+    queue, executor = jobs
+    first, _ = queue.submit('sales_forecast', force_retrain=False)
+    forced, created = queue.submit('sales_forecast', force_retrain=True)
+    
+    assert created and forced['job_id'] != first['job_id']
+    assert forced['status'] == 'queued'
+    assert len(executor.submitted) == 1
+    
+    executor.submitted[0][2].set_result((0.0, {'message': 'trained'}))
+    
+    assert queue.get_job(first['job_id'])['status'] == 'completed'
+    assert [params for _, params, _ in executor.submitted] == [{'force_retrain': False}, {'force_retrain': True}]
+
+
+def test_nested_errors_fail_the_job(jobs):
+    queue, executor = jobs
+    job, _ = queue.submit('model_update')
+    executor.submitted[0][2].set_result((0.0, {
+        'sales_forecast': {'message': 'updated'},
+        'anomaly_detection': {'error': 'Need at least 10 periods'}
+    }))
+    
+    job = queue.get_job(job['job_id'])
+    assert job['status'] == 'failed'
+    assert job['error'] == 'anomaly_detection: Need at least 10 periods'